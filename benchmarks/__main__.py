@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import numpy as np
+from config import Config
+from flowork import create_app
+from flowork.extensions import db
+from benchmarks.datagen import SCALES, generate_dataset
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.runner import run_scenario, build_report, compare_reports
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='FLOWORK 핫 패스 벤치마크')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='전용 벤치마크 DB (미지정 시 임시 SQLite 파일)')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'쉼표로 구분 (기본: 전체) {",".join(SCENARIOS)}')
+    parser.add_argument('--output', help='결과 JSON 파일 (미지정 시 표준 출력)')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    return parser.parse_args(argv)
+
+def _make_config(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        WTF_CSRF_ENABLED = False
+        # Redis 없이도 돌 수 있도록 프로세스 캐시 사용
+        CACHE_TYPE = 'SimpleCache'
+    if database_url.startswith('sqlite'):
+        BenchConfig.SQLALCHEMY_ENGINE_OPTIONS = {}
+    return BenchConfig
+
+def main(argv=None):
+    args = _parse_args(argv)
+    names = [n.strip() for n in args.scenarios.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        sys.exit(f'알 수 없는 시나리오: {", ".join(unknown)}')
+
+    database_url = args.database_url
+    if not database_url:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='flowork_bench_'), 'bench.db')
+
+    app = create_app(_make_config(database_url))
+    spec = SCALES[args.scale]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'[bench] generating {args.scale} dataset ({db.engine.dialect.name})...', file=sys.stderr)
+        dataset = generate_dataset(spec, seed=args.seed)
+        print(f"[bench] dataset: {dataset['counts']}", file=sys.stderr)
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(dataset['user_id'])
+            sess['_fresh'] = True
+
+        ctx = {
+            **dataset,
+            'client': client,
+            'rng': np.random.default_rng(args.seed),
+            'import_products': spec['import_products']
+        }
+
+        results = {}
+        for name in names:
+            print(f'[bench] {name}...', file=sys.stderr)
+            results[name] = run_scenario(SCENARIOS[name], ctx, args.iterations, warmup=args.warmup)
+
+        report = build_report(args.scale, spec, dataset, results, args.seed)
+        db.session.remove()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'[bench] saved {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            base = json.load(f)
+        print('\n'.join(compare_reports(base, report)), file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+벤치마크용 합성 데이터 생성 (기존 모델 테이블에 직접 INSERT)
+
+매장/상품/옵션/매장재고/판매(상세 포함)를 만들고 합계/집계 테이블은 서비스의 재계산 함수로 맞춘다.
+같은 seed 면 같은 데이터가 만들어지므로 커밋 간 비교가 가능하다.
+"""
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import select, insert, func
+from flowork.extensions import db
+from flowork.models import Brand, Store, User, Product, Variant, StoreStock, Sale, SaleItem
+from flowork.constants import SaleStatus
+from flowork.utils import clean_string_upper, get_choseong
+from flowork.services.stock_totals import rebuild_stock_totals
+from flowork.services.sales_rollup import rebuild_sales_rollup
+
+INSERT_CHUNK_SIZE = 5000
+
+# stock_ratio: 매장별 옵션 보유 비율 / sales_per_store_day: 매장 일 평균 판매 건수
+SCALES = {
+    'small': {
+        'stores': 10, 'products': 500, 'colors_per_product': 3, 'stock_ratio': 0.5,
+        'days': 30, 'sales_per_store_day': 10, 'max_items_per_sale': 3, 'import_products': 200
+    },
+    'medium': {
+        'stores': 40, 'products': 5000, 'colors_per_product': 4, 'stock_ratio': 0.5,
+        'days': 90, 'sales_per_store_day': 20, 'max_items_per_sale': 3, 'import_products': 2000
+    },
+    'large': {
+        'stores': 80, 'products': 20000, 'colors_per_product': 5, 'stock_ratio': 0.4,
+        'days': 365, 'sales_per_store_day': 30, 'max_items_per_sale': 4, 'import_products': 10000
+    },
+}
+
+COLORS = ['BLK', 'WHT', 'NVY', 'GRY', 'BEG', 'KHA', 'RED', 'BLU']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', '2XL']
+CATEGORIES = ['티셔츠', '셔츠', '니트', '팬츠', '자켓', '다운', '신발', '가방']
+NAME_WORDS = ['베이직', '오버핏', '라이트', '울', '코튼', '데님', '플리스', '고어텍스', '트레킹', '에센셜']
+
+def _insert_chunks(model, rows):
+    for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(model), rows[i:i + INSERT_CHUNK_SIZE])
+
+def build_product_records(spec, rng, prefix='B'):
+    """
+    엑셀 업로드 파서가 만드는 것과 같은 형태의 상품/옵션 레코드 목록
+    (process_stock_data / full_import_db 입력 및 초기 적재에 공용)
+    """
+    records = []
+    for i in range(spec['products']):
+        year = 2020 + i % 6
+        category = CATEGORIES[i % len(CATEGORIES)]
+        product_number = f'{prefix}{year % 100:02d}{i:06d}'
+        product_name = f'{NAME_WORDS[i % len(NAME_WORDS)]} {category} {i}'
+        choseong = get_choseong(product_name)
+        price = int(rng.integers(20, 200)) * 1000
+        colors = rng.choice(COLORS, size=spec['colors_per_product'], replace=False)
+
+        for color in sorted(colors):
+            for size in SIZES:
+                barcode = f'{product_number}{color}{size}'
+                records.append({
+                    'product_number': product_number,
+                    'product_number_cleaned': clean_string_upper(product_number),
+                    'product_name': product_name,
+                    'product_name_choseong': choseong,
+                    'release_year': year,
+                    'item_category': category,
+                    'is_favorite': 1 if i % 50 == 0 else 0,
+                    'barcode': barcode,
+                    'barcode_cleaned': clean_string_upper(barcode),
+                    'color': color,
+                    'size': size,
+                    'original_price': price,
+                    'sale_price': price if i % 3 else int(price * 0.7),
+                    'hq_stock': int(rng.integers(0, 100))
+                })
+    return records
+
+def _create_catalog(brand_id, records):
+    products = {}
+    for r in records:
+        if r['product_number_cleaned'] not in products:
+            products[r['product_number_cleaned']] = {
+                'brand_id': brand_id,
+                'product_number': r['product_number'],
+                'product_name': r['product_name'],
+                'product_number_cleaned': r['product_number_cleaned'],
+                'product_name_cleaned': clean_string_upper(r['product_name']),
+                'product_name_choseong': r['product_name_choseong'],
+                'release_year': r['release_year'],
+                'item_category': r['item_category'],
+                'is_favorite': r['is_favorite']
+            }
+    _insert_chunks(Product, list(products.values()))
+
+    product_ids = dict(db.session.execute(
+        select(Product.product_number_cleaned, Product.id).where(Product.brand_id == brand_id)
+    ).all())
+    _insert_chunks(Variant, [{
+        'product_id': product_ids[r['product_number_cleaned']],
+        'barcode': r['barcode'],
+        'barcode_cleaned': r['barcode_cleaned'],
+        'color': r['color'],
+        'size': r['size'],
+        'color_cleaned': clean_string_upper(r['color']),
+        'size_cleaned': clean_string_upper(r['size']),
+        'original_price': r['original_price'],
+        'sale_price': r['sale_price'],
+        'hq_quantity': r['hq_stock']
+    } for r in records])
+
+    rows = db.session.execute(
+        select(Variant.id, Variant.product_id, Variant.barcode_cleaned, Variant.sale_price, Product.product_number_cleaned)
+        .join(Product).where(Product.brand_id == brand_id).order_by(Variant.id)
+    ).all()
+    return np.array(sorted(product_ids.values()), dtype=np.int64), rows
+
+def _create_stocks(store_ids, variant_ids, spec, rng):
+    """매장마다 stock_ratio 만큼의 옵션에 0~20개 재고 (매장 단위로 INSERT 해 메모리 사용 제한)"""
+    for store_id in store_ids:
+        held = variant_ids[rng.random(len(variant_ids)) < spec['stock_ratio']]
+        quantities = rng.integers(0, 21, size=len(held))
+        _insert_chunks(StoreStock, [
+            {'store_id': store_id, 'variant_id': int(v), 'quantity': int(q)}
+            for v, q in zip(held.tolist(), quantities.tolist())
+        ])
+
+def _create_sales(store_ids, variants, spec, rng, user_id):
+    """매장/일자별 판매 (영수증 번호 형식과 일 번호는 SalesService.create_sale 과 동일)"""
+    variant_ids = np.array([v.id for v in variants], dtype=np.int64)
+    prices = {v.id: v.sale_price or 0 for v in variants}
+    # 인기 상품 쏠림: 앞쪽 옵션일수록 많이 팔리도록 Zipf 분포 인덱스
+    popularity = np.minimum(rng.zipf(1.3, size=1_000_000) - 1, len(variant_ids) - 1)
+    pick = 0
+    today = date.today()
+    sale_count = 0
+
+    for store_id in store_ids:
+        for day_offset in range(spec['days'], 0, -1):
+            sale_date = today - timedelta(days=day_offset)
+            n_sales = int(rng.poisson(spec['sales_per_store_day']))
+            if not n_sales:
+                continue
+            sale_rows = [{
+                'store_id': store_id, 'user_id': user_id, 'sale_date': sale_date,
+                'daily_number': n, 'receipt_number': f"{sale_date.strftime('%Y%m%d')}-{store_id}-{n:04d}",
+                'payment_method': '카드', 'status': SaleStatus.VALID, 'is_online': False, 'total_amount': 0
+            } for n in range(1, n_sales + 1)]
+            sale_ids = db.session.scalars(
+                insert(Sale).returning(Sale.id, sort_by_parameter_order=True), sale_rows
+            ).all()
+
+            item_rows = []
+            for sale_id in sale_ids:
+                n_items = int(rng.integers(1, spec['max_items_per_sale'] + 1))
+                if pick + n_items > len(popularity):
+                    pick = 0
+                for idx in popularity[pick:pick + n_items]:
+                    variant_id = int(variant_ids[idx])
+                    price = prices[variant_id]
+                    item_rows.append({
+                        'sale_id': sale_id, 'variant_id': variant_id, 'quantity': 1,
+                        'original_price': price, 'unit_price': price, 'discount_amount': 0,
+                        'discounted_price': price, 'subtotal': price
+                    })
+                pick += n_items
+            _insert_chunks(SaleItem, item_rows)
+            sale_count += n_sales
+        db.session.commit()
+
+    # 판매 합계 금액은 상세 합으로 한 번에 맞춤
+    totals = select(func.sum(SaleItem.subtotal)).where(SaleItem.sale_id == Sale.id).scalar_subquery()
+    db.session.execute(Sale.__table__.update().where(Sale.store_id.in_(store_ids)).values(total_amount=totals))
+    return sale_count
+
+def generate_dataset(spec, seed=42, brand_name='BENCH'):
+    """
+    벤치마크 브랜드 1개(+ 전체 초기화 시나리오용 빈 브랜드)를 만들고 시나리오에서 쓸 식별자 반환
+    반환: dict (brand_id, import_brand_id, store_ids, user_id, product_ids, variant_ids,
+          barcodes / barcode_products (병렬 목록), search_terms, counts)
+    """
+    rng = np.random.default_rng(seed)
+
+    brand = Brand(brand_name=brand_name)
+    import_brand = Brand(brand_name=f'{brand_name}_IMPORT')
+    db.session.add_all([brand, import_brand])
+    db.session.flush()
+
+    _insert_chunks(Store, [{
+        'brand_id': brand.id, 'store_name': f'벤치매장{i:03d}', 'store_code': f'S{i:03d}',
+        'is_registered': True, 'is_approved': True, 'is_active': True
+    } for i in range(1, spec['stores'] + 1)])
+    store_ids = db.session.scalars(select(Store.id).where(Store.brand_id == brand.id).order_by(Store.id)).all()
+
+    user = User(username='bench', password_hash='-', role='staff', brand_id=brand.id,
+                store_id=store_ids[0], is_active=True)
+    db.session.add(user)
+    db.session.flush()
+
+    records = build_product_records(spec, rng)
+    product_ids, variants = _create_catalog(brand.id, records)
+    variant_ids = np.array([v.id for v in variants], dtype=np.int64)
+    db.session.commit()
+
+    _create_stocks(store_ids, variant_ids, spec, rng)
+    db.session.commit()
+    rebuild_stock_totals(brand.id)
+    db.session.commit()
+
+    sale_count = _create_sales(store_ids, variants, spec, rng, user.id)
+    rebuild_sales_rollup(store_ids)
+    db.session.commit()
+
+    product_numbers = sorted({r['product_number'] for r in records})
+    return {
+        'seed': seed,
+        'brand_id': brand.id,
+        'import_brand_id': import_brand.id,
+        'store_ids': list(store_ids),
+        'user_id': user.id,
+        'product_ids': product_ids.tolist(),
+        'variant_ids': variant_ids.tolist(),
+        'barcodes': [v.barcode_cleaned for v in variants],
+        'barcode_products': [v.product_number_cleaned for v in variants],
+        # 품번 일부 / 품명 단어 / 초성 / 결과 없음 검색어를 섞어 사용
+        'search_terms': [pn[:6] for pn in product_numbers[::max(len(product_numbers) // 20, 1)]]
+                        + NAME_WORDS + [get_choseong(w) for w in NAME_WORDS[:3]] + ['ZZZNOTFOUND'],
+        'counts': {
+            'stores': len(store_ids),
+            'products': len(product_ids),
+            'variants': len(variant_ids),
+            'store_stocks': db.session.scalar(select(func.count()).select_from(StoreStock)),
+            'sales': sale_count,
+            'sale_items': db.session.scalar(select(func.count()).select_from(SaleItem))
+        }
+    }
@@ -0,0 +1,446 @@
+"""
+동시 POS 부하 테스트
+
+매장별 캐셔 스레드가 판매(/api/sales), 전체 환불, 매장 간 수평이동(요청 -> 출고 -> 입고)을 섞어 실행하고
+처리량, 지연시간 히스토그램, 교착/락 대기 초과 건수, 종료 후 재고 정합성(StockHistory 대비)을 JSON 으로 기록한다.
+
+- client 모드(기본): 같은 프로세스의 Flask 테스트 클라이언트를 스레드마다 사용
+- http 모드: 실행 중인 gunicorn 등에 실제 HTTP 요청 (--base-url). 서버는 같은 DB 와 같은 SECRET_KEY 로 띄울 것
+데이터는 이 도구가 --database-url 의 DB 를 초기화한 뒤 생성한다. (전용 DB 사용)
+
+    python -m benchmarks.loadtest --database-url postgresql://.../flowork_load --cashiers 32 --duration 60
+    SECRET_KEY=... python -m benchmarks.loadtest --database-url ... --mode http --base-url http://localhost:5000
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import select, func
+from flask_wtf.csrf import generate_csrf
+from flask import session
+from config import Config
+from flowork import create_app
+from flowork.extensions import db
+from flowork.models import User, StoreStock, StockHistory, VariantStockTotal, Sale
+from benchmarks.datagen import SCALES, generate_dataset
+from benchmarks.runner import PERCENTILES, _git_commit
+
+ACTIONS = ('sale', 'refund', 'transfer')
+HISTOGRAM_BOUNDS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+OUTCOMES = ('ok', 'rejected', 'deadlock', 'lock_timeout', 'error')
+
+DEADLOCK_RE = re.compile(r'deadlock', re.I)
+LOCK_TIMEOUT_RE = re.compile(
+    r'lock timeout|could not obtain lock|database is locked|could not serialize|statement timeout', re.I
+)
+# 재고 부족/상태 불일치 등 정상적인 업무 거절
+REJECT_RE = re.compile(r'부족|상태|이미|권한')
+
+def classify(status_code, data):
+    message = str((data or {}).get('message', ''))
+    if DEADLOCK_RE.search(message):
+        return 'deadlock'
+    if LOCK_TIMEOUT_RE.search(message):
+        return 'lock_timeout'
+    if status_code == 200 and (data or {}).get('status') == 'success':
+        return 'ok'
+    if REJECT_RE.search(message) or 400 <= status_code < 500:
+        return 'rejected'
+    return 'error'
+
+class ClientTransport:
+    """같은 프로세스의 Flask 테스트 클라이언트 (매장 계정별 클라이언트, 스레드마다 따로 생성)"""
+    def __init__(self, app, store_users):
+        self.app = app
+        self.store_users = store_users
+        self.clients = {}
+
+    def _client(self, store_id):
+        client = self.clients.get(store_id)
+        if client is None:
+            client = self.app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(self.store_users[store_id])
+                sess['_fresh'] = True
+            self.clients[store_id] = client
+        return client
+
+    def post(self, store_id, path, payload=None):
+        resp = self._client(store_id).post(path, json=payload or {})
+        return resp.status_code, resp.get_json(silent=True)
+
+class HttpTransport:
+    """실행 중인 서버로 HTTP 요청. 세션 쿠키/CSRF 토큰은 같은 SECRET_KEY 로 직접 서명해 만듦"""
+    def __init__(self, base_url, credentials, timeout):
+        import requests
+        self.http = requests.Session()
+        self.base_url = base_url.rstrip('/')
+        self.credentials = credentials
+        self.timeout = timeout
+
+    @staticmethod
+    def build_credentials(app, store_users):
+        serializer = app.session_interface.get_signing_serializer(app)
+        cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+        credentials = {}
+        for store_id, user_id in store_users.items():
+            with app.test_request_context():
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+                token = generate_csrf()
+                credentials[store_id] = {
+                    'Cookie': f'{cookie_name}={serializer.dumps(dict(session))}',
+                    'X-CSRFToken': token
+                }
+        return credentials
+
+    def post(self, store_id, path, payload=None):
+        resp = self.http.post(self.base_url + path, json=payload or {},
+                              headers=self.credentials[store_id], timeout=self.timeout)
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {'message': resp.text[:200]}
+        return resp.status_code, data
+
+class Stats:
+    """동작별 결과/지연시간 누적 (스레드 공용)"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: dict.fromkeys(OUTCOMES, 0))
+        self.samples = defaultdict(list)
+
+    def record(self, action, outcome, elapsed_ms, message=None):
+        with self.lock:
+            self.outcomes[action][outcome] += 1
+            if outcome == 'ok':
+                self.latencies[action].append(elapsed_ms)
+            elif outcome != 'rejected' and len(self.samples[outcome]) < 5:
+                self.samples[outcome].append(f'{action}: {message}')
+
+def _timed(stats, action, transport, store_id, path, payload=None):
+    start = time.perf_counter()
+    try:
+        status_code, data = transport.post(store_id, path, payload)
+    except Exception as e:
+        status_code, data = 599, {'message': str(e)}
+    elapsed = (time.perf_counter() - start) * 1000
+    outcome = classify(status_code, data)
+    stats.record(action, outcome, elapsed, (data or {}).get('message'))
+    return outcome, data or {}
+
+class Cashier(threading.Thread):
+    """매장 1곳의 계산대. 종료 시각(또는 최대 횟수)까지 판매/환불/수평이동을 가중치대로 반복"""
+    def __init__(self, idx, ctx, transport, stats, deadline, max_ops, think_ms):
+        super().__init__(name=f'cashier-{idx}', daemon=True)
+        self.ctx = ctx
+        self.transport = transport
+        self.stats = stats
+        self.deadline = deadline
+        self.max_ops = max_ops
+        self.think = think_ms / 1000.0
+        self.store_id = ctx['store_ids'][idx % len(ctx['store_ids'])]
+        self.rng = np.random.default_rng(ctx['seed'] + idx)
+        self.my_sales = []
+
+    def _variants(self, n):
+        # 인기 옵션 집합에서 Zipf 로 골라 같은 재고 행에 경합이 생기도록
+        hot = self.ctx['hot_variant_ids']
+        picks = np.minimum(self.rng.zipf(1.2, size=n) - 1, len(hot) - 1)
+        return sorted({hot[p] for p in picks.tolist()})
+
+    def sale(self):
+        items = [{'variant_id': v, 'quantity': 1} for v in self._variants(int(self.rng.integers(1, 4)))]
+        outcome, data = _timed(self.stats, 'sale', self.transport, self.store_id, '/api/sales',
+                               {'items': items, 'payment_method': '카드'})
+        if outcome == 'ok' and data.get('sale_id'):
+            self.my_sales.append(data['sale_id'])
+
+    def refund(self):
+        if not self.my_sales:
+            return self.sale()
+        sale_id = self.my_sales.pop(int(self.rng.integers(0, len(self.my_sales))))
+        _timed(self.stats, 'refund', self.transport, self.store_id, f'/api/sales/{sale_id}/refund')
+
+    def transfer(self):
+        stores = self.ctx['store_ids']
+        if len(stores) < 2:
+            return self.sale()
+        source = self.store_id
+        while source == self.store_id:
+            source = stores[int(self.rng.integers(0, len(stores)))]
+        variant_id = self._variants(1)[0]
+
+        # 요청(받는 매장) -> 출고(보내는 매장) -> 입고(받는 매장), 한 흐름의 지연시간으로 기록
+        start = time.perf_counter()
+        steps = [
+            (self.store_id, '/api/stock_transfer/request', {'source_store_id': source, 'variant_id': variant_id, 'quantity': 1}),
+            (source, '/api/stock_transfer/{id}/ship', None),
+            (self.store_id, '/api/stock_transfer/{id}/receive', None),
+        ]
+        transfer_id = None
+        for store_id, path, payload in steps:
+            try:
+                status_code, data = self.transport.post(store_id, path.format(id=transfer_id), payload)
+            except Exception as e:
+                status_code, data = 599, {'message': str(e)}
+            outcome = classify(status_code, data)
+            if outcome != 'ok':
+                self.stats.record('transfer', outcome, 0, (data or {}).get('message'))
+                return
+            transfer_id = transfer_id or data.get('transfer_id')
+        self.stats.record('transfer', 'ok', (time.perf_counter() - start) * 1000)
+
+    def run(self):
+        actions = [getattr(self, name) for name in ACTIONS]
+        weights = np.array([self.ctx['mix'][name] for name in ACTIONS], dtype=float)
+        weights /= weights.sum()
+        done = 0
+        while time.monotonic() < self.deadline and (not self.max_ops or done < self.max_ops):
+            actions[int(self.rng.choice(len(actions), p=weights))]()
+            done += 1
+            if self.think:
+                time.sleep(self.think)
+
+def _histogram(values):
+    counts = np.histogram(values, bins=[0, *HISTOGRAM_BOUNDS_MS, np.inf])[0].tolist() if values else []
+    labels = [f'<={b}ms' for b in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+    return dict(zip(labels, counts)) if counts else {}
+
+def summarize(stats, elapsed):
+    actions = {}
+    for action in ACTIONS:
+        latencies = np.array(stats.latencies[action])
+        outcomes = stats.outcomes[action]
+        actions[action] = {
+            **outcomes,
+            'throughput_per_s': round(outcomes['ok'] / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': {
+                **{f'p{p}': round(float(np.percentile(latencies, p)), 2) for p in PERCENTILES},
+                'max': round(float(latencies.max()), 2)
+            } if len(latencies) else {},
+            'histogram': _histogram(stats.latencies[action])
+        }
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'actions': actions,
+        'deadlocks': sum(stats.outcomes[a]['deadlock'] for a in ACTIONS),
+        'lock_timeouts': sum(stats.outcomes[a]['lock_timeout'] for a in ACTIONS),
+        'errors': sum(stats.outcomes[a]['error'] for a in ACTIONS),
+        'error_samples': dict(stats.samples)
+    }
+
+def stock_state():
+    """부하 전 기준점: ({(store_id, variant_id): 수량}, 마지막 StockHistory id)"""
+    rows = db.session.execute(select(StoreStock.store_id, StoreStock.variant_id, StoreStock.quantity)).all()
+    last_history_id = db.session.scalar(select(func.coalesce(func.max(StockHistory.id), 0)))
+    return {(s, v): q or 0 for s, v, q in rows}, last_history_id
+
+def check_consistency(initial, last_history_id, sample_size=10):
+    """
+    부하 후 재고 정합성
+    - ledger: 최종 재고 - 시작 재고 == 부하 중 StockHistory 증감 합
+    - last_history: (매장, 옵션)별 마지막 이력의 current_quantity == 최종 재고
+    - totals: 부하 중 변경된 옵션의 합계 테이블 == 매장 재고 합
+    """
+    db.session.remove()
+    final, _ = stock_state()
+
+    deltas, last_quantity = {}, {}
+    rows = db.session.execute(
+        select(StockHistory.store_id, StockHistory.variant_id, StockHistory.quantity_change, StockHistory.current_quantity)
+        .where(StockHistory.id > last_history_id).order_by(StockHistory.id)
+    )
+    for store_id, variant_id, change, current in rows:
+        key = (store_id, variant_id)
+        deltas[key] = deltas.get(key, 0) + change
+        last_quantity[key] = current
+
+    ledger = [
+        {'store_id': k[0], 'variant_id': k[1], 'start': initial.get(k, 0), 'final': final.get(k, 0), 'history': deltas.get(k, 0)}
+        for k in set(initial) | set(final)
+        if final.get(k, 0) - initial.get(k, 0) != deltas.get(k, 0)
+    ]
+    last_history = [
+        {'store_id': k[0], 'variant_id': k[1], 'history': q, 'final': final.get(k, 0)}
+        for k, q in last_quantity.items() if q != final.get(k, 0)
+    ]
+
+    touched = sorted({v for _, v in deltas})
+    totals = []
+    if touched:
+        store_sums = dict(db.session.execute(
+            select(StoreStock.variant_id, func.sum(StoreStock.quantity))
+            .where(StoreStock.variant_id.in_(touched)).group_by(StoreStock.variant_id)
+        ).all())
+        table = dict(db.session.execute(
+            select(VariantStockTotal.variant_id, VariantStockTotal.quantity).where(VariantStockTotal.variant_id.in_(touched))
+        ).all())
+        totals = [
+            {'variant_id': v, 'total_table': table.get(v, 0), 'store_sum': int(store_sums.get(v) or 0)}
+            for v in touched if table.get(v, 0) != int(store_sums.get(v) or 0)
+        ]
+
+    return {
+        'ok': not (ledger or last_history or totals),
+        'touched_pairs': len(deltas),
+        'ledger_mismatches': len(ledger),
+        'last_history_mismatches': len(last_history),
+        'total_table_mismatches': len(totals),
+        'samples': {'ledger': ledger[:sample_size], 'last_history': last_history[:sample_size], 'totals': totals[:sample_size]}
+    }
+
+def prepare_load_context(dataset, mix, hot_skus, seed):
+    """매장별 캐셔 계정 생성 + 부하에 쓸 식별자 (generate_dataset 결과 기반)"""
+    store_users = {}
+    for store_id in dataset['store_ids']:
+        user = User(username=f'cashier_{store_id}', password_hash='-', role='staff',
+                    brand_id=dataset['brand_id'], store_id=store_id, is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        store_users[store_id] = user.id
+    db.session.commit()
+
+    return {
+        'seed': seed,
+        'brand_id': dataset['brand_id'],
+        'store_ids': dataset['store_ids'],
+        'store_users': store_users,
+        'hot_variant_ids': dataset['variant_ids'][:max(hot_skus, 1)],
+        'mix': mix
+    }
+
+def run_load(ctx, make_transport, cashiers, duration, max_ops=0, think_ms=0):
+    """
+    캐셔 스레드 실행 후 결과 요약 + 정합성 검사
+    make_transport(): 스레드마다 새 전송 객체
+    """
+    initial, last_history_id = stock_state()
+    last_sale_id = db.session.scalar(select(func.coalesce(func.max(Sale.id), 0)))
+    db.session.remove()
+
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    workers = [Cashier(i, ctx, make_transport(), stats, deadline, max_ops, think_ms) for i in range(cashiers)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(stats, elapsed)
+    summary['sales_created'] = db.session.scalar(select(func.count()).where(Sale.id > last_sale_id))
+    summary['consistency'] = check_consistency(initial, last_history_id)
+    return summary
+
+def _parse_mix(text):
+    mix = dict.fromkeys(ACTIONS, 0)
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in mix:
+            raise argparse.ArgumentTypeError(f'알 수 없는 동작: {name}')
+        mix[name.strip()] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError('가중치 합이 0 입니다.')
+    return mix
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description='FLOWORK 동시 POS 부하 테스트')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='전용 부하 테스트 DB (미지정 시 임시 SQLite 파일, 동시 쓰기 측정에는 PostgreSQL 권장)')
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--base-url', default='http://localhost:5000', help='http 모드 서버 주소')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--history-days', type=int, default=7, help='미리 만들어 둘 판매 이력 일수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cashiers', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30.0, help='초')
+    parser.add_argument('--max-ops', type=int, default=0, help='캐셔당 최대 동작 수 (0 = 제한 없음)')
+    parser.add_argument('--think-ms', type=float, default=0.0, help='동작 사이 대기 시간')
+    parser.add_argument('--mix', type=_parse_mix, default=_parse_mix('sale=80,refund=10,transfer=10'))
+    parser.add_argument('--hot-skus', type=int, default=200, help='판매/이동 대상 인기 옵션 수 (작을수록 경합 증가)')
+    parser.add_argument('--lock-timeout-ms', type=int, default=0,
+                        help='client 모드 PostgreSQL lock_timeout (0 = 무제한 대기)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='http 모드 요청 타임아웃(초)')
+    parser.add_argument('--output', help='결과 JSON 파일 (미지정 시 표준 출력)')
+    return parser.parse_args(argv)
+
+def _make_config(database_url, cashiers, lock_timeout_ms):
+    class LoadTestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        WTF_CSRF_ENABLED = False
+        CACHE_TYPE = 'SimpleCache'
+
+    if database_url.startswith('sqlite'):
+        LoadTestConfig.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+    else:
+        options = {**Config.SQLALCHEMY_ENGINE_OPTIONS, 'pool_size': cashiers + 5, 'max_overflow': cashiers}
+        if lock_timeout_ms:
+            options['connect_args'] = {'options': f'-c lock_timeout={lock_timeout_ms}'}
+        LoadTestConfig.SQLALCHEMY_ENGINE_OPTIONS = options
+    return LoadTestConfig
+
+def main(argv=None):
+    args = _parse_args(argv)
+    database_url = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='flowork_load_'), 'load.db')
+    app = create_app(_make_config(database_url, args.cashiers, args.lock_timeout_ms))
+    spec = {**SCALES[args.scale], 'days': args.history_days}
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'[load] generating {args.scale} catalog ({db.engine.dialect.name})...', file=sys.stderr)
+        dataset = generate_dataset(spec, seed=args.seed)
+        ctx = prepare_load_context(dataset, args.mix, args.hot_skus, args.seed)
+
+        if args.mode == 'http':
+            credentials = HttpTransport.build_credentials(app, ctx['store_users'])
+            make_transport = lambda: HttpTransport(args.base_url, credentials, args.timeout)
+        else:
+            make_transport = lambda: ClientTransport(app, ctx['store_users'])
+
+        print(f'[load] {args.cashiers} cashiers x {args.duration}s ({args.mode})...', file=sys.stderr)
+        summary = run_load(ctx, make_transport, args.cashiers, args.duration, args.max_ops, args.think_ms)
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'database': db.engine.dialect.name,
+                'mode': args.mode,
+                'cashiers': args.cashiers,
+                'duration_s': args.duration,
+                'mix': args.mix,
+                'hot_skus': args.hot_skus,
+                'lock_timeout_ms': args.lock_timeout_ms,
+                'scale': args.scale,
+                'seed': args.seed
+            },
+            'dataset': dataset['counts'],
+            **summary
+        }
+        db.session.remove()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    sale = report['actions']['sale']
+    print(f"[load] sales {sale['throughput_per_s']}/s, deadlocks {report['deadlocks']}, "
+          f"lock timeouts {report['lock_timeouts']}, errors {report['errors']}, "
+          f"consistency {'OK' if report['consistency']['ok'] else 'FAILED'}", file=sys.stderr)
+    return 0 if report['consistency']['ok'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
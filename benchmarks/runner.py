@@ -0,0 +1,148 @@
+"""
+시나리오 실행/측정과 결과 JSON
+
+- 지연시간: 측정 반복마다 perf_counter (ms), p50/p90/p95/p99/평균/최대
+- 쿼리 수: 엔진 before_cursor_execute 이벤트로 반복당 실행된 SQL 문장 수
+- 최대 메모리: 지연시간 측정이 끝난 뒤 tracemalloc 을 켠 별도 반복에서 Python 할당 증가분의 최대값
+  (tracemalloc 오버헤드가 지연시간에 섞이지 않도록 분리)
+"""
+import gc
+import os
+import sys
+import time
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import sqlalchemy
+from sqlalchemy import event
+from flowork.extensions import db
+
+PERCENTILES = (50, 90, 95, 99)
+
+class QueryCounter:
+    """with 블록 동안 엔진에서 실행된 SQL 문장 수"""
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+def _iteration(prepare, run, i, counter=None):
+    """1회 실행. 준비 단계와 세션 정리는 측정에서 제외. 반환: (경과 ms, 쿼리 수)"""
+    arg = prepare(i) if prepare else None
+    db.session.remove()
+
+    with QueryCounter(db.engine) as queries:
+        start = time.perf_counter()
+        run(i, arg)
+        elapsed = (time.perf_counter() - start) * 1000
+
+    db.session.remove()
+    return elapsed, queries.count
+
+def run_scenario(factory, ctx, iterations, warmup=1, memory_iterations=1):
+    prepare, run = factory(ctx)
+
+    for i in range(warmup):
+        _iteration(prepare, run, i)
+
+    timings, query_counts = [], []
+    for i in range(warmup, warmup + iterations):
+        elapsed, queries = _iteration(prepare, run, i)
+        timings.append(elapsed)
+        query_counts.append(queries)
+
+    peak = 0
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for i in range(warmup + iterations, warmup + iterations + memory_iterations):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            _iteration(prepare, run, i)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    latency = np.array(timings)
+    return {
+        'iterations': iterations,
+        'latency_ms': {
+            **{f'p{p}': round(float(np.percentile(latency, p)), 3) for p in PERCENTILES},
+            'mean': round(float(latency.mean()), 3),
+            'min': round(float(latency.min()), 3),
+            'max': round(float(latency.max()), 3)
+        },
+        'queries': {
+            'mean': round(float(np.mean(query_counts)), 2),
+            'max': int(max(query_counts))
+        },
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def build_report(scale, spec, dataset, results, seed):
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': db.engine.dialect.name,
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'argv': sys.argv[1:],
+            'scale': scale,
+            'seed': seed
+        },
+        'spec': spec,
+        'dataset': dataset['counts'],
+        'scenarios': results
+    }
+
+def compare_reports(base, head):
+    """
+    두 결과의 시나리오별 p50/p95/쿼리 수/메모리 비교 표 (head / base 비율)
+    반환: 출력용 문자열 줄 목록
+    """
+    lines = [
+        f"base {base['meta'].get('commit')} ({base['meta'].get('database')}) -> "
+        f"head {head['meta'].get('commit')} ({head['meta'].get('database')})",
+        f"{'scenario':<28}{'p50 ms':>18}{'p95 ms':>18}{'queries':>14}{'peak KB':>20}"
+    ]
+
+    def cell(b, h):
+        ratio = f'x{h / b:.2f}' if b else '-'
+        return f'{h:,.1f} ({ratio})'
+
+    for name, h in head['scenarios'].items():
+        b = base['scenarios'].get(name)
+        if not b:
+            lines.append(f'{name:<28}{"(new)":>18}')
+            continue
+        lines.append(
+            f"{name:<28}"
+            f"{cell(b['latency_ms']['p50'], h['latency_ms']['p50']):>18}"
+            f"{cell(b['latency_ms']['p95'], h['latency_ms']['p95']):>18}"
+            f"{b['queries']['mean']:>6.1f}->{h['queries']['mean']:<6.1f}"
+            f"{cell(b['peak_memory_kb'], h['peak_memory_kb']):>20}"
+        )
+    return lines
@@ -0,0 +1,123 @@
+"""
+벤치마크 시나리오
+
+각 시나리오는 factory(ctx) -> (prepare, run) 형태
+- prepare(i): 측정에서 제외되는 반복 전 준비 (캐시 무효화, 입력 데이터 생성 등), 반환값을 run 에 전달
+- run(i, arg): 측정 대상 1회 실행
+ctx 는 datagen.generate_dataset() 결과에 client(로그인된 테스트 클라이언트)와 rng 를 더한 dict
+"""
+from datetime import date
+from flowork.services.sales_service import SalesService
+from flowork.services.product_service import ProductService
+from flowork.services.inventory_service import InventoryService
+from flowork.services.stock_matrix import invalidate_stock_matrix
+from benchmarks.datagen import build_product_records
+
+STOCK_UPLOAD_ROWS = 2000
+
+class ScenarioError(Exception):
+    """시나리오 실행 결과가 실패 응답인 경우 (성능 수치를 믿을 수 없으므로 중단)"""
+
+def _check_response(resp):
+    if resp.status_code != 200:
+        raise ScenarioError(f'HTTP {resp.status_code}: {resp.get_data(as_text=True)[:200]}')
+    data = resp.get_json()
+    if data and data.get('status') == 'error':
+        raise ScenarioError(data.get('message'))
+
+def live_search(ctx):
+    terms = ctx['search_terms']
+
+    def run(i, _):
+        _check_response(ctx['client'].post('/api/live_search', json={
+            'query': terms[i % len(terms)], 'category': '전체', 'page': 1, 'per_page': 20
+        }))
+    return None, run
+
+def search_sales_products(ctx):
+    # 바코드 정확 일치(POS 스캔)와 품번/품명 부분 검색을 번갈아 실행
+    barcodes, terms = ctx['barcodes'], ctx['search_terms']
+
+    def run(i, _):
+        query = barcodes[(i * 7919) % len(barcodes)] if i % 2 == 0 else terms[i % len(terms)]
+        _check_response(ctx['client'].post('/api/sales/search_products', json={'query': query, 'mode': 'sales'}))
+    return None, run
+
+def create_sale(ctx):
+    store_id, user_id = ctx['store_ids'][0], ctx['user_id']
+    variant_ids = ctx['variant_ids']
+    today = date.today().strftime('%Y-%m-%d')
+
+    def prepare(i):
+        picks = ctx['rng'].choice(len(variant_ids), size=3, replace=False)
+        return [{'variant_id': variant_ids[p], 'quantity': 1} for p in sorted(picks.tolist())]
+
+    def run(i, items):
+        result = SalesService.create_sale(store_id, user_id, today, items, '카드', False)
+        if result['status'] != 'success':
+            raise ScenarioError(result['message'])
+    return prepare, run
+
+def get_stock_overview_matrix(ctx):
+    # 프로세스 로컬 캐시를 비워 매번 DB 에서 다시 만드는 비용을 측정
+    brand_id = ctx['brand_id']
+
+    def prepare(i):
+        invalidate_stock_matrix(brand_id)
+
+    def run(i, _):
+        ProductService.get_stock_overview_matrix(brand_id)
+    return prepare, run
+
+def get_product_detail_context(ctx):
+    brand_id, store_id = ctx['brand_id'], ctx['store_ids'][0]
+    product_ids = ctx['product_ids']
+
+    def run(i, _):
+        if ProductService.get_product_detail_context(product_ids[(i * 104729) % len(product_ids)], brand_id, store_id) is None:
+            raise ScenarioError('상품 상세 조회 실패')
+    return None, run
+
+def process_stock_data(ctx):
+    # 매장 재고 엑셀 업로드: 기존 바코드의 수량을 새 값으로 덮어쓰기
+    brand_id, store_ids = ctx['brand_id'], ctx['store_ids']
+    barcodes, products = ctx['barcodes'], ctx['barcode_products']
+
+    def prepare(i):
+        rng = ctx['rng']
+        picks = rng.choice(len(barcodes), size=min(STOCK_UPLOAD_ROWS, len(barcodes)), replace=False)
+        quantities = rng.integers(0, 30, size=len(picks))
+        records = [{
+            'product_number_cleaned': products[p],
+            'barcode_cleaned': barcodes[p],
+            'store_stock': int(q)
+        } for p, q in zip(picks.tolist(), quantities.tolist())]
+        return records, store_ids[i % len(store_ids)]
+
+    def run(i, arg):
+        records, store_id = arg
+        InventoryService.process_stock_data(records, 'store', brand_id, target_store_id=store_id, allow_create=False)
+    return prepare, run
+
+def full_import_db(ctx):
+    # 전용 빈 브랜드에 대해 매번 전체 삭제 후 재등록
+    brand_id = ctx['import_brand_id']
+    records = build_product_records(
+        {'products': ctx['import_products'], 'colors_per_product': 3}, ctx['rng'], prefix='I'
+    )
+
+    def run(i, _):
+        success, message = InventoryService.full_import_db(records, brand_id)
+        if not success:
+            raise ScenarioError(message)
+    return None, run
+
+SCENARIOS = {
+    'live_search': live_search,
+    'search_sales_products': search_sales_products,
+    'create_sale': create_sale,
+    'get_stock_overview_matrix': get_stock_overview_matrix,
+    'get_product_detail_context': get_product_detail_context,
+    'process_stock_data': process_stock_data,
+    'full_import_db': full_import_db,
+}
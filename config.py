@@ -47,4 +47,23 @@ class Config:
 
     CACHE_TYPE = 'RedisCache'
     CACHE_REDIS_URL = CELERY_BROKER_URL
-    CACHE_DEFAULT_TIMEOUT = 300
\ No newline at end of file
+    CACHE_DEFAULT_TIMEOUT = 300
+
+    # 통합 재고 매트릭스 프로세스 로컬 캐시 유지 시간(초)
+    STOCK_MATRIX_TTL = int(os.getenv('STOCK_MATRIX_TTL', '60'))
+
+    # 실사재고 일괄 반영 시 이 개수를 넘는 바코드는 Celery 로 처리
+    ACTUAL_STOCK_ASYNC_THRESHOLD = int(os.getenv('ACTUAL_STOCK_ASYNC_THRESHOLD', '5000'))
+
+    # 다중 단말 실사 세션 (Redis, 미지정 시 캐시 Redis 사용)
+    COUNT_SESSION_REDIS_URL = os.getenv('COUNT_SESSION_REDIS_URL')
+    COUNT_SESSION_TTL = int(os.getenv('COUNT_SESSION_TTL', '172800'))
+
+    # 재고 재배치 제안: 판매속도 산출 기간 / 목표 재고일수
+    REBALANCE_SALES_DAYS = int(os.getenv('REBALANCE_SALES_DAYS', '28'))
+    REBALANCE_TARGET_DAYS = int(os.getenv('REBALANCE_TARGET_DAYS', '14'))
+
+    # 판매 분석 결과 캐시 유지 시간(초), 일 마감 배치에서 전체 무효화
+    ANALYTICS_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_CACHE_TIMEOUT', '86400'))
+    # 오늘이 포함된 기간/현재 재고 기준 결과(판매율)의 캐시 유지 시간(초), 0 이면 캐시 안 함
+    ANALYTICS_LIVE_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_LIVE_CACHE_TIMEOUT', '60'))
@@ -8,7 +8,11 @@ from .extensions import db, login_manager, celery_app, migrate, cache, csrf
 from .blueprints.auth import auth_bp
 from .blueprints.ui import ui_bp
 from .blueprints.api import api_bp
-from .commands import init_db_command, create_super_admin
+from .commands import (
+    init_db_command, create_super_admin, rebuild_stock_totals_command,
+    rebuild_sales_rollup_command, create_missing_indexes_command, upgrade_db_command,
+    partition_stock_history_command, archive_stock_history_command
+)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
@@ -30,6 +34,12 @@ def create_app(config_class=Config):
 
     app.cli.add_command(init_db_command)
     app.cli.add_command(create_super_admin)
+    app.cli.add_command(rebuild_stock_totals_command)
+    app.cli.add_command(rebuild_sales_rollup_command)
+    app.cli.add_command(create_missing_indexes_command)
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(partition_stock_history_command)
+    app.cli.add_command(archive_stock_history_command)
 
     from .models import (
         User, Store, Brand, Product, Variant, StoreStock, Sale, SaleItem, 
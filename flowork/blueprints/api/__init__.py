@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api_bp = Blueprint('api', __name__)
 
-from . import inventory, sales, order, admin, tasks, maintenance, stock_transfer, store_order
\ No newline at end of file
+from . import inventory, sales, order, admin, tasks, maintenance, stock_transfer, store_order, stock_overview, stock_snapshot, stock_count, analytics
\ No newline at end of file
@@ -0,0 +1,162 @@
+import traceback
+from datetime import date, datetime, timedelta
+from flask import request, jsonify, current_app
+from flask_login import login_required, current_user
+from flowork.extensions import db
+from flowork.models import Store, Product
+from flowork.services.analytics import AnalyticsService, DIMENSIONS, METRICS, build_size_color_matrix
+from flowork.services.brand_settings import get_brand_settings
+from . import api_bp
+
+DEFAULT_PERIOD_DAYS = 30
+MAX_PERIOD_DAYS = 731
+
+def _analytics_scope(brand_id=None):
+    """
+    조회 범위 (brand_id, store_id, start_date, end_date) 검증
+    매장 계정은 자기 매장만, 관리자는 브랜드 전체 또는 store_id 지정
+    반환: (scope dict, 오류 응답)
+    """
+    if brand_id is None:
+        brand_id = current_user.current_brand_id
+        if current_user.is_super_admin:
+            brand_id = request.args.get('brand_id', type=int) or brand_id
+
+    if current_user.store_id:
+        store_id = current_user.store_id
+    elif current_user.is_admin:
+        store_id = request.args.get('store_id', type=int)
+    else:
+        return None, (jsonify({'status': 'error', 'message': '권한이 없습니다.'}), 403)
+
+    if not brand_id:
+        return None, (jsonify({'status': 'error', 'message': '브랜드 정보가 필요합니다.'}), 400)
+    if store_id:
+        store = db.session.get(Store, store_id)
+        if not store or store.brand_id != brand_id:
+            return None, (jsonify({'status': 'error', 'message': '매장을 찾을 수 없습니다.'}), 404)
+
+    try:
+        end_str = request.args.get('end_date')
+        start_str = request.args.get('start_date')
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else date.today()
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else end_date - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+    except ValueError:
+        return None, (jsonify({'status': 'error', 'message': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400)
+
+    if start_date > end_date or (end_date - start_date).days >= MAX_PERIOD_DAYS:
+        return None, (jsonify({'status': 'error', 'message': '조회 기간이 올바르지 않습니다. (최대 2년)'}), 400)
+
+    return {'brand_id': brand_id, 'store_id': store_id, 'start_date': start_date, 'end_date': end_date}, None
+
+def _scope_json(scope):
+    return {
+        'store_id': scope['store_id'],
+        'start_date': scope['start_date'].strftime('%Y-%m-%d'),
+        'end_date': scope['end_date'].strftime('%Y-%m-%d')
+    }
+
+def _choice(name, choices, default):
+    value = request.args.get(name, default)
+    return value if value in choices else None
+
+@api_bp.route('/api/analytics/top_sellers', methods=['GET'])
+@login_required
+def analytics_top_sellers():
+    """베스트셀러 (dimension=variant|product|category|store, metric=net_amount|quantity, limit)"""
+    scope, error = _analytics_scope()
+    if error:
+        return error
+
+    dimension = _choice('dimension', DIMENSIONS, 'product')
+    metric = _choice('metric', METRICS, 'net_amount')
+    if not dimension or not metric:
+        return jsonify({'status': 'error', 'message': '집계 기준이 올바르지 않습니다.'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+
+    try:
+        items = AnalyticsService.top_sellers(
+            scope['brand_id'], scope['start_date'], scope['end_date'], scope['store_id'],
+            dimension=dimension, metric=metric, limit=limit
+        )
+        return jsonify({'status': 'success', **_scope_json(scope), 'dimension': dimension, 'metric': metric, 'items': items})
+    except Exception as e:
+        current_app.logger.error(f"Analytics top sellers error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '분석 데이터 조회 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/api/analytics/sell_through', methods=['GET'])
+@login_required
+def analytics_sell_through():
+    """판매율 = 판매 / (판매 + 현재 재고) (dimension=variant|product|category|store, limit)"""
+    scope, error = _analytics_scope()
+    if error:
+        return error
+
+    dimension = _choice('dimension', DIMENSIONS, 'product')
+    if not dimension:
+        return jsonify({'status': 'error', 'message': '집계 기준이 올바르지 않습니다.'}), 400
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+
+    try:
+        result = AnalyticsService.sell_through(
+            scope['brand_id'], scope['start_date'], scope['end_date'], scope['store_id'],
+            dimension=dimension, limit=limit
+        )
+        return jsonify({'status': 'success', **_scope_json(scope), 'dimension': dimension, **result})
+    except Exception as e:
+        current_app.logger.error(f"Analytics sell-through error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '분석 데이터 조회 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/api/analytics/abc', methods=['GET'])
+@login_required
+def analytics_abc():
+    """
+    SKU ABC 분류 (metric=net_amount|quantity, a=0.8, b=0.95)
+    응답은 병렬 배열: variant_id / product_number / color / size / value / class
+    """
+    scope, error = _analytics_scope()
+    if error:
+        return error
+
+    metric = _choice('metric', METRICS, 'net_amount')
+    a_share = request.args.get('a', 0.8, type=float)
+    b_share = request.args.get('b', 0.95, type=float)
+    if not metric or not (0 < a_share < b_share <= 1):
+        return jsonify({'status': 'error', 'message': '분류 기준이 올바르지 않습니다.'}), 400
+
+    try:
+        result = AnalyticsService.abc_classification(
+            scope['brand_id'], scope['start_date'], scope['end_date'], scope['store_id'],
+            metric=metric, a_share=a_share, b_share=b_share
+        )
+        return jsonify({'status': 'success', **_scope_json(scope), 'metric': metric, **result})
+    except Exception as e:
+        current_app.logger.error(f"Analytics ABC error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '분석 데이터 조회 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/api/product/<int:product_id>/sales_matrix', methods=['GET'])
+@login_required
+def product_sales_matrix(product_id):
+    """상품 컬러 x 사이즈 판매/재고 매트릭스 (start_date, end_date, store_id - 매장 계정은 자기 매장)"""
+    product = db.session.get(Product, product_id)
+    if not product or (not current_user.is_super_admin and product.brand_id != current_user.current_brand_id):
+        return jsonify({'status': 'error', 'message': '상품을 찾을 수 없습니다.'}), 404
+
+    scope, error = _analytics_scope(product.brand_id)
+    if error:
+        return error
+
+    try:
+        settings = get_brand_settings(product.brand_id)
+        matrix = build_size_color_matrix(
+            product_id, scope['start_date'], scope['end_date'], scope['store_id'],
+            size_order_map=settings.size_order_map
+        )
+        return jsonify({'status': 'success', **_scope_json(scope), 'product_id': product_id, **matrix})
+    except Exception as e:
+        current_app.logger.error(f"Product sales matrix error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '매트릭스 조회 중 오류가 발생했습니다.'}), 500
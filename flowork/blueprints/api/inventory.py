@@ -2,17 +2,24 @@ import os
 import uuid
 import traceback
 import io
-from flask import request, jsonify, send_file, flash, redirect, url_for, abort
+from flask import request, jsonify, send_file, flash, redirect, url_for, abort, current_app
 from flask_login import login_required, current_user
 # [수정] delete, exc 추가
 from sqlalchemy import or_, delete, exc
 from sqlalchemy.orm import selectinload
 
 # [수정] StockHistory, Store 추가
-from flowork.models import db, Product, Variant, StoreStock, Setting, StockHistory, Store
+from flowork.models import db, Product, Variant, StoreStock, StockHistory, Store
 # [수정] get_choseong 추가
 from flowork.utils import clean_string_upper, generate_barcode, get_sort_key, get_choseong
 
+from flowork.services.brand_settings import (
+    get_brand_settings,
+    DEFAULT_IMAGE_URL_PREFIX,
+    DEFAULT_IMAGE_NAMING_RULE
+)
+from flowork.services.inventory_service import InventoryService
+from flowork.services.stock_totals import apply_stock_deltas, delete_stock_totals, rebuild_stock_totals
 from flowork.services.excel import (
     export_db_to_excel,
     export_stock_check_excel,
@@ -21,7 +28,7 @@ from flowork.services.excel import (
 
 from . import api_bp
 from .utils import admin_required, _get_or_create_store_stock
-from flowork.celery_tasks import task_upsert_inventory, task_import_db
+from flowork.celery_tasks import task_upsert_inventory, task_import_db, task_set_actual_stock, task_apply_actual_stock, schedule_filter_facets_rebuild
 
 def _validate_excel_file(file):
     if not file or file.filename == '':
@@ -214,14 +221,12 @@ def live_search():
     per_page = data.get('per_page', 10)
     
     try:
-        setting_prefix = Setting.query.filter_by(brand_id=current_user.current_brand_id, key='IMAGE_URL_PREFIX').first()
-        setting_rule = Setting.query.filter_by(brand_id=current_user.current_brand_id, key='IMAGE_NAMING_RULE').first()
-        
-        img_prefix = setting_prefix.value if setting_prefix else "https://files.ebizway.co.kr/files/10249/Style/"
-        img_rule = setting_rule.value if setting_rule else "{product_number}.jpg"
+        brand_settings = get_brand_settings(current_user.current_brand_id)
+        img_prefix = brand_settings.image_url_prefix
+        img_rule = brand_settings.image_naming_rule
     except:
-        img_prefix = "https://files.ebizway.co.kr/files/10249/Style/"
-        img_rule = "{product_number}.jpg"
+        img_prefix = DEFAULT_IMAGE_URL_PREFIX
+        img_rule = DEFAULT_IMAGE_NAMING_RULE
     
     base_query = Product.query.options(selectinload(Product.variants)).filter(
         Product.brand_id == current_user.current_brand_id
@@ -386,60 +391,51 @@ def bulk_update_actual_stock():
         return jsonify({'status': 'error', 'message': '전송 상품 없음.'}), 400
     
     try:
-        updated = 0
-        unknown = []
-        barcode_map = {clean_string_upper(item.get('barcode', '')): int(item.get('quantity', 0)) for item in items if item.get('barcode')}
-        
+        barcode_map = {}
+        for item in items:
+            barcode = clean_string_upper(item.get('barcode', ''))
+            if barcode:
+                barcode_map[barcode] = int(item.get('quantity', 0))
+
         if not barcode_map:
             return jsonify({'status': 'error', 'message': '유효한 바코드 없음.'}), 400
 
-        variants = db.session.query(Variant).join(Product).filter(
-            Product.brand_id == current_user.current_brand_id,
-            Variant.barcode_cleaned.in_(barcode_map.keys())
-        ).all()
-        
-        variant_id_map = {v.barcode_cleaned: v.id for v in variants}
-        found_barcodes = set(variant_id_map.keys())
-        unknown = [b for b in barcode_map.keys() if b not in found_barcodes]
-        
-        existing_stock = db.session.query(StoreStock).filter(
-            StoreStock.store_id == target_store_id,
-            StoreStock.variant_id.in_(variant_id_map.values())
-        ).all()
-        
-        stock_map = {s.variant_id: s for s in existing_stock}
-        
-        new_stock_entries = []
-        for barcode_cleaned, variant_id in variant_id_map.items():
-            new_actual_qty = barcode_map[barcode_cleaned]
-            
-            if variant_id in stock_map:
-                stock_map[variant_id].actual_stock = new_actual_qty
-                updated += 1
-            else:
-                new_stock = StoreStock(
-                    store_id=target_store_id,
-                    variant_id=variant_id,
-                    quantity=0,
-                    actual_stock=new_actual_qty
-                )
-                new_stock_entries.append(new_stock)
-                updated += 1
+        # 대용량(매장 전체 실사 등)은 백그라운드 처리
+        threshold = current_app.config.get('ACTUAL_STOCK_ASYNC_THRESHOLD', 5000)
+        if data.get('async') or len(barcode_map) > threshold:
+            task = task_set_actual_stock.delay(int(target_store_id), current_user.current_brand_id, barcode_map)
+            return jsonify({'status': 'success', 'task_id': task.id, 'message': '실사재고 반영 작업을 시작했습니다.'})
+
+        updated, unknown = InventoryService.set_actual_stock(
+            int(target_store_id), current_user.current_brand_id, barcode_map
+        )
 
-        if new_stock_entries:
-            db.session.add_all(new_stock_entries)
-            
-        db.session.commit()
         msg = f"목록 {len(items)}개 항목 (SKU {updated}개) 실사재고 업데이트 완료."
         if unknown: 
             flash(f"DB에 없는 바코드 {len(unknown)}개: {', '.join(unknown[:5])}...", 'warning')
         flash(msg, 'success')
-        return jsonify({'status': 'success', 'message': msg})
+        return jsonify({'status': 'success', 'message': msg, 'updated': updated, 'unknown': unknown})
     except Exception as e: 
         db.session.rollback()
         print(f"Bulk update error: {e}")
         return jsonify({'status': 'error', 'message': f'서버 오류: {e}'}), 500
 
+@api_bp.route('/api/apply_actual_stock', methods=['POST'])
+@admin_required
+def apply_actual_stock():
+    """실사재고를 전산재고로 반영 (백그라운드 작업, 결과에 분류별 조정 합계 포함)"""
+    data = request.get_json(silent=True) or {}
+    if current_user.store_id:
+        target_store_id = current_user.store_id
+    else:
+        target_store_id = data.get('target_store_id')
+        store = db.session.get(Store, int(target_store_id)) if target_store_id else None
+        if not store or (not current_user.is_super_admin and store.brand_id != current_user.current_brand_id):
+            return jsonify({'status': 'error', 'message': '매장 권한 오류 또는 매장 미지정.'}), 403
+
+    task = task_apply_actual_stock.delay(int(target_store_id), current_user.id)
+    return jsonify({'status': 'success', 'task_id': task.id, 'message': '실사 반영 작업을 시작했습니다.'})
+
 @api_bp.route('/api/fetch_variant', methods=['POST'])
 @login_required
 def api_fetch_variant():
@@ -558,6 +554,7 @@ def update_stock():
             db.session.flush()
         
         new_stock = max(0, stock.quantity + change)
+        apply_stock_deltas({variant.id: new_stock - stock.quantity})
         stock.quantity = new_stock
         db.session.commit()
         
@@ -659,8 +656,7 @@ def api_update_product_details():
         return jsonify({'status': 'error', 'message': '상품 ID 누락'}), 400
 
     try:
-        settings_query = Setting.query.filter_by(brand_id=current_user.current_brand_id).all()
-        brand_settings = {s.key: s.value for s in settings_query}
+        brand_settings = get_brand_settings(current_user.current_brand_id)
 
         product = Product.query.filter_by(
             id=product_id,
@@ -724,6 +720,7 @@ def api_update_product_details():
                 }
 
         if variant_ids_to_delete:
+             delete_stock_totals(product_ids=[product.id])
              db.session.execute(delete(StoreStock).where(
                  StoreStock.variant_id.in_(variant_ids_to_delete)
              ))
@@ -751,7 +748,10 @@ def api_update_product_details():
             db.session.add_all(variants_to_add)
         
         db.session.flush()
+        if variant_ids_to_delete:
+            rebuild_stock_totals(product_ids=[product.id])
         db.session.commit()
+        schedule_filter_facets_rebuild(current_user.current_brand_id)
         return jsonify({'status': 'success', 'message': '상품 정보가 업데이트되었습니다.'})
 
     except ValueError as ve:
@@ -782,8 +782,10 @@ def api_delete_product(product_id):
 
         product_name = product.product_name
         
+        delete_stock_totals(product_ids=[product.id])
         db.session.delete(product)
         db.session.commit()
+        schedule_filter_facets_rebuild(current_user.current_brand_id)
         
         flash(f"상품 '{product_name}'(ID: {product_id}) 및 하위 옵션/재고가 모두 삭제되었습니다.", 'success')
         
@@ -807,8 +809,7 @@ def api_find_product_details():
         return jsonify({'status': 'error', 'message': '품번 없음.'}), 400
     
     try:
-        settings_query = Setting.query.filter_by(brand_id=current_user.current_brand_id).all()
-        brand_settings = {s.key: s.value for s in settings_query}
+        brand_settings = get_brand_settings(current_user.current_brand_id)
 
         search_term_cleaned = clean_string_upper(pn_query)
         search_like = f"%{search_term_cleaned}%"
@@ -904,11 +905,13 @@ def reset_database_completely():
         
         product_ids_query = db.session.query(Product.id).filter_by(brand_id=brand_id)
 
+        delete_stock_totals(brand_id=brand_id)
         db.session.query(Variant).filter(Variant.product_id.in_(product_ids_query)).delete(synchronize_session=False)
 
         db.session.query(Product).filter_by(brand_id=brand_id).delete(synchronize_session=False)
         
         db.session.commit()
+        schedule_filter_facets_rebuild(brand_id)
         flash("상품, 옵션, 재고 데이터가 초기화되었습니다.", "success")
         
     except exc.IntegrityError:
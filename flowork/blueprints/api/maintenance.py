@@ -8,6 +8,8 @@ from sqlalchemy import delete, text
 
 from flowork.models import db, Order, ProcessingStep, Staff, Setting, User, Store, Brand, Product, Variant, StoreStock, Sale, SaleItem, StockHistory
 from flowork.services.db import sync_missing_data_in_db
+from flowork.services.brand_settings import invalidate_brand_settings
+from flowork.celery_tasks import schedule_filter_facets_rebuild
 from . import api_bp
 from .utils import admin_required
 
@@ -308,6 +310,9 @@ def reset_store_db():
         if engine is None:
             raise Exception("Default bind engine not found.")
 
+        brand_ids = [b[0] for b in db.session.query(Brand.id).all()]
+        db.session.rollback()
+
         tables_to_drop = [
             Staff.__table__,
             Setting.__table__, 
@@ -318,6 +323,9 @@ def reset_store_db():
         
         db.Model.metadata.drop_all(bind=engine, tables=tables_to_drop, checkfirst=True)
         db.Model.metadata.create_all(bind=engine, tables=tables_to_drop, checkfirst=True)
+
+        for brand_id in brand_ids:
+            invalidate_brand_settings(brand_id)
         
         flash("✅ '계정/매장/설정/직원' 테이블이 성공적으로 초기화되었습니다. (모든 계정 삭제됨)", "success")
 
@@ -336,6 +344,8 @@ def sync_missing_data():
          abort(403, description="데이터 동기화는 관리자 계정만 사용할 수 있습니다.")
 
     success, message, category = sync_missing_data_in_db(current_user.current_brand_id)
+    if success:
+        schedule_filter_facets_rebuild(current_user.current_brand_id)
     flash(message, category)
     
     return redirect(url_for('ui.stock_management'))
@@ -4,13 +4,18 @@ import traceback
 from datetime import datetime
 from flask import request, jsonify, send_file
 from flask_login import login_required, current_user
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 from sqlalchemy.orm import selectinload
 import openpyxl
 
-from flowork.models import db, Sale, SaleItem, Setting, StoreStock, Variant, Product, Store, StockHistory
+from flowork.models import (
+    db, Sale, SaleItem, Setting, StoreStock, Variant, Product, Store, StockHistory,
+    SalesDailyRollup, SalesDailyStoreRollup
+)
 from flowork.utils import clean_string_upper, get_sort_key
 from flowork.services.sales_service import SalesService
+from flowork.services.sales_rollup import get_sold_quantity
+from flowork.services.brand_settings import get_brand_settings, invalidate_brand_settings
 from . import api_bp
 
 def _get_target_store_id():
@@ -47,10 +52,11 @@ def sales_settings():
             setting = Setting(brand_id=current_user.current_brand_id, key=SETTING_KEY, value=value_str)
             db.session.add(setting)
         db.session.commit()
+        invalidate_brand_settings(current_user.current_brand_id)
         return jsonify({'status': 'success', 'message': '판매 설정이 저장되었습니다.'})
     else:
-        setting = Setting.query.filter_by(brand_id=current_user.current_brand_id, key=SETTING_KEY).first()
-        config = json.loads(setting.value) if setting and setting.value else {}
+        brand_settings = get_brand_settings(current_user.current_brand_id)
+        config = brand_settings.get_json(SETTING_KEY, {})
         return jsonify({'status': 'success', 'config': config})
 
 @api_bp.route('/api/sales', methods=['POST'])
@@ -79,6 +85,38 @@ def create_sale():
     status_code = 200 if result['status'] == 'success' else 500
     return jsonify(result), status_code
 
+MAX_BULK_SALES = 1000
+
+@api_bp.route('/api/sales/bulk', methods=['POST'])
+@login_required
+def create_sales_bulk():
+    """
+    판매 일괄 등록 (POS/온라인 동기화). 각 판매에 클라이언트가 만든 idempotency_key 필수
+    재전송해도 같은 키는 한 번만 등록되고 기존 판매 정보가 'duplicate' 로 반환됨
+    """
+    store_id = _get_target_store_id()
+    if not store_id: return jsonify({'status': 'error', 'message': '권한 없음 또는 매장 미선택'}), 403
+
+    data = request.get_json(silent=True) or {}
+    sales = data.get('sales')
+    if not isinstance(sales, list) or not sales:
+        return jsonify({'status': 'error', 'message': '판매 내역 없음'}), 400
+    if len(sales) > MAX_BULK_SALES:
+        return jsonify({'status': 'error', 'message': f'한 번에 최대 {MAX_BULK_SALES}건까지 등록할 수 있습니다.'}), 400
+
+    results = SalesService.create_sales_bulk(int(store_id), current_user.id, sales)
+
+    counts = {'created': 0, 'duplicate': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+
+    return jsonify({
+        'status': 'success' if counts['error'] == 0 else 'partial',
+        'message': f"등록 {counts['created']}건, 중복 {counts['duplicate']}건, 실패 {counts['error']}건",
+        'counts': counts,
+        'results': results
+    })
+
 @api_bp.route('/api/sales/search_products', methods=['POST'])
 @login_required
 def search_sales_products():
@@ -142,8 +180,7 @@ def search_sales_products():
         
         if not product: return jsonify({'status': 'error', 'variants': []})
         
-        settings_query = Setting.query.filter_by(brand_id=current_user.current_brand_id).all()
-        brand_settings = {s.key: s.value for s in settings_query}
+        brand_settings = get_brand_settings(current_user.current_brand_id)
         
         variants = db.session.query(Variant).filter_by(product_id=product.id).all()
         variants.sort(key=lambda v: get_sort_key(v, brand_settings))
@@ -169,10 +206,18 @@ def search_sales_products():
             })
         return jsonify({'status': 'success', 'variants': result_vars})
 
-    products = Product.query.filter(
+    products = Product.query.options(selectinload(Product.variants)).filter(
         Product.brand_id == current_user.current_brand_id,
         search_filter
     ).limit(50).all()
+
+    # 매장 재고는 검색 결과 전체 옵션을 한 번에 조회 (합계 테이블은 전 매장 합계라 매장별 수량에는 사용 불가)
+    store_stock_map = {}
+    if mode == 'sales' and store_id and products:
+        store_stock_map = dict(db.session.query(StoreStock.variant_id, StoreStock.quantity).filter(
+            StoreStock.store_id == store_id,
+            StoreStock.variant_id.in_([v.id for p in products for v in p.variants])
+        ).all())
     
     results = []
     for p in products:
@@ -183,9 +228,8 @@ def search_sales_products():
             'year': p.release_year,
         }
         
-        variants_all = Variant.query.filter_by(product_id=p.id).all()
         color_map = {}
-        for v in variants_all:
+        for v in sorted(p.variants, key=lambda v: v.id):
             if v.color not in color_map:
                 color_map[v.color] = {'ids': [], 'org': v.original_price, 'sale': v.sale_price}
             color_map[v.color]['ids'].append(v.id)
@@ -199,24 +243,13 @@ def search_sales_products():
             stat_qty = 0
             
             if mode == 'sales' and store_id:
-                stocks = db.session.query(func.sum(StoreStock.quantity)).filter(
-                    StoreStock.store_id == store_id,
-                    StoreStock.variant_id.in_(v_data['ids'])
-                ).scalar()
-                stat_qty = stocks if stocks else 0
+                stat_qty = sum(store_stock_map.get(vid) or 0 for vid in v_data['ids'])
                 
             elif mode == 'refund' and store_id:
                 start_dt = data.get('start_date')
                 end_dt = data.get('end_date')
                 if start_dt and end_dt:
-                    sold = db.session.query(func.sum(SaleItem.quantity)).join(Sale).filter(
-                        Sale.store_id == store_id,
-                        Sale.sale_date >= start_dt,
-                        Sale.sale_date <= end_dt,
-                        Sale.status == 'valid',
-                        SaleItem.variant_id.in_(v_data['ids'])
-                    ).scalar()
-                    stat_qty = sold if sold else 0
+                    stat_qty = get_sold_quantity(store_id, start_dt, end_dt, v_data['ids'])
             
             row['stat_qty'] = stat_qty
             results.append(row)
@@ -407,8 +440,7 @@ def get_product_variants_for_sale():
     if not product_id: return jsonify({'status': 'error', 'message': 'ID 없음'}), 400
         
     try:
-        settings_query = Setting.query.filter_by(brand_id=current_user.current_brand_id).all()
-        brand_settings = {s.key: s.value for s in settings_query}
+        brand_settings = get_brand_settings(current_user.current_brand_id)
 
         variants = db.session.query(Variant).filter_by(product_id=product_id).all()
         variants.sort(key=lambda v: get_sort_key(v, brand_settings))
@@ -436,6 +468,8 @@ def get_product_variants_for_sale():
 @api_bp.route('/api/init_sales_tables', methods=['GET'])
 def init_sales_tables():
     try:
+        SalesDailyRollup.__table__.drop(db.engine, checkfirst=True)
+        SalesDailyStoreRollup.__table__.drop(db.engine, checkfirst=True)
         SaleItem.__table__.drop(db.engine, checkfirst=True)
         Sale.__table__.drop(db.engine, checkfirst=True)
         db.create_all()
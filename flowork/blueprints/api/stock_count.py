@@ -0,0 +1,111 @@
+import traceback
+from flask import request, jsonify, current_app
+from flask_login import login_required, current_user
+from flowork.extensions import db
+from flowork.models import Store
+from flowork.services.count_session import CountSessionService, CountSessionError
+from . import api_bp
+
+MAX_SCANS_PER_REQUEST = 2000
+
+def _resolve_store(store_id):
+    """매장 계정은 자기 매장만, 관리자는 같은 브랜드 매장만"""
+    if current_user.store_id:
+        store_id = current_user.store_id
+    elif not current_user.is_admin:
+        return None
+
+    if not store_id:
+        return None
+    store = db.session.get(Store, int(store_id))
+    if not store or (not current_user.is_super_admin and store.brand_id != current_user.current_brand_id):
+        return None
+    return store
+
+def _load_session(session_id):
+    """세션 조회 + 접근 권한 확인. 반환: (meta, 오류 응답)"""
+    meta = CountSessionService.get_session(session_id)
+    if not meta or not _resolve_store(meta.get('store_id')):
+        return None, (jsonify({'status': 'error', 'message': '실사 세션을 찾을 수 없습니다.'}), 404)
+    return meta, None
+
+@api_bp.route('/api/count_sessions', methods=['POST'])
+@login_required
+def start_count_session():
+    """매장 실사 세션 시작 (이미 열린 세션이 있으면 합류)"""
+    data = request.get_json(silent=True) or {}
+    store = _resolve_store(data.get('target_store_id'))
+    if not store:
+        return jsonify({'status': 'error', 'message': '매장 권한 오류 또는 매장 미지정.'}), 403
+
+    try:
+        session_id, created = CountSessionService.start_session(store.id, store.brand_id, current_user.id)
+        return jsonify({
+            'status': 'success',
+            'session_id': session_id,
+            'created': created,
+            'progress': CountSessionService.get_progress(session_id)
+        })
+    except Exception as e:
+        current_app.logger.error(f"Count session start error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '실사 세션을 시작할 수 없습니다.'}), 500
+
+@api_bp.route('/api/count_sessions/<session_id>/scans', methods=['POST'])
+@login_required
+def record_count_scans(session_id):
+    """스캔 누적 {scans: [{barcode, quantity}], device_id}"""
+    meta, error = _load_session(session_id)
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    scans = data.get('scans') or []
+    if len(scans) > MAX_SCANS_PER_REQUEST:
+        return jsonify({'status': 'error', 'message': f'한 번에 최대 {MAX_SCANS_PER_REQUEST}건까지 전송할 수 있습니다.'}), 400
+
+    try:
+        total = CountSessionService.record_scans(session_id, scans, data.get('device_id'))
+        return jsonify({'status': 'success', 'total_units': total})
+    except CountSessionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+
+@api_bp.route('/api/count_sessions/<session_id>', methods=['GET'])
+@login_required
+def get_count_session(session_id):
+    """실시간 진행 현황"""
+    meta, error = _load_session(session_id)
+    if error:
+        return error
+    return jsonify({'status': 'success', 'progress': CountSessionService.get_progress(session_id)})
+
+@api_bp.route('/api/count_sessions/<session_id>/flush', methods=['POST'])
+@login_required
+def flush_count_session(session_id):
+    """세션 마감: 누적 스캔을 실사재고/차이로 반영"""
+    meta, error = _load_session(session_id)
+    if error:
+        return error
+
+    try:
+        updated, unknown = CountSessionService.flush_session(session_id)
+        msg = f"SKU {updated}개 실사재고 반영 완료."
+        if unknown:
+            msg += f" (DB에 없는 바코드 {len(unknown)}개)"
+        return jsonify({'status': 'success', 'message': msg, 'updated': updated, 'unknown': unknown})
+    except CountSessionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+    except Exception as e:
+        current_app.logger.error(f"Count session flush error: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': f'서버 오류: {e}'}), 500
+
+@api_bp.route('/api/count_sessions/<session_id>', methods=['DELETE'])
+@login_required
+def cancel_count_session(session_id):
+    """세션 폐기 (반영 없음)"""
+    meta, error = _load_session(session_id)
+    if error:
+        return error
+    CountSessionService.cancel_session(session_id)
+    return jsonify({'status': 'success', 'message': '실사 세션이 취소되었습니다.'})
@@ -0,0 +1,67 @@
+import traceback
+from flask import request, jsonify, current_app
+from flask_login import login_required, current_user
+from flowork.services.stock_matrix import get_stock_matrix
+from . import api_bp
+
+MAX_ROW_LIMIT = 500
+MAX_COL_LIMIT = 100
+
+def _is_truthy(value):
+    return str(value).lower() in ('1', 'true', 'y', 'yes', 'on')
+
+@api_bp.route('/api/stock_overview/grid', methods=['GET'])
+@login_required
+def stock_overview_grid():
+    """
+    통합 재고 그리드 (화면에 보이는 행/열 구간만 반환)
+    - 필터: category, year, pn(품번 접두), nonzero, negative
+    - 정렬: sort=total | store (store_id 필요), order=desc | asc
+    - 구간: row_offset, row_limit, col_offset, col_limit
+    """
+    if not (current_user.is_super_admin or (current_user.is_admin and not current_user.store_id)):
+        return jsonify({'status': 'error', 'message': '통합 재고 현황은 본사 관리자 이상만 조회할 수 있습니다.'}), 403
+
+    if current_user.is_super_admin:
+        brand_id = request.args.get('brand_id', type=int)
+    else:
+        brand_id = current_user.current_brand_id
+
+    if not brand_id:
+        return jsonify({'status': 'error', 'message': '브랜드를 선택해주세요.'}), 400
+
+    try:
+        row_limit = min(max(request.args.get('row_limit', 100, type=int), 1), MAX_ROW_LIMIT)
+        col_limit = min(max(request.args.get('col_limit', 20, type=int), 1), MAX_COL_LIMIT)
+
+        matrix = get_stock_matrix(brand_id)
+
+        rows = matrix.filter_rows(
+            category=request.args.get('category') or None,
+            year=request.args.get('year', type=int),
+            pn_prefix=request.args.get('pn', '').strip() or None,
+            only_nonzero=_is_truthy(request.args.get('nonzero', '')),
+            only_negative=_is_truthy(request.args.get('negative', ''))
+        )
+        rows = matrix.sort_rows(
+            rows,
+            sort_by=request.args.get('sort'),
+            store_id=request.args.get('store_id', type=int),
+            descending=request.args.get('order', 'desc') != 'asc'
+        )
+
+        result = matrix.window(
+            rows,
+            row_offset=request.args.get('row_offset', 0, type=int),
+            row_limit=row_limit,
+            col_offset=request.args.get('col_offset', 0, type=int),
+            col_limit=col_limit
+        )
+        result['status'] = 'success'
+        result['built_at'] = matrix.built_at.strftime('%Y-%m-%d %H:%M:%S')
+        return jsonify(result)
+
+    except Exception as e:
+        current_app.logger.error(f"Error in stock_overview_grid: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '통합 재고 조회 중 오류가 발생했습니다.'}), 500
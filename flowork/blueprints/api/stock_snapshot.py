@@ -0,0 +1,71 @@
+import traceback
+from datetime import datetime, timedelta
+from flask import request, jsonify, current_app
+from flask_login import login_required, current_user
+from flowork.extensions import db
+from flowork.models import Store, Product, Variant
+from flowork.services.snapshot_service import StockSnapshotService
+from . import api_bp
+
+@api_bp.route('/api/stock/as_of', methods=['GET'])
+@login_required
+def stock_as_of():
+    """
+    특정 일자 마감 기준 매장 재고 (date=YYYY-MM-DD, 매장 계정은 자기 매장만)
+    응답은 병렬 배열: variant_id / product_number / product_name / color / size / quantity
+    """
+    if current_user.store_id:
+        store_id = current_user.store_id
+    elif current_user.is_admin:
+        store_id = request.args.get('store_id', type=int)
+    else:
+        store_id = None
+
+    if not store_id:
+        return jsonify({'status': 'error', 'message': '매장 정보가 필요합니다.'}), 400
+
+    store = db.session.get(Store, store_id)
+    if not store or (not current_user.is_super_admin and store.brand_id != current_user.current_brand_id):
+        return jsonify({'status': 'error', 'message': '매장을 찾을 수 없습니다.'}), 404
+
+    try:
+        target_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'status': 'error', 'message': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+
+    try:
+        # 해당 일자 마감 시점 (다음날 0시 직전)
+        as_of = target_date + timedelta(days=1) - timedelta(microseconds=1)
+
+        variant_ids = None
+        pn = request.args.get('product_number', '').strip()
+        if pn:
+            variant_ids = [vid for (vid,) in db.session.query(Variant.id).join(Product).filter(
+                Product.brand_id == store.brand_id,
+                Product.product_number == pn
+            ).all()]
+
+        stock, snapshot = StockSnapshotService.get_stock_as_of(store_id, as_of, variant_ids)
+
+        rows = db.session.query(
+            Variant.id, Product.product_number, Product.product_name, Variant.color, Variant.size
+        ).join(Product).filter(Variant.id.in_(list(stock.keys()))).order_by(
+            Product.product_number, Variant.color, Variant.size
+        ).all() if stock else []
+
+        return jsonify({
+            'status': 'success',
+            'store_id': store_id,
+            'as_of': target_date.strftime('%Y-%m-%d'),
+            'snapshot_taken_at': snapshot.taken_at.strftime('%Y-%m-%d %H:%M:%S') if snapshot else None,
+            'variant_id': [r[0] for r in rows],
+            'product_number': [r[1] for r in rows],
+            'product_name': [r[2] for r in rows],
+            'color': [r[3] for r in rows],
+            'size': [r[4] for r in rows],
+            'quantity': [stock[r[0]] for r in rows]
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error in stock_as_of: {e}")
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': '시점 재고 조회 중 오류가 발생했습니다.'}), 500
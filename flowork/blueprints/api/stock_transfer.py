@@ -1,6 +1,11 @@
 from flask import request, jsonify, abort
 from flask_login import login_required, current_user
+from sqlalchemy import func, or_
+from flowork.extensions import db
+from flowork.models import TransferDocument, StockTransfer
 from flowork.services.transfer_service import TransferService
+from flowork.services.excel import parse_transfer_allocation_excel
+from flowork.celery_tasks import task_suggest_rebalance
 from . import api_bp
 
 @api_bp.route('/api/stock_transfer/request', methods=['POST'])
@@ -63,4 +68,133 @@ def reject_transfer(t_id):
     """출고거부"""
     result = TransferService.reject_transfer(t_id, current_user.store_id)
     status_code = 200 if result['status'] == 'success' else 400
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@api_bp.route('/api/stock_transfer/documents', methods=['POST'])
+@login_required
+def create_transfer_document():
+    """
+    본사 이동 지시서 일괄 등록
+    - JSON: {title, lines: [{source_store_id, target_store_id, variant_id, quantity}]}
+    - 또는 배분표 엑셀 업로드 (multipart: excel_file, title, col_source/col_target/col_barcode/col_qty)
+    """
+    if current_user.store_id or not current_user.is_admin:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 지시할 수 있습니다.'}), 403
+
+    brand_id = current_user.current_brand_id
+    file = request.files.get('excel_file')
+
+    if file:
+        title = request.form.get('title') or file.filename
+        try:
+            lines, errors = parse_transfer_allocation_excel(file, request.form, brand_id)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        if errors:
+            return jsonify({
+                'status': 'error',
+                'message': f'배분표에 오류가 있는 행이 {len(errors)}개 있습니다.',
+                'errors': errors[:200]
+            }), 400
+    else:
+        data = request.get_json(silent=True) or {}
+        title = data.get('title')
+        try:
+            lines = [
+                (l['source_store_id'], l['target_store_id'], l['variant_id'], int(l.get('quantity', 0)))
+                for l in data.get('lines', [])
+            ]
+        except (KeyError, ValueError, TypeError):
+            return jsonify({'status': 'error', 'message': '지시 품목 형식이 올바르지 않습니다.'}), 400
+
+    result = TransferService.create_document(brand_id, current_user.id, lines, title)
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
+@api_bp.route('/api/stock_transfer/documents/<int:doc_id>', methods=['GET'])
+@login_required
+def get_transfer_document(doc_id):
+    """지시서 요약 (매장 계정은 자기 매장 라인만 집계)"""
+    document = db.session.get(TransferDocument, doc_id)
+    if not document or document.brand_id != current_user.current_brand_id:
+        return jsonify({'status': 'error', 'message': '지시서를 찾을 수 없습니다.'}), 404
+
+    query = db.session.query(StockTransfer.status, func.count(), func.sum(StockTransfer.quantity))\
+        .filter(StockTransfer.document_id == doc_id)
+    if current_user.store_id:
+        query = query.filter(or_(StockTransfer.source_store_id == current_user.store_id,
+                               StockTransfer.target_store_id == current_user.store_id))
+    by_status = {status: {'lines': cnt, 'quantity': int(qty or 0)} for status, cnt, qty in query.group_by(StockTransfer.status).all()}
+
+    return jsonify({
+        'status': 'success',
+        'document': {
+            'id': document.id,
+            'title': document.title,
+            'status': document.status,
+            'line_count': document.line_count,
+            'total_quantity': document.total_quantity,
+            'created_at': document.created_at.strftime('%Y-%m-%d %H:%M') if document.created_at else None
+        },
+        'by_status': by_status
+    })
+
+@api_bp.route('/api/stock_transfer/documents/<int:doc_id>/ship', methods=['POST'])
+@login_required
+def ship_transfer_document(doc_id):
+    """지시서 일괄 출고 (매장 계정: 자기 매장 출고분, 본사: 문서 전체)"""
+    if not current_user.store_id and not current_user.is_admin:
+        abort(403)
+    result = TransferService.ship_document(doc_id, current_user.current_brand_id, current_user.id, current_user.store_id)
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
+@api_bp.route('/api/stock_transfer/documents/<int:doc_id>/receive', methods=['POST'])
+@login_required
+def receive_transfer_document(doc_id):
+    """지시서 일괄 입고 (매장 계정: 자기 매장 입고분, 본사: 문서 전체)"""
+    if not current_user.store_id and not current_user.is_admin:
+        abort(403)
+    result = TransferService.receive_document(doc_id, current_user.current_brand_id, current_user.id, current_user.store_id)
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
+@api_bp.route('/api/stock_transfer/rebalance', methods=['POST'])
+@login_required
+def suggest_rebalance():
+    """판매속도/재고일수 기반 재배치 제안 생성 (백그라운드, 결과는 제안 지시서)"""
+    if current_user.store_id or not current_user.is_admin:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 사용할 수 있습니다.'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        days = int(data['days']) if data.get('days') else None
+        target_days = int(data['target_days']) if data.get('target_days') else None
+        min_keep = int(data.get('min_keep', 1))
+    except (ValueError, TypeError):
+        return jsonify({'status': 'error', 'message': '조건 값이 올바르지 않습니다.'}), 400
+
+    task = task_suggest_rebalance.delay(current_user.current_brand_id, current_user.id, days, target_days, min_keep)
+    return jsonify({'status': 'success', 'task_id': task.id, 'message': '재배치 제안 계산을 시작했습니다.'})
+
+@api_bp.route('/api/stock_transfer/documents/<int:doc_id>/confirm', methods=['POST'])
+@login_required
+def confirm_transfer_document(doc_id):
+    """제안 지시서 확정"""
+    if current_user.store_id or not current_user.is_admin:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 확정할 수 있습니다.'}), 403
+    result = TransferService.confirm_document(doc_id, current_user.current_brand_id)
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
+@api_bp.route('/api/stock_transfer/documents/<int:doc_id>', methods=['DELETE'])
+@login_required
+def discard_transfer_document(doc_id):
+    """제안 지시서 폐기 (확정 전만 가능)"""
+    if current_user.store_id or not current_user.is_admin:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 폐기할 수 있습니다.'}), 403
+    deleted = TransferService.discard_draft_documents(current_user.current_brand_id, doc_id)
+    db.session.commit()
+    if not deleted:
+        return jsonify({'status': 'error', 'message': '폐기할 제안 지시서가 없습니다.'}), 404
+    return jsonify({'status': 'success', 'message': '제안 지시서를 폐기했습니다.'})
@@ -1,8 +1,23 @@
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from flowork.services.store_order_service import StoreOrderService
+from flowork.services.excel import parse_store_order_excel
 from . import api_bp
 
+MAX_BATCH_ITEMS = 500
+
+def _batch_items():
+    """일괄 처리 요청 본문 검증. 반환: (items, 오류 응답)"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'status': 'error', 'message': '처리할 항목이 없습니다.'}), 400)
+    if len(items) > MAX_BATCH_ITEMS:
+        return None, (jsonify({'status': 'error', 'message': f'한 번에 최대 {MAX_BATCH_ITEMS}건까지 처리할 수 있습니다.'}), 400)
+    if not all(isinstance(item, dict) for item in items):
+        return None, (jsonify({'status': 'error', 'message': '항목 형식이 올바르지 않습니다.'}), 400)
+    return items, None
+
 # --- 매장 주문 (Store Order) API ---
 
 @api_bp.route('/api/store_orders', methods=['POST'])
@@ -24,6 +39,36 @@ def create_store_order():
     status_code = 200 if result['status'] == 'success' else 400
     return jsonify(result), status_code
 
+@api_bp.route('/api/store_orders/upload', methods=['POST'])
+@login_required
+def upload_store_orders():
+    """매장: 주문서 엑셀 업로드로 일괄 주문 (multipart: excel_file, date, col_barcode/col_qty)"""
+    if not current_user.store_id:
+        return jsonify({'status': 'error', 'message': '매장 계정만 가능합니다.'}), 403
+
+    file = request.files.get('excel_file')
+    if not file:
+        return jsonify({'status': 'error', 'message': '주문서 파일이 없습니다.'}), 400
+
+    try:
+        lines, errors = parse_store_order_excel(file, request.form, current_user.current_brand_id)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    if not lines:
+        return jsonify({'status': 'error', 'message': '주문할 수 있는 품목이 없습니다.', 'errors': errors[:200]}), 400
+
+    result = StoreOrderService.create_orders_bulk(current_user.store_id, lines, request.form.get('date'))
+    if result['status'] == 'success':
+        unknown = [e['barcode'] for e in errors if e['reason'] == '바코드 없음']
+        result['unknown_barcodes'] = list(dict.fromkeys(unknown))
+        result['errors'] = errors[:200]
+        if errors:
+            result['message'] += f' (제외된 행 {len(errors)}개)'
+
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
 @api_bp.route('/api/store_orders/<int:oid>/status', methods=['POST'])
 @login_required
 def update_store_order_status(oid):
@@ -42,6 +87,24 @@ def update_store_order_status(oid):
     status_code = 200 if result['status'] == 'success' else 400
     return jsonify(result), status_code
 
+@api_bp.route('/api/store_orders/batch_status', methods=['POST'])
+@login_required
+def update_store_orders_batch_status():
+    """본사: 주문 일괄 승인/거절 {items: [{id, status, confirmed_quantity}]}"""
+    if current_user.store_id:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 가능합니다.'}), 403
+
+    items, error = _batch_items()
+    if error:
+        return error
+
+    result = StoreOrderService.update_orders_bulk(
+        items, current_user.id,
+        brand_id=None if current_user.is_super_admin else current_user.current_brand_id
+    )
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
+
 
 # --- 매장 반품 (Store Return) API ---
 
@@ -78,4 +141,22 @@ def update_store_return_status(rid):
     )
     
     status_code = 200 if result['status'] == 'success' else 400
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@api_bp.route('/api/store_returns/batch_status', methods=['POST'])
+@login_required
+def update_store_returns_batch_status():
+    """본사: 반품 일괄 승인/거절 {items: [{id, status, confirmed_quantity}]}"""
+    if current_user.store_id:
+        return jsonify({'status': 'error', 'message': '본사 관리자만 가능합니다.'}), 403
+
+    items, error = _batch_items()
+    if error:
+        return error
+
+    result = StoreOrderService.update_returns_bulk(
+        items, current_user.id,
+        brand_id=None if current_user.is_super_admin else current_user.current_brand_id
+    )
+    status_code = 200 if result['status'] == 'success' else 400
+    return jsonify(result), status_code
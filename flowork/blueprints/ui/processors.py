@@ -1,59 +1,23 @@
 from flask_login import current_user
-from flowork.models import Setting
-from flowork.extensions import cache 
+from flowork.services.brand_settings import (
+    get_brand_settings,
+    DEFAULT_IMAGE_URL_PREFIX,
+    DEFAULT_IMAGE_NAMING_RULE
+)
 from . import ui_bp
 from datetime import date
 
 @ui_bp.app_context_processor
 def inject_image_helpers():
-    default_prefix = 'https://files.ebizway.co.kr/files/10249/Style/'
-    default_rule = '{product_number}.jpg'
-
-    prefix = default_prefix
-    rule = default_rule
+    prefix = DEFAULT_IMAGE_URL_PREFIX
+    rule = DEFAULT_IMAGE_NAMING_RULE
     
     try:
         if current_user.is_authenticated and current_user.brand_id:
-            brand_id = current_user.brand_id
-            
-            cache_key_prefix = f'brand_img_prefix_{brand_id}'
-            cache_key_rule = f'brand_img_rule_{brand_id}'
-            
-            # [수정] 캐시 조회 시도 (연결 실패 대비)
-            cached_prefix = None
-            cached_rule = None
-            try:
-                cached_prefix = cache.get(cache_key_prefix)
-                cached_rule = cache.get(cache_key_rule)
-            except Exception:
-                # Redis 연결 오류 시 무시하고 DB 조회로 진행
-                pass
-
-            if cached_prefix and cached_rule:
-                prefix = cached_prefix
-                rule = cached_rule
-            else:
-                # DB 조회
-                setting_prefix = Setting.query.filter_by(
-                    brand_id=brand_id, key='IMAGE_URL_PREFIX'
-                ).first()
-                
-                setting_rule = Setting.query.filter_by(
-                    brand_id=brand_id, key='IMAGE_NAMING_RULE'
-                ).first()
-
-                if setting_prefix and setting_prefix.value:
-                    prefix = setting_prefix.value
-                
-                if setting_rule and setting_rule.value:
-                    rule = setting_rule.value
-                
-                # [수정] 캐시 저장 시도
-                try:
-                    cache.set(cache_key_prefix, prefix, timeout=300)
-                    cache.set(cache_key_rule, rule, timeout=300)
-                except Exception:
-                    pass
+            # 브랜드 설정 전체를 캐시된 객체로 조회 (로컬 TTL + Redis 버전 키)
+            brand_settings = get_brand_settings(current_user.brand_id)
+            prefix = brand_settings.image_url_prefix
+            rule = brand_settings.image_naming_rule
                 
     except Exception:
         # 인증 관련 등 기타 오류 시 기본값 유지
@@ -64,12 +64,15 @@ def stock_overview():
         else:
             target_brand_id = current_user.current_brand_id
 
+        # 셀 데이터는 /api/stock_overview/grid 로 보이는 구간만 조회, 여기서는 매트릭스 캐시만 준비
         data = ProductService.get_stock_overview_matrix(target_brand_id)
+        filter_options = get_filter_options_from_db(target_brand_id) if target_brand_id else {}
 
         context = {
             'active_page': 'stock_overview',
             'brands': brands,
             'target_brand_id': target_brand_id,
+            'filter_options': filter_options,
             **data 
         }
         return render_template('stock_overview.html', **context)
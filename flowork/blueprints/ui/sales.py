@@ -2,9 +2,9 @@ import traceback
 from datetime import date, datetime
 from flask import render_template, request, abort
 from flask_login import login_required, current_user
-from sqlalchemy import func
 
-from flowork.models import db, Sale, SaleItem, Store, Brand
+from flowork.models import db, Sale, Store, Brand
+from flowork.services.sales_rollup import get_sales_summary
 from . import ui_bp
 
 def _get_context_stores():
@@ -114,39 +114,11 @@ def sales_record():
     
     pagination = query.order_by(Sale.created_at.desc()).paginate(page=page, per_page=20, error_out=False)
     
-    # 통계 집계
-    stats_query = db.session.query(
-        func.sum(Sale.total_amount),
-        func.count(Sale.id)
-    ).filter(
-        Sale.sale_date >= start_date,
-        Sale.sale_date <= end_date,
-        Sale.status == 'valid'
-    )
-    
-    if target_store_id:
-        stats_query = stats_query.filter(Sale.store_id == target_store_id)
-        
-    total_amount, total_count = stats_query.first()
-    
-    # 할인 총액
-    discount_q = db.session.query(
-        func.sum(SaleItem.discount_amount * SaleItem.quantity)
-    ).join(Sale).filter(
-        Sale.sale_date >= start_date,
-        Sale.sale_date <= end_date,
-        Sale.status == 'valid'
+    # 통계 집계 (일별 판매 집계 테이블 기준)
+    total_summary = get_sales_summary(
+        start_date, end_date,
+        store_ids=[target_store_id] if target_store_id else None
     )
-    if target_store_id:
-        discount_q = discount_q.filter(Sale.store_id == target_store_id)
-        
-    total_discount = discount_q.scalar()
-    
-    total_summary = {
-        'total_amount': int(total_amount or 0),
-        'total_discount': int(total_discount or 0),
-        'total_count': int(total_count or 0)
-    }
     
     return render_template(
         'sales_record.html', 
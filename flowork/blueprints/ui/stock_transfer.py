@@ -2,6 +2,7 @@ from flask import render_template, request, abort
 from flask_login import login_required, current_user
 from sqlalchemy import or_
 from flowork.models import db, StockTransfer, Store
+from flowork.constants import TransferStatus
 from . import ui_bp
 
 @ui_bp.route('/stock_transfer/out')
@@ -12,8 +13,9 @@ def stock_transfer_out():
         abort(403, description="매장 계정 전용 기능입니다.")
         
     # 내가 보내야 하는 것들 (상태: REQUESTED, SHIPPED, REJECTED 등)
-    transfers = StockTransfer.query.filter_by(
-        source_store_id=current_user.store_id
+    transfers = StockTransfer.query.filter(
+        StockTransfer.source_store_id == current_user.store_id,
+        StockTransfer.status != TransferStatus.DRAFT
     ).order_by(StockTransfer.created_at.desc()).all()
     
     return render_template('stock_transfer_out.html', active_page='transfer_out', transfers=transfers)
@@ -26,8 +28,9 @@ def stock_transfer_in():
         abort(403, description="매장 계정 전용 기능입니다.")
         
     # 내가 받아야 하는 것들
-    transfers = StockTransfer.query.filter_by(
-        target_store_id=current_user.store_id
+    transfers = StockTransfer.query.filter(
+        StockTransfer.target_store_id == current_user.store_id,
+        StockTransfer.status != TransferStatus.DRAFT
     ).order_by(StockTransfer.created_at.desc()).all()
     
     # 요청 가능한 다른 매장 목록
@@ -44,7 +47,8 @@ def stock_transfer_in():
 def stock_transfer_status():
     """수평이동 전체 현황 (본사 관리자용 / 매장 조회용)"""
     query = StockTransfer.query.join(StockTransfer.source_store).filter(
-        Store.brand_id == current_user.current_brand_id
+        Store.brand_id == current_user.current_brand_id,
+        StockTransfer.status != TransferStatus.DRAFT
     )
     
     if current_user.store_id:
@@ -1,10 +1,20 @@
 import traceback
 import os
 import gc
+from datetime import date, timedelta
 # [수정] celery_app 임포트
 from flowork.extensions import celery_app, db
 from flowork.services.excel import parse_stock_excel
 from flowork.services.inventory_service import InventoryService
+from flowork.services.db import rebuild_filter_facets, invalidate_filter_facets
+from flowork.services.stock_totals import rebuild_stock_totals
+from flowork.services.history_partitions import archive_old_partitions
+from flowork.services.snapshot_service import StockSnapshotService
+from flowork.services.rebalance import suggest_rebalance
+from flowork.services.sales_rollup import rebuild_sales_rollup
+from flowork.services.analytics import invalidate_analytics_cache
+from flowork.services.transfer_service import TransferService
+from flowork.constants import TransferStatus
 
 # [수정] celery_app 사용 및 AppContext 주입
 
@@ -36,6 +46,9 @@ def task_upsert_inventory(self, file_path, form_data, upload_mode, brand_id, tar
                 records, upload_mode, brand_id, target_store_id, allow_create, progress_callback
             )
             
+            # 4. 상세검색 필터 옵션 캐시 재계산
+            rebuild_filter_facets(brand_id)
+            
             return {'status': 'completed', 'result': {'message': message}}
             
         except Exception as e:
@@ -71,6 +84,9 @@ def task_import_db(self, file_path, form_data, brand_id):
                 records, brand_id, progress_callback
             )
             
+            if success:
+                rebuild_filter_facets(brand_id)
+            
             if success:
                 return {'status': 'completed', 'result': {'message': message}}
             else:
@@ -82,4 +98,155 @@ def task_import_db(self, file_path, form_data, brand_id):
             if os.path.exists(file_path):
                 try: os.remove(file_path)
                 except: pass
-            gc.collect()
\ No newline at end of file
+            gc.collect()
+
+@celery_app.task(bind=True)
+def task_set_actual_stock(self, store_id, brand_id, barcode_quantities):
+    """대용량 실사재고 반영 태스크"""
+    with self.app.flask_app.app_context():
+        try:
+            def progress_callback(current, total):
+                if total > 0:
+                    self.update_state(state='PROGRESS', meta={
+                        'current': current,
+                        'total': total,
+                        'percent': int((current / total) * 100)
+                    })
+
+            updated, unknown = InventoryService.set_actual_stock(
+                store_id, brand_id, barcode_quantities, progress_callback
+            )
+            message = f"SKU {updated}개 실사재고 업데이트 완료."
+            if unknown:
+                message += f" (DB에 없는 바코드 {len(unknown)}개)"
+            return {'status': 'completed', 'result': {'message': message, 'updated': updated, 'unknown': unknown}}
+        except Exception as e:
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_apply_actual_stock(self, store_id, user_id=None):
+    """실사재고 -> 전산재고 반영 태스크 (CHECK_ADJUST 이력 기록)"""
+    with self.app.flask_app.app_context():
+        try:
+            def progress_callback(current, total):
+                if total > 0:
+                    self.update_state(state='PROGRESS', meta={
+                        'current': current,
+                        'total': total,
+                        'percent': int((current / total) * 100)
+                    })
+
+            report = InventoryService.apply_actual_stock(store_id, user_id, progress_callback)
+            totals = report['total']
+            message = f"SKU {totals['skus']}개 조정 완료 (+{totals['plus']} / -{totals['minus']}, 순증감 {totals['net']})"
+            return {'status': 'completed', 'result': {'message': message, **report}}
+        except Exception as e:
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_rebuild_filter_facets(self, brand_id):
+    """상세검색 필터 옵션(facet) 캐시 재계산 태스크"""
+    with self.app.flask_app.app_context():
+        try:
+            facets = rebuild_filter_facets(brand_id)
+            return {'status': 'completed', 'result': {'categories': len(facets['categories']), 'colors': len(facets['colors'])}}
+        except Exception as e:
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+def schedule_filter_facets_rebuild(brand_id):
+    """상품 수정/삭제 후 호출: 백그라운드 재계산 요청, 브로커 장애 시 캐시만 비워 다음 조회 때 재계산"""
+    if not brand_id:
+        return
+    try:
+        task_rebuild_filter_facets.delay(brand_id)
+    except Exception as e:
+        print(f"Facet rebuild scheduling failed: {e}")
+        invalidate_filter_facets(brand_id)
+
+@celery_app.task(bind=True)
+def task_rebuild_stock_totals(self, brand_id=None):
+    """재고 합계 테이블 정합성 재계산 태스크 (brand_id 없으면 전체)"""
+    with self.app.flask_app.app_context():
+        try:
+            variant_count, product_count = rebuild_stock_totals(brand_id)
+            db.session.commit()
+            return {'status': 'completed', 'result': {'variants': variant_count, 'products': product_count}}
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_maintain_stock_history(self):
+    """재고 이력 파티션 관리 (다음 달 파티션 생성 + 보관 기간 지난 파티션 분리/압축 보관)"""
+    with self.app.flask_app.app_context():
+        try:
+            archived, created = archive_old_partitions()
+            return {'status': 'completed', 'result': {'archived': archived, 'months_ensured': created}}
+        except Exception as e:
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_take_stock_snapshot(self):
+    """야간 매장 재고 스냅샷 저장 + 보관 기간 지난 스냅샷 정리"""
+    with self.app.flask_app.app_context():
+        try:
+            result = StockSnapshotService.take_snapshot()
+            if result['status'] == 'success':
+                retention_days = self.app.flask_app.config.get('STOCK_SNAPSHOT_RETENTION_DAYS', 400)
+                result['purged'] = StockSnapshotService.purge_snapshots(retention_days)
+            return result
+        except Exception as e:
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_close_sales_day(self):
+    """일 마감: 전일 판매 집계 재계산(정합성 보정) 후 판매 분석 캐시 무효화"""
+    with self.app.flask_app.app_context():
+        try:
+            yesterday = date.today() - timedelta(days=1)
+            line_count, store_count = rebuild_sales_rollup(start_date=yesterday, end_date=yesterday)
+            db.session.commit()
+            invalidate_analytics_cache()
+            return {'status': 'completed', 'result': {'date': yesterday.isoformat(), 'rows': line_count, 'store_days': store_count}}
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+@celery_app.task(bind=True)
+def task_suggest_rebalance(self, brand_id, user_id=None, days=None, target_days=None, min_keep=1):
+    """매장 간 재고 재배치 제안 계산 -> 제안(DRAFT) 이동 지시서 저장 (기존 제안은 교체)"""
+    with self.app.flask_app.app_context():
+        try:
+            config = self.app.flask_app.config
+            days = days or config.get('REBALANCE_SALES_DAYS', 28)
+            target_days = target_days or config.get('REBALANCE_TARGET_DAYS', 14)
+
+            suggestions, summary = suggest_rebalance(brand_id, days, target_days, min_keep)
+
+            TransferService.discard_draft_documents(brand_id)
+            if not suggestions:
+                db.session.commit()
+                return {'status': 'completed', 'result': {'message': '재배치 제안이 없습니다.', 'summary': summary}}
+
+            title = f"재고 재배치 제안 (최근 {days}일 판매, 목표 {target_days}일분)"
+            result = TransferService.create_document(
+                brand_id, user_id, suggestions, title, status=TransferStatus.DRAFT
+            )
+            if result['status'] != 'success':
+                return result
+            return {'status': 'completed', 'result': {
+                'message': f"제안 {summary['suggested_lines']}건 ({summary['suggested_units']}개)",
+                'document_id': result['document_id'],
+                'summary': summary
+            }}
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
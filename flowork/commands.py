@@ -2,7 +2,7 @@ import click
 from flask.cli import with_appcontext
 from .extensions import db
 # 모델들을 임포트해야 create_all()이 테이블을 인식할 수 있습니다.
-from .models import User, Brand, Store, Product, Variant, StoreStock, Sale, SaleItem, StockTransfer, StoreOrder, Setting, StockHistory
+from .models import User, Brand, Store, Product, Variant, StoreStock, Sale, SaleItem, StockTransfer, StoreOrder, Setting, StockHistory, VariantStockTotal, ProductStockTotal
 
 @click.command('init-db')
 @with_appcontext
@@ -31,4 +31,94 @@ def create_super_admin():
     user.set_password(password)
     db.session.add(user)
     db.session.commit()
-    click.echo(f'Created super admin: {username}')
\ No newline at end of file
+    click.echo(f'Created super admin: {username}')
+
+@click.command('rebuild-stock-totals')
+@click.option('--brand-id', type=int, default=None, help='특정 브랜드만 재계산')
+@with_appcontext
+def rebuild_stock_totals_command(brand_id):
+    """매장 재고 기준으로 옵션/상품별 재고 합계 테이블을 재계산합니다."""
+    from .services.stock_totals import rebuild_stock_totals
+    try:
+        variant_count, product_count = rebuild_stock_totals(brand_id)
+        db.session.commit()
+        click.echo(f'Rebuilt stock totals: {variant_count} variants, {product_count} products.')
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f'Error rebuilding stock totals: {e}')
+
+@click.command('rebuild-sales-rollup')
+@click.option('--store-id', type=int, default=None, help='특정 매장만 재계산')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='시작일 (YYYY-MM-DD)')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='종료일 (YYYY-MM-DD)')
+@with_appcontext
+def rebuild_sales_rollup_command(store_id, start_date, end_date):
+    """판매 내역 기준으로 일별 판매 집계 테이블을 재계산합니다.
+    (upgrade-db 가 집계 테이블을 새로 만들 때는 자동 실행, 집계가 어긋났을 때 수동 실행)"""
+    from .services.sales_rollup import rebuild_sales_rollup
+    from .services.analytics import invalidate_analytics_cache
+    try:
+        line_count, store_count = rebuild_sales_rollup(
+            [store_id] if store_id else None,
+            start_date.date() if start_date else None,
+            end_date.date() if end_date else None
+        )
+        db.session.commit()
+        invalidate_analytics_cache()
+        click.echo(f'Rebuilt sales rollup: {line_count} rows, {store_count} store-days.')
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f'Error rebuilding sales rollup: {e}')
+
+@click.command('create-missing-indexes')
+@with_appcontext
+def create_missing_indexes_command():
+    """모델에 선언된 인덱스 중 DB 에 없는 것을 생성합니다. (기존 운영 DB 반영용)"""
+    from .services.db import create_missing_indexes
+    try:
+        created = create_missing_indexes()
+        click.echo(f'Created indexes: {", ".join(created) or "none"}')
+    except Exception as e:
+        click.echo(f'Error creating indexes: {e}')
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """기존 데이터를 유지한 채 새 테이블/컬럼/인덱스를 추가합니다. (기존 운영 DB 반영용)
+    판매 집계/재고 합계 테이블을 새로 만들면 기존 판매 내역/매장 재고로 채웁니다."""
+    from .services.db import upgrade_schema, SALES_ROLLUP_TABLES, STOCK_TOTAL_TABLES
+    try:
+        tables, columns, indexes = upgrade_schema()
+        click.echo(f'Created tables: {", ".join(tables) or "none"}')
+        if STOCK_TOTAL_TABLES & set(tables):
+            click.echo('Backfilled stock totals from store stock.')
+        if SALES_ROLLUP_TABLES & set(tables):
+            click.echo('Backfilled sales rollup from existing sales.')
+        click.echo(f'Added columns: {", ".join(columns) or "none"}')
+        click.echo(f'Created indexes: {", ".join(indexes) or "none"}')
+    except Exception as e:
+        click.echo(f'Error upgrading database: {e}')
+
+@click.command('partition-stock-history')
+@click.option('--months-ahead', type=int, default=3, help='미리 만들어 둘 파티션 개월 수')
+@with_appcontext
+def partition_stock_history_command(months_ahead):
+    """stock_history 테이블을 월별 파티션 테이블로 전환합니다. (PostgreSQL 전용, 1회)"""
+    from .services.history_partitions import convert_to_partitioned
+    try:
+        moved = convert_to_partitioned(months_ahead)
+        click.echo(f'Partitioned stock_history ({moved} rows moved).')
+    except Exception as e:
+        click.echo(f'Error partitioning stock_history: {e}')
+
+@click.command('archive-stock-history')
+@click.option('--retention-months', type=int, default=None, help='보관 기간(개월), 기본값은 설정값')
+@with_appcontext
+def archive_stock_history_command(retention_months):
+    """보관 기간이 지난 재고 이력 파티션을 압축 파일로 내보내고 삭제합니다."""
+    from .services.history_partitions import archive_old_partitions
+    try:
+        archived, _ = archive_old_partitions(retention_months)
+        click.echo(f'Archived partitions: {", ".join(archived) or "none"}')
+    except Exception as e:
+        click.echo(f'Error archiving stock_history: {e}')
@@ -1,5 +1,6 @@
 import os
 import time
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -51,4 +52,46 @@ class Config:
     # 로그의 "CACHE_TYPE is set to null" 경고 해결용
     CACHE_TYPE = 'RedisCache'
     CACHE_REDIS_URL = CELERY_BROKER_URL
-    CACHE_DEFAULT_TIMEOUT = 300
\ No newline at end of file
+    CACHE_DEFAULT_TIMEOUT = 300
+
+    # 통합 재고 매트릭스 프로세스 로컬 캐시 유지 시간(초)
+    STOCK_MATRIX_TTL = int(os.getenv('STOCK_MATRIX_TTL', '60'))
+
+    # 실사재고 일괄 반영 시 이 개수를 넘는 바코드는 Celery 로 처리
+    ACTUAL_STOCK_ASYNC_THRESHOLD = int(os.getenv('ACTUAL_STOCK_ASYNC_THRESHOLD', '5000'))
+
+    # 다중 단말 실사 세션 (Redis, 미지정 시 캐시 Redis 사용)
+    COUNT_SESSION_REDIS_URL = os.getenv('COUNT_SESSION_REDIS_URL')
+    COUNT_SESSION_TTL = int(os.getenv('COUNT_SESSION_TTL', '172800'))
+
+    # 재고 재배치 제안: 판매속도 산출 기간 / 목표 재고일수
+    REBALANCE_SALES_DAYS = int(os.getenv('REBALANCE_SALES_DAYS', '28'))
+    REBALANCE_TARGET_DAYS = int(os.getenv('REBALANCE_TARGET_DAYS', '14'))
+
+    # 판매 분석 결과 캐시 유지 시간(초), 일 마감 배치에서 전체 무효화
+    ANALYTICS_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_CACHE_TIMEOUT', '86400'))
+    # 오늘이 포함된 기간/현재 재고 기준 결과(판매율)의 캐시 유지 시간(초), 0 이면 캐시 안 함
+    ANALYTICS_LIVE_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_LIVE_CACHE_TIMEOUT', '60'))
+
+    # 재고 이력(StockHistory) 월별 파티션 보관 정책
+    STOCK_HISTORY_RETENTION_MONTHS = int(os.getenv('STOCK_HISTORY_RETENTION_MONTHS', '24'))
+    STOCK_HISTORY_PARTITIONS_AHEAD = int(os.getenv('STOCK_HISTORY_PARTITIONS_AHEAD', '3'))
+    STOCK_HISTORY_ARCHIVE_DIR = os.getenv('STOCK_HISTORY_ARCHIVE_DIR', '/app/archive/stock_history')
+
+    # 시점 재고 조회용 일일 스냅샷 보관 일수
+    STOCK_SNAPSHOT_RETENTION_DAYS = int(os.getenv('STOCK_SNAPSHOT_RETENTION_DAYS', '400'))
+
+    CELERYBEAT_SCHEDULE = {
+        'maintain-stock-history-partitions': {
+            'task': 'flowork.celery_tasks.task_maintain_stock_history',
+            'schedule': crontab(hour=3, minute=30),
+        },
+        'take-stock-snapshot': {
+            'task': 'flowork.celery_tasks.task_take_stock_snapshot',
+            'schedule': crontab(hour=0, minute=5),
+        },
+        'close-sales-day': {
+            'task': 'flowork.celery_tasks.task_close_sales_day',
+            'schedule': crontab(hour=0, minute=15),
+        },
+    }
@@ -34,6 +34,8 @@ class StockChangeType:
     TRANSFER_IN = 'TRANSFER_IN'       # 수평 이동 입고
     ORDER_IN = 'ORDER_IN'             # 본사 주문 입고
     RETURN_OUT = 'RETURN_OUT'         # 본사 반품 출고
+    HQ_ORDER_OUT = 'HQ_ORDER_OUT'     # 매장 주문 본사 출고 (본사 재고)
+    HQ_RETURN_IN = 'HQ_RETURN_IN'     # 매장 반품 본사 입고 (본사 재고)
 
 class SaleStatus:
     """판매 상태 상수"""
@@ -54,6 +56,7 @@ class TransferType:
 
 class TransferStatus:
     """재고 이동 상태 상수"""
+    DRAFT = 'DRAFT'         # 제안(미확정, 재배치 엔진)
     REQUESTED = 'REQUESTED' # 요청됨
     SHIPPED = 'SHIPPED'     # 출고됨 (이동중)
     RECEIVED = 'RECEIVED'   # 입고됨 (완료)
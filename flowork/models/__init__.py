@@ -2,8 +2,9 @@ from flowork.extensions import db
 
 from .auth import User
 from .store import Brand, Store, Setting, Staff
-from .product import Product, Variant, StoreStock, StockHistory
-from .sales import Sale, SaleItem
+from .product import Product, Variant, StoreStock, StockHistory, HqStockHistory, VariantStockTotal, ProductStockTotal
+from .sales import Sale, SaleItem, ReceiptCounter, SalesDailyRollup, SalesDailyStoreRollup
 from .store_order import StoreOrder, StoreReturn
-from .stock_transfer import StockTransfer
-from .order import Order, ProcessingStep
\ No newline at end of file
+from .stock_transfer import StockTransfer, TransferDocument
+from .order import Order, ProcessingStep
+from .stock_snapshot import StockSnapshot, StockSnapshotItem
\ No newline at end of file
@@ -31,6 +31,11 @@ class Order(db.Model):
     completed_at = db.Column(db.DateTime, nullable=True)
     
     store = db.relationship('Store', backref='customer_orders')
+
+    __table_args__ = (
+        # 매장 미완료 주문 목록
+        db.Index('ix_orders_store_status', 'store_id', 'order_status'),
+    )
     
     @property
     def sms_link(self):
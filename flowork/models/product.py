@@ -101,4 +101,48 @@ class StockHistory(db.Model):
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     description = db.Column(db.String(200))
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
\ No newline at end of file
+    # 파티션 키 (PostgreSQL 운영 DB는 `flask partition-stock-history` 로 월별 RANGE 파티션 전환)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_stock_history_created_at_brin', 'created_at', postgresql_using='brin'),
+        db.Index('ix_stock_history_store_variant_created', 'store_id', 'variant_id', 'created_at'),
+    )
+
+class HqStockHistory(db.Model):
+    """본사 재고(Variant.hq_quantity) 변동 이력"""
+    __tablename__ = 'hq_stock_history'
+
+    id = db.Column(db.Integer, primary_key=True)
+    variant_id = db.Column(db.Integer, db.ForeignKey('variants.id', ondelete='CASCADE'), nullable=False)
+    # 상대 매장 (주문 출고/반품 입고 대상)
+    store_id = db.Column(db.Integer, db.ForeignKey('stores.id', ondelete='SET NULL'), nullable=True)
+
+    change_type = db.Column(db.String(20), nullable=False)
+    quantity_change = db.Column(db.Integer, nullable=False)
+    current_quantity = db.Column(db.Integer, nullable=False)
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    description = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_hq_stock_history_variant_created', 'variant_id', 'created_at'),
+    )
+
+class VariantStockTotal(db.Model):
+    """옵션별 전체 매장 재고 합계 (재고 변경과 같은 트랜잭션에서 증분 갱신)"""
+    __tablename__ = 'variant_stock_totals'
+
+    variant_id = db.Column(db.Integer, db.ForeignKey('variants.id', ondelete='CASCADE'), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), nullable=False, index=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+class ProductStockTotal(db.Model):
+    """상품별 전체 매장 재고 합계"""
+    __tablename__ = 'product_stock_totals'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
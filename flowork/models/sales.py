@@ -9,6 +9,8 @@ class Sale(db.Model):
     
     receipt_number = db.Column(db.String(50), unique=True, nullable=False)
     daily_number = db.Column(db.Integer, nullable=False, default=1)
+    # 클라이언트 재전송 중복 방지 키 (일괄 등록 API)
+    idempotency_key = db.Column(db.String(64), nullable=True)
     
     sale_date = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
@@ -23,6 +25,13 @@ class Sale(db.Model):
     
     items = db.relationship('SaleItem', backref='sale', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # 매장 판매 목록/영수증 번호 발급/기간 조회
+        db.Index('ix_sales_store_date', 'store_id', 'sale_date'),
+        # 이름 있는 유니크 인덱스로 선언해 기존 DB 에도 `flask upgrade-db` 로 추가 가능
+        db.Index('uq_sales_idempotency_key', 'idempotency_key', unique=True),
+    )
+
 class SaleItem(db.Model):
     __tablename__ = 'sale_items'
 
@@ -42,4 +51,44 @@ class SaleItem(db.Model):
     discounted_price = db.Column(db.Integer, default=0)
     subtotal = db.Column(db.Integer, nullable=False)
     
-    variant = db.relationship('Variant')
\ No newline at end of file
+    variant = db.relationship('Variant')
+
+    __table_args__ = (
+        db.Index('ix_sale_items_sale_id', 'sale_id'),
+    )
+
+class ReceiptCounter(db.Model):
+    """매장/일자별 영수증 일련번호 (판매 트랜잭션과 분리된 짧은 트랜잭션에서 증가)"""
+    __tablename__ = 'receipt_counters'
+
+    store_id = db.Column(db.Integer, db.ForeignKey('stores.id', ondelete='CASCADE'), primary_key=True)
+    sale_date = db.Column(db.Date, primary_key=True)
+    last_number = db.Column(db.Integer, nullable=False, default=0)
+
+class SalesDailyRollup(db.Model):
+    """매장/일자/옵션별 판매 집계 (판매/환불과 같은 트랜잭션에서 증분 갱신, 유효 판매 기준)"""
+    __tablename__ = 'sales_daily_rollup'
+
+    store_id = db.Column(db.Integer, db.ForeignKey('stores.id', ondelete='CASCADE'), primary_key=True)
+    sale_date = db.Column(db.Date, primary_key=True)
+    variant_id = db.Column(db.Integer, db.ForeignKey('variants.id', ondelete='CASCADE'), primary_key=True)
+
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    gross_amount = db.Column(db.BigInteger, nullable=False, default=0)     # 판매가 x 수량
+    discount_amount = db.Column(db.BigInteger, nullable=False, default=0)  # 할인액 x 수량
+    net_amount = db.Column(db.BigInteger, nullable=False, default=0)       # 실판매액 (SaleItem.subtotal 합)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_sales_daily_rollup_date_store', 'sale_date', 'store_id'),
+        db.Index('ix_sales_daily_rollup_variant_date', 'variant_id', 'sale_date'),
+    )
+
+class SalesDailyStoreRollup(db.Model):
+    """매장/일자별 유효 판매(영수증) 건수"""
+    __tablename__ = 'sales_daily_store_rollup'
+
+    store_id = db.Column(db.Integer, db.ForeignKey('stores.id', ondelete='CASCADE'), primary_key=True)
+    sale_date = db.Column(db.Date, primary_key=True)
+    sale_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
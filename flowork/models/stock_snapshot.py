@@ -0,0 +1,22 @@
+from . import db
+
+class StockSnapshot(db.Model):
+    """매장 재고 스냅샷 헤더 (야간 배치로 생성, 시점 재고 조회의 기준점)"""
+    __tablename__ = 'stock_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 이 시각의 StoreStock 상태 (이후 변동분은 StockHistory 로 보정)
+    taken_at = db.Column(db.DateTime, nullable=False, index=True)
+    # 스냅샷에 반영된 마지막 StockHistory.id (이후 변동분은 id 로 구분, 시각은 트랜잭션 시작 기준이라 부정확)
+    last_history_id = db.Column(db.Integer, nullable=True)
+    row_count = db.Column(db.Integer, default=0)
+
+    items = db.relationship('StockSnapshotItem', backref='snapshot', cascade='all, delete-orphan', passive_deletes=True)
+
+class StockSnapshotItem(db.Model):
+    __tablename__ = 'stock_snapshot_items'
+
+    snapshot_id = db.Column(db.Integer, db.ForeignKey('stock_snapshots.id', ondelete='CASCADE'), primary_key=True)
+    store_id = db.Column(db.Integer, primary_key=True)
+    variant_id = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)
@@ -1,5 +1,25 @@
 from . import db
 
+class TransferDocument(db.Model):
+    """본사 이동 지시서 (헤더). 품목 라인은 StockTransfer.document_id 로 연결"""
+    __tablename__ = 'transfer_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False, index=True)
+    title = db.Column(db.String(200), nullable=True)
+
+    # DRAFT(재배치 제안), REQUESTED(지시됨), SHIPPED(전체 출고), RECEIVED(전체 입고), REJECTED(전체 거부)
+    status = db.Column(db.String(20), default='REQUESTED')
+
+    line_count = db.Column(db.Integer, default=0)
+    total_quantity = db.Column(db.Integer, default=0)
+
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, onupdate=db.func.now())
+
+    lines = db.relationship('StockTransfer', backref='document', lazy='dynamic')
+
 class StockTransfer(db.Model):
     __tablename__ = 'stock_transfers'
 
@@ -15,10 +35,19 @@ class StockTransfer(db.Model):
     
     # REQUEST(매장간요청), INSTRUCTION(본사지시)
     transfer_type = db.Column(db.String(20), default='REQUEST')
+
+    # 본사 지시서로 일괄 생성된 경우
+    document_id = db.Column(db.Integer, db.ForeignKey('transfer_documents.id'), nullable=True, index=True)
     
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, onupdate=db.func.now())
     
     source_store = db.relationship('Store', foreign_keys=[source_store_id], backref='transfers_out')
     target_store = db.relationship('Store', foreign_keys=[target_store_id], backref='transfers_in')
-    variant = db.relationship('Variant')
\ No newline at end of file
+    variant = db.relationship('Variant')
+
+    __table_args__ = (
+        # 매장별 출고/입고 목록 및 상태별 집계
+        db.Index('ix_stock_transfers_source_status', 'source_store_id', 'status'),
+        db.Index('ix_stock_transfers_target_status', 'target_store_id', 'status'),
+    )
@@ -0,0 +1,382 @@
+import uuid
+from datetime import date
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func, case, literal, null, union_all, tuple_
+from flowork.extensions import db, cache
+from flowork.models import Product, Variant, Store, StoreStock, SalesDailyRollup
+from flowork.utils import size_sort_value
+
+_VERSION_KEY = 'analytics_ver'
+
+METRICS = {
+    'quantity': SalesDailyRollup.quantity,
+    'net_amount': SalesDailyRollup.net_amount
+}
+
+def _dimensions():
+    """집계 기준별 컬럼 (첫 컬럼이 키, 나머지는 표시용)"""
+    return {
+        'variant': [Variant.id.label('variant_id'), Product.product_number.label('product_number'),
+                    Product.product_name.label('product_name'), Variant.color.label('color'), Variant.size.label('size')],
+        'product': [Product.id.label('product_id'), Product.product_number.label('product_number'),
+                    Product.product_name.label('product_name')],
+        'category': [func.coalesce(Product.item_category, '미분류').label('category')],
+        'store': [Store.id.label('store_id'), Store.store_name.label('store_name')]
+    }
+
+DIMENSIONS = tuple(_dimensions().keys())
+
+# --- 캐시 (Redis, 일 마감 시 버전 교체로 전체 무효화) ---
+
+def _get_version():
+    try:
+        version = cache.get(_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(_VERSION_KEY, version, timeout=0)
+        return version
+    except Exception:
+        # Redis 연결 오류 시 캐시 없이 계산
+        return None
+
+def invalidate_analytics_cache():
+    """일 마감(야간 배치) 또는 집계 재계산 후 호출"""
+    try:
+        cache.set(_VERSION_KEY, uuid.uuid4().hex, timeout=0)
+    except Exception:
+        pass
+
+def _cached(kind, brand_id, store_id, start_date, end_date, params, compute, live_stock=False):
+    """
+    (브랜드, 매장, 기간, 옵션) 단위 결과 캐시
+    마감된 기간은 일 마감 무효화까지 유지, 오늘이 포함된 기간이나 현재 재고를 읽는 결과는
+    판매/재고 변동이 바로 반영되도록 짧게 유지 (ANALYTICS_LIVE_CACHE_TIMEOUT, 0 이면 캐시 안 함)
+    """
+    config = current_app.config
+    if live_stock or end_date >= date.today():
+        timeout = config.get('ANALYTICS_LIVE_CACHE_TIMEOUT', 60)
+    else:
+        timeout = config.get('ANALYTICS_CACHE_TIMEOUT', 86400)
+
+    version = _get_version() if timeout > 0 else None
+    if not version:
+        return compute()
+
+    param_key = '_'.join(f'{k}={params[k]}' for k in sorted(params))
+    key = f'analytics_{version}_{kind}_{brand_id}_{store_id or "all"}_{start_date}_{end_date}_{param_key}'
+    try:
+        result = cache.get(key)
+    except Exception:
+        result = None
+    if result is None:
+        result = compute()
+        try:
+            cache.set(key, result, timeout=timeout)
+        except Exception:
+            pass
+    return result
+
+# --- 집계 ---
+
+def _rollup_filters(brand_id, start_date, end_date, store_id=None):
+    filters = [
+        Product.brand_id == brand_id,
+        SalesDailyRollup.sale_date >= start_date,
+        SalesDailyRollup.sale_date <= end_date
+    ]
+    if store_id:
+        filters.append(SalesDailyRollup.store_id == store_id)
+    return filters
+
+def _rollup_select(*columns):
+    return (
+        select(*columns)
+        .select_from(SalesDailyRollup)
+        .join(Variant, Variant.id == SalesDailyRollup.variant_id)
+        .join(Product, Product.id == Variant.product_id)
+        .join(Store, Store.id == SalesDailyRollup.store_id)
+    )
+
+def _compute_top_sellers(brand_id, start_date, end_date, store_id, dimension, metric, limit):
+    columns = _dimensions()[dimension]
+    names = [c.name for c in columns]
+    value = func.sum(METRICS[metric])
+
+    ranked = _rollup_select(
+        *columns,
+        func.sum(SalesDailyRollup.quantity).label('quantity'),
+        func.sum(SalesDailyRollup.net_amount).label('net_amount'),
+        func.rank().over(order_by=value.desc()).label('rank'),
+        (value * 1.0 / func.nullif(func.sum(value).over(), 0)).label('share')
+    ).where(*_rollup_filters(brand_id, start_date, end_date, store_id)).group_by(*columns).subquery()
+
+    rows = db.session.execute(
+        select(ranked).where(ranked.c.rank <= limit).order_by(ranked.c.rank, ranked.c[names[0]])
+    ).mappings().all()
+    return [
+        {
+            **{name: row[name] for name in names},
+            'rank': int(row['rank']),
+            'quantity': int(row['quantity'] or 0),
+            'net_amount': int(row['net_amount'] or 0),
+            'share': round(float(row['share'] or 0), 4)
+        }
+        for row in rows
+    ]
+
+def _compute_sell_through(brand_id, start_date, end_date, store_id, dimension, limit):
+    columns = _dimensions()[dimension]
+    names = [c.name for c in columns]
+
+    sold_rows = db.session.execute(
+        _rollup_select(*columns, func.sum(SalesDailyRollup.quantity))
+        .where(*_rollup_filters(brand_id, start_date, end_date, store_id))
+        .group_by(*columns)
+    ).all()
+
+    on_hand = case((StoreStock.quantity > 0, StoreStock.quantity), else_=0)
+    stock_query = (
+        select(*columns, func.sum(on_hand))
+        .select_from(StoreStock)
+        .join(Variant, Variant.id == StoreStock.variant_id)
+        .join(Product, Product.id == Variant.product_id)
+        .join(Store, Store.id == StoreStock.store_id)
+        .where(Product.brand_id == brand_id)
+    )
+    if store_id:
+        stock_query = stock_query.where(StoreStock.store_id == store_id)
+    stock_rows = db.session.execute(stock_query.group_by(*columns)).all()
+
+    # 키 -> 표시 컬럼, 판매/재고 수량을 같은 순서의 배열로 정렬
+    labels = {}
+    for row in list(stock_rows) + list(sold_rows):
+        labels[row[0]] = tuple(row[:-1])
+    keys = list(labels)
+    index = {key: i for i, key in enumerate(keys)}
+    sold_arr = np.zeros(len(keys), dtype=np.int64)
+    stock_arr = np.zeros(len(keys), dtype=np.int64)
+    for row in sold_rows:
+        sold_arr[index[row[0]]] = int(row[-1] or 0)
+    for row in stock_rows:
+        stock_arr[index[row[0]]] = int(row[-1] or 0)
+
+    denom = sold_arr + stock_arr
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(denom > 0, sold_arr / np.maximum(denom, 1), 0.0)
+
+    total_sold, total_stock = int(sold_arr.sum()), int(stock_arr.sum())
+    # 판매 수량 내림차순, 같으면 판매율 내림차순
+    order = np.lexsort((-rate, -sold_arr))[:limit]
+
+    return {
+        'total': {
+            'sold': total_sold,
+            'stock': total_stock,
+            'sell_through': round(total_sold / (total_sold + total_stock), 4) if total_sold + total_stock else 0.0
+        },
+        'items': [
+            {
+                **dict(zip(names, labels[keys[i]])),
+                'sold': int(sold_arr[i]),
+                'stock': int(stock_arr[i]),
+                'sell_through': round(float(rate[i]), 4)
+            }
+            for i in order
+        ]
+    }
+
+def classify_abc(values, a_share=0.8, b_share=0.95):
+    """
+    값 배열 -> 'A'/'B'/'C' 배열 (파레토 누적 비중 기준)
+    앞선 항목들의 누적 비중이 a_share 미만이면 A, b_share 미만이면 B, 나머지 C
+    """
+    values = np.asarray(values, dtype=np.float64)
+    classes = np.full(values.shape, 'C', dtype='<U1')
+    total = values.sum()
+    if not values.size or total <= 0:
+        return classes
+
+    order = np.argsort(-values, kind='stable')
+    preceding = (np.cumsum(values[order]) - values[order]) / total
+    sorted_classes = np.where(preceding < a_share, 'A', np.where(preceding < b_share, 'B', 'C'))
+    classes[order] = sorted_classes
+    return classes
+
+def _compute_abc(brand_id, start_date, end_date, store_id, metric, a_share, b_share):
+    rows = db.session.execute(
+        _rollup_select(Variant.id, Product.product_number, Variant.color, Variant.size, func.sum(METRICS[metric]))
+        .where(*_rollup_filters(brand_id, start_date, end_date, store_id))
+        .group_by(Variant.id, Product.product_number, Variant.color, Variant.size)
+        .having(func.sum(METRICS[metric]) > 0)
+    ).all()
+
+    values = np.array([int(r[4]) for r in rows], dtype=np.int64)
+    classes = classify_abc(values, a_share, b_share)
+    order = np.argsort(-values, kind='stable')
+    total = int(values.sum())
+
+    summary = {}
+    for cls in ('A', 'B', 'C'):
+        mask = classes == cls
+        summary[cls] = {
+            'skus': int(mask.sum()),
+            'value': int(values[mask].sum()),
+            'share': round(float(values[mask].sum()) / total, 4) if total else 0.0
+        }
+
+    return {
+        'summary': summary,
+        'variant_id': [rows[i][0] for i in order],
+        'product_number': [rows[i][1] for i in order],
+        'color': [rows[i][2] for i in order],
+        'size': [rows[i][3] for i in order],
+        'value': [int(values[i]) for i in order],
+        'class': [str(classes[i]) for i in order]
+    }
+
+# GROUPING(color, size) 비트: 2 = 컬러 합산, 1 = 사이즈 합산
+_CELL, _COLOR_TOTAL, _SIZE_TOTAL, _GRAND_TOTAL = 0, 1, 2, 3
+
+def _matrix_source(product_id, start_date, end_date, store_id=None):
+    """(variant_id, sold, stock) 원천: 옵션 목록 + 기간 판매 집계 + 현재 재고를 UNION ALL"""
+    variants = select(Variant.id.label('variant_id'), literal(0).label('sold'), literal(0).label('stock')) \
+        .where(Variant.product_id == product_id)
+
+    sales = select(SalesDailyRollup.variant_id, SalesDailyRollup.quantity, literal(0)) \
+        .join(Variant, Variant.id == SalesDailyRollup.variant_id) \
+        .where(Variant.product_id == product_id,
+               SalesDailyRollup.sale_date >= start_date, SalesDailyRollup.sale_date <= end_date)
+
+    on_hand = case((StoreStock.quantity > 0, StoreStock.quantity), else_=0)
+    stock = select(StoreStock.variant_id, literal(0), on_hand) \
+        .join(Variant, Variant.id == StoreStock.variant_id) \
+        .where(Variant.product_id == product_id)
+
+    if store_id:
+        sales = sales.where(SalesDailyRollup.store_id == store_id)
+        stock = stock.where(StoreStock.store_id == store_id)
+    return union_all(variants, sales, stock).subquery('src')
+
+def _matrix_rows(source):
+    """
+    (color, size, grouping, sold, stock) 행: 셀 / 컬러 합계 / 사이즈 합계 / 전체 합계
+    PostgreSQL 은 GROUPING SETS 한 번으로, 그 외(테스트 SQLite)는 같은 결과를 UNION ALL 로 계산
+    """
+    def base(*cols):
+        return select(*cols, func.sum(source.c.sold), func.sum(source.c.stock)) \
+            .select_from(source).join(Variant, Variant.id == source.c.variant_id)
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        stmt = base(Variant.color, Variant.size, func.grouping(Variant.color, Variant.size)).group_by(
+            func.grouping_sets(tuple_(Variant.color, Variant.size), tuple_(Variant.color), tuple_(Variant.size), tuple_())
+        )
+    else:
+        stmt = union_all(
+            base(Variant.color, Variant.size, literal(_CELL)).group_by(Variant.color, Variant.size),
+            base(Variant.color, null(), literal(_COLOR_TOTAL)).group_by(Variant.color),
+            base(null(), Variant.size, literal(_SIZE_TOTAL)).group_by(Variant.size),
+            base(null(), null(), literal(_GRAND_TOTAL))
+        )
+    return db.session.execute(stmt).all()
+
+def build_size_color_matrix(product_id, start_date, end_date, store_id=None, size_order_map=None):
+    """
+    상품 하나의 컬러 x 사이즈 판매/재고 매트릭스 (판매는 기간 합계, 재고는 현재 수량)
+    사이즈는 브랜드 SIZE_SORT_ORDER 순서, 셀 배치는 NumPy 인덱스 배열로 한 번에 처리
+    반환: {'colors', 'sizes', 'sold', 'stock' (2차원), 'color_totals', 'size_totals', 'total'}
+    """
+    rows = _matrix_rows(_matrix_source(product_id, start_date, end_date, store_id))
+    empty = {'colors': [], 'sizes': [], 'sold': [], 'stock': [],
+             'color_totals': {'sold': [], 'stock': []}, 'size_totals': {'sold': [], 'stock': []},
+             'total': {'sold': 0, 'stock': 0, 'sell_through': 0.0}}
+    if not rows:
+        return empty
+
+    colors_col = np.array([r[0] if r[0] is not None else '' for r in rows], dtype=object)
+    sizes_col = np.array([r[1] if r[1] is not None else '' for r in rows], dtype=object)
+    grouping = np.array([int(r[2]) for r in rows], dtype=np.int8)
+    sold = np.array([int(r[3] or 0) for r in rows], dtype=np.int64)
+    stock = np.array([int(r[4] or 0) for r in rows], dtype=np.int64)
+
+    cells = grouping == _CELL
+    if not cells.any():
+        return empty
+
+    colors = np.unique(colors_col[cells])
+    raw_sizes = np.unique(sizes_col[cells])
+    # 사이즈 정렬: 고유 사이즈 목록만 정렬한 뒤 순위 배열로 변환
+    size_order = sorted(range(len(raw_sizes)), key=lambda i: size_sort_value(raw_sizes[i], size_order_map))
+    size_rank = np.empty(len(raw_sizes), dtype=np.int64)
+    size_rank[size_order] = np.arange(len(raw_sizes))
+
+    def _color_idx(mask):
+        return np.searchsorted(colors, colors_col[mask])
+
+    def _size_idx(mask):
+        return size_rank[np.searchsorted(raw_sizes, sizes_col[mask])]
+
+    shape = (len(colors), len(raw_sizes))
+    sold_matrix = np.zeros(shape, dtype=np.int64)
+    stock_matrix = np.zeros(shape, dtype=np.int64)
+    sold_matrix[_color_idx(cells), _size_idx(cells)] = sold[cells]
+    stock_matrix[_color_idx(cells), _size_idx(cells)] = stock[cells]
+
+    color_sold, color_stock = np.zeros(shape[0], dtype=np.int64), np.zeros(shape[0], dtype=np.int64)
+    mask = grouping == _COLOR_TOTAL
+    color_sold[_color_idx(mask)], color_stock[_color_idx(mask)] = sold[mask], stock[mask]
+
+    size_sold, size_stock = np.zeros(shape[1], dtype=np.int64), np.zeros(shape[1], dtype=np.int64)
+    mask = grouping == _SIZE_TOTAL
+    size_sold[_size_idx(mask)], size_stock[_size_idx(mask)] = sold[mask], stock[mask]
+
+    grand = grouping == _GRAND_TOTAL
+    total_sold, total_stock = int(sold[grand].sum()), int(stock[grand].sum())
+
+    return {
+        'colors': colors.tolist(),
+        'sizes': raw_sizes[size_order].tolist(),
+        'sold': sold_matrix.tolist(),
+        'stock': stock_matrix.tolist(),
+        'color_totals': {'sold': color_sold.tolist(), 'stock': color_stock.tolist()},
+        'size_totals': {'sold': size_sold.tolist(), 'stock': size_stock.tolist()},
+        'total': {
+            'sold': total_sold,
+            'stock': total_stock,
+            'sell_through': round(total_sold / (total_sold + total_stock), 4) if total_sold + total_stock else 0.0
+        }
+    }
+
+class AnalyticsService:
+    """
+    판매 분석 (일별 판매 집계 + 현재 매장 재고 기준)
+    결과는 (브랜드, 매장, 기간, 옵션) 단위로 Redis 캐시, 일 마감 시 전체 무효화
+    """
+
+    @staticmethod
+    def top_sellers(brand_id, start_date, end_date, store_id=None, dimension='product', metric='net_amount', limit=20):
+        """기간 베스트셀러 (RANK() 윈도 함수, 공동 순위 포함)"""
+        return _cached(
+            'top', brand_id, store_id, start_date, end_date,
+            {'dimension': dimension, 'metric': metric, 'limit': limit},
+            lambda: _compute_top_sellers(brand_id, start_date, end_date, store_id, dimension, metric, limit)
+        )
+
+    @staticmethod
+    def sell_through(brand_id, start_date, end_date, store_id=None, dimension='product', limit=100):
+        """판매율 = 기간 판매 / (기간 판매 + 현재 재고)"""
+        return _cached(
+            'sell_through', brand_id, store_id, start_date, end_date,
+            {'dimension': dimension, 'limit': limit},
+            lambda: _compute_sell_through(brand_id, start_date, end_date, store_id, dimension, limit),
+            live_stock=True
+        )
+
+    @staticmethod
+    def abc_classification(brand_id, start_date, end_date, store_id=None, metric='net_amount', a_share=0.8, b_share=0.95):
+        """SKU ABC 분류 (기간 내 판매가 있는 옵션만 대상)"""
+        return _cached(
+            'abc', brand_id, store_id, start_date, end_date,
+            {'metric': metric, 'a': a_share, 'b': b_share},
+            lambda: _compute_abc(brand_id, start_date, end_date, store_id, metric, a_share, b_share)
+        )
@@ -0,0 +1,169 @@
+import os
+import json
+import uuid
+from flask import current_app
+from flowork.extensions import db, cache
+from flowork.models import Setting, Brand
+from flowork.services.local_cache import LocalTTLCache
+
+DEFAULT_IMAGE_URL_PREFIX = 'https://files.ebizway.co.kr/files/10249/Style/'
+DEFAULT_IMAGE_NAMING_RULE = '{product_number}.jpg'
+
+# 로컬 캐시 TTL 이 지나면 Redis 버전 키만 확인하고, 버전이 같으면 그대로 재사용
+LOCAL_TTL_SECONDS = 10
+REDIS_TTL_SECONDS = 3600
+
+_local_cache = LocalTTLCache(ttl_seconds=LOCAL_TTL_SECONDS)
+
+def _parse_value(value):
+    if not isinstance(value, str):
+        return value
+    stripped = value.strip()
+    if stripped[:1] in ('{', '['):
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            return value
+    return value
+
+def _to_int(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+class BrandSettings:
+    """
+    브랜드 설정(Setting 테이블 전체 키)을 한 번에 로드한 읽기 전용 객체
+    - values: DB 원본 문자열 (기존 dict 기반 코드와 호환되도록 .get() 제공)
+    - parsed: JSON 값은 미리 파싱된 상태
+    - file_values: flowork/brands/<브랜드명>.json 의 값 (엑셀 파이프라인 fallback 용)
+    """
+    def __init__(self, brand_id, values, file_values=None):
+        self.brand_id = brand_id
+        self.values = dict(values or {})
+        self.file_values = dict(file_values or {})
+        self.parsed = {k: _parse_value(v) for k, v in self.values.items()}
+
+        self.brand_name = self.values.get('BRAND_NAME')
+        self.image_url_prefix = self.values.get('IMAGE_URL_PREFIX') or DEFAULT_IMAGE_URL_PREFIX
+        self.image_naming_rule = self.values.get('IMAGE_NAMING_RULE') or DEFAULT_IMAGE_NAMING_RULE
+        self.barcode_format = self.values.get('BARCODE_FORMAT') or None
+        self.hq_store_id = _to_int(self.values.get('HQ_STORE_ID'))
+
+        self.size_sort_order = self._typed('SIZE_SORT_ORDER', list)
+        self.size_order_map = {str(s).upper(): i for i, s in enumerate(self.size_sort_order)}
+        self.size_mapping = self._typed('SIZE_MAPPING', dict)
+        self.category_mapping_rule = self._typed('CATEGORY_MAPPING_RULE', dict)
+        self.category_config = self.parsed.get('CATEGORY_CONFIG') if isinstance(self.parsed.get('CATEGORY_CONFIG'), dict) else None
+
+    def _typed(self, key, expected_type):
+        value = self.parsed.get(key)
+        return value if isinstance(value, expected_type) else expected_type()
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_json(self, key, default=None):
+        value = self.parsed.get(key)
+        if value is None or isinstance(value, str):
+            return default
+        return value
+
+    def to_dict(self, with_file_fallback=False):
+        """기존 brand_settings dict 형태 (key -> 문자열 값)"""
+        result = {}
+        if with_file_fallback:
+            result.update(self.file_values)
+        result.update(self.values)
+        return result
+
+def _version_key(brand_id):
+    return f'brand_settings_ver_{brand_id}'
+
+def _payload_key(brand_id, version):
+    return f'brand_settings_{brand_id}_{version}'
+
+def _get_version(brand_id):
+    try:
+        version = cache.get(_version_key(brand_id))
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(_version_key(brand_id), version, timeout=0)
+        return version
+    except Exception:
+        # Redis 연결 오류 시 버전 확인 없이 DB 조회로 진행
+        return None
+
+def _load_file_values(brand):
+    if not brand:
+        return {}
+    try:
+        json_path = os.path.join(current_app.root_path, 'brands', f'{brand.brand_name}.json')
+        if not os.path.exists(json_path):
+            return {}
+        with open(json_path, 'r', encoding='utf-8') as f:
+            file_config = json.load(f)
+        return {
+            k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
+            for k, v in file_config.items()
+        }
+    except Exception as e:
+        print(f"Brand config file load failed: {e}")
+        return {}
+
+def _load_payload(brand_id):
+    rows = db.session.query(Setting.key, Setting.value).filter(Setting.brand_id == brand_id).all()
+    brand = db.session.get(Brand, brand_id)
+    return {
+        'values': {key: value for key, value in rows},
+        'file_values': _load_file_values(brand)
+    }
+
+def get_brand_settings(brand_id):
+    """브랜드 설정 조회 (로컬 TTL 캐시 -> Redis -> DB 순)"""
+    if not brand_id:
+        return BrandSettings(None, {})
+
+    settings, _ = _local_cache.get(brand_id)
+    if settings is not None:
+        return settings
+
+    version = _get_version(brand_id)
+
+    stale, stale_version = _local_cache.peek(brand_id)
+    if stale is not None and version is not None and stale_version == version:
+        _local_cache.touch(brand_id)
+        return stale
+
+    payload = None
+    if version is not None:
+        try:
+            payload = cache.get(_payload_key(brand_id, version))
+        except Exception:
+            payload = None
+
+    if payload is None:
+        payload = _load_payload(brand_id)
+        if version is not None:
+            try:
+                cache.set(_payload_key(brand_id, version), payload, timeout=REDIS_TTL_SECONDS)
+            except Exception:
+                pass
+
+    settings = BrandSettings(brand_id, payload.get('values'), payload.get('file_values'))
+    _local_cache.set(brand_id, settings, tag=version)
+    return settings
+
+def invalidate_brand_settings(brand_id):
+    """설정 저장 후 호출: 버전 키를 갱신해 모든 프로세스의 캐시를 무효화"""
+    if not brand_id:
+        return
+    _local_cache.pop(brand_id)
+    try:
+        cache.set(_version_key(brand_id), uuid.uuid4().hex, timeout=0)
+    except Exception:
+        pass
@@ -0,0 +1,200 @@
+import uuid
+from datetime import datetime
+import redis
+from flask import current_app
+from flowork.utils import clean_string_upper
+from flowork.services.inventory_service import InventoryService
+
+STATUS_OPEN = 'open'
+STATUS_FLUSHING = 'flushing'
+
+# 세션이 열려 있을 때만 스캔 누적 (상태 확인과 HINCRBY 를 한 번에 처리해 마감 중 유실 방지)
+# KEYS: meta, scans, devices, 매장 포인터 / ARGV: device_id, ttl, barcode1, qty1, barcode2, qty2 ...
+_RECORD_SCANS_LUA = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'open' then
+    return -1
+end
+local units = 0
+for i = 3, #ARGV, 2 do
+    local qty = tonumber(ARGV[i + 1])
+    redis.call('HINCRBY', KEYS[2], ARGV[i], qty)
+    units = units + qty
+end
+redis.call('HINCRBY', KEYS[3], ARGV[1], units)
+local total = redis.call('HINCRBY', KEYS[1], 'total_units', units)
+redis.call('HSET', KEYS[1], 'updated_at', redis.call('TIME')[1])
+for i = 1, 4 do
+    redis.call('EXPIRE', KEYS[i], tonumber(ARGV[2]))
+end
+return total
+"""
+
+class CountSessionError(ValueError):
+    pass
+
+def _redis():
+    """실사 세션 전용 Redis 클라이언트 (앱 단위로 1개 재사용)"""
+    client = current_app.extensions.get('count_session_redis')
+    if client is None:
+        url = current_app.config.get('COUNT_SESSION_REDIS_URL') or current_app.config.get('CACHE_REDIS_URL')
+        client = redis.Redis.from_url(url, decode_responses=True)
+        current_app.extensions['count_session_redis'] = client
+    return client
+
+def _ttl():
+    return current_app.config.get('COUNT_SESSION_TTL', 172800)
+
+def _store_key(store_id):
+    return f'count_session:store:{store_id}'
+
+def _meta_key(session_id):
+    return f'count_session:{session_id}:meta'
+
+def _scans_key(session_id):
+    return f'count_session:{session_id}:scans'
+
+def _devices_key(session_id):
+    return f'count_session:{session_id}:devices'
+
+class CountSessionService:
+    """
+    여러 단말이 동시에 스캔하는 매장 실사 세션 (Redis)
+    - 매장당 열린 세션 1개, 바코드별 수량은 HINCRBY 로 단말 간 자동 합산
+    - 마감(flush) 시 StoreStock.actual_stock / stock_diff 를 집합 연산 한 번으로 반영
+    """
+
+    @staticmethod
+    def get_session(session_id):
+        meta = _redis().hgetall(_meta_key(session_id))
+        return meta or None
+
+    @staticmethod
+    def start_session(store_id, brand_id, user_id):
+        """매장에 열린 세션이 있으면 그 세션에 합류, 없으면 새로 생성"""
+        r = _redis()
+        existing = r.get(_store_key(store_id))
+        if existing and r.hget(_meta_key(existing), 'status') == STATUS_OPEN:
+            return existing, False
+
+        session_id = uuid.uuid4().hex
+        ttl = _ttl()
+        pipe = r.pipeline()
+        pipe.hset(_meta_key(session_id), mapping={
+            'session_id': session_id,
+            'store_id': store_id,
+            'brand_id': brand_id,
+            'started_by': user_id or '',
+            'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'status': STATUS_OPEN,
+            'total_units': 0
+        })
+        pipe.expire(_meta_key(session_id), ttl)
+        pipe.set(_store_key(store_id), session_id, ex=ttl)
+        pipe.execute()
+        return session_id, True
+
+    @staticmethod
+    def record_scans(session_id, scans, device_id=None):
+        """
+        스캔 누적. scans: [{'barcode', 'quantity'(기본 1, 음수는 정정)}]
+        반환: 세션 전체 누적 수량
+        """
+        args = []
+        for scan in scans:
+            barcode = clean_string_upper(scan.get('barcode', ''))
+            if not barcode:
+                continue
+            try:
+                qty = int(scan.get('quantity', 1))
+            except (ValueError, TypeError):
+                raise CountSessionError('수량은 숫자여야 합니다.')
+            if qty:
+                args.extend([barcode, qty])
+
+        r = _redis()
+        if not args:
+            return int(r.hget(_meta_key(session_id), 'total_units') or 0)
+
+        store_id = r.hget(_meta_key(session_id), 'store_id')
+        script = r.register_script(_RECORD_SCANS_LUA)
+        total = script(
+            keys=[_meta_key(session_id), _scans_key(session_id), _devices_key(session_id), _store_key(store_id)],
+            args=[device_id or 'unknown', _ttl(), *args]
+        )
+        if total == -1:
+            raise CountSessionError('종료되었거나 존재하지 않는 실사 세션입니다.')
+        return total
+
+    @staticmethod
+    def get_progress(session_id):
+        """실시간 진행 현황 (SKU 수, 누적 수량, 단말별 수량)"""
+        r = _redis()
+        pipe = r.pipeline()
+        pipe.hgetall(_meta_key(session_id))
+        pipe.hlen(_scans_key(session_id))
+        pipe.hgetall(_devices_key(session_id))
+        meta, sku_count, devices = pipe.execute()
+        if not meta:
+            return None
+        return {
+            'session_id': session_id,
+            'status': meta.get('status'),
+            'started_at': meta.get('started_at'),
+            'sku_count': sku_count,
+            'total_units': int(meta.get('total_units') or 0),
+            'devices': {device: int(units) for device, units in devices.items()}
+        }
+
+    @staticmethod
+    def flush_session(session_id):
+        """
+        세션 마감: 스캔 합계를 actual_stock / stock_diff 로 반영 후 Redis 키 삭제
+        DB 반영이 실패하면 세션을 다시 열어 스캔을 이어갈 수 있게 함
+        반환: (반영된 SKU 수, 미등록 바코드 목록)
+        """
+        r = _redis()
+        meta_key = _meta_key(session_id)
+
+        # 마감 중 표시 (이후 들어오는 스캔은 Lua 스크립트에서 거부)
+        with r.pipeline() as pipe:
+            pipe.watch(meta_key)
+            meta = pipe.hgetall(meta_key)
+            if not meta or meta.get('status') != STATUS_OPEN:
+                pipe.unwatch()
+                raise CountSessionError('종료되었거나 존재하지 않는 실사 세션입니다.')
+            pipe.multi()
+            pipe.hset(meta_key, 'status', STATUS_FLUSHING)
+            pipe.execute()
+
+        try:
+            counts = {
+                barcode: max(int(qty), 0)
+                for barcode, qty in r.hgetall(_scans_key(session_id)).items()
+            }
+            updated, unknown = InventoryService.set_actual_stock(
+                int(meta['store_id']), int(meta['brand_id']), counts
+            ) if counts else (0, [])
+        except Exception:
+            r.hset(meta_key, 'status', STATUS_OPEN)
+            raise
+
+        pipe = r.pipeline()
+        pipe.delete(meta_key, _scans_key(session_id), _devices_key(session_id))
+        if r.get(_store_key(meta['store_id'])) == session_id:
+            pipe.delete(_store_key(meta['store_id']))
+        pipe.execute()
+        return updated, unknown
+
+    @staticmethod
+    def cancel_session(session_id):
+        """세션 폐기 (DB 반영 없음)"""
+        r = _redis()
+        meta = r.hgetall(_meta_key(session_id))
+        if not meta:
+            return False
+        pipe = r.pipeline()
+        pipe.delete(_meta_key(session_id), _scans_key(session_id), _devices_key(session_id))
+        if r.get(_store_key(meta['store_id'])) == session_id:
+            pipe.delete(_store_key(meta['store_id']))
+        pipe.execute()
+        return True
@@ -1,52 +1,196 @@
 import re
-from sqlalchemy import or_, update, exc
+from sqlalchemy import or_, update, exc, inspect, text
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.dialects import postgresql, sqlite
+from flowork.extensions import cache
 from flowork.models import db, Product, Variant, StoreStock
 from flowork.utils import get_choseong, clean_string_upper
 
-def get_filter_options_from_db(brand_id):
-    try:
-        base_query = db.session.query(Product).filter_by(brand_id=brand_id)
-        
-        categories = [r[0] for r in base_query.distinct(Product.item_category).with_entities(Product.item_category).order_by(Product.item_category).all() if r[0]]
-        
-        years = [r[0] for r in base_query.distinct(Product.release_year).with_entities(Product.release_year).order_by(Product.release_year.desc()).all() if r[0]]
-        
-        variant_query = db.session.query(Variant).join(Product).filter(Product.brand_id == brand_id)
-        
-        colors = [r[0] for r in variant_query.distinct(Variant.color).with_entities(Variant.color).order_by(Variant.color).all() if r[0]]
-        
-        sizes_raw = [r[0] for r in variant_query.distinct(Variant.size).with_entities(Variant.size).all() if r[0]]
-        
-        def size_sort_key(size_str):
-            size_str_upper = str(size_str).upper().strip()
-            custom_order = {'2XS': 'XXS', '2XL': 'XXL', '3XL': 'XXXL'}
-            size_str_upper = custom_order.get(size_str_upper, size_str_upper)
-            order_map = {'XXS': 0, 'XS': 1, 'S': 2, 'M': 3, 'L': 4, 'XL': 5, 'XXL': 6, 'XXXL': 7}
-            
-            if size_str_upper.isdigit():
-                return (1, int(size_str_upper))
-            elif size_str_upper in order_map:
-                return (2, order_map[size_str_upper])
-            else:
-                return (3, size_str_upper)
-        
-        sizes = sorted(sizes_raw, key=size_sort_key)
+FACET_KEYS = ['categories', 'years', 'colors', 'sizes', 'original_prices', 'sale_prices']
+FACET_CACHE_TIMEOUT = 60 * 60 * 24
+
+def dialect_insert(model):
+    """현재 DB 방언의 INSERT (ON CONFLICT 지원: 운영 PostgreSQL / 테스트 SQLite)"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def create_missing_indexes():
+    """
+    모델에 선언됐지만 DB 에 없는 인덱스 생성 (create_all 은 이미 있는 테이블에 인덱스를 추가하지 않음)
+    인덱스 생성 중에는 해당 테이블 쓰기가 잠기므로 한가한 시간에 실행
+    반환: 생성한 인덱스 이름 목록
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name not in existing:
+                    index.create(conn)
+                    created.append(index.name)
+    return created
+
+def add_missing_columns():
+    """
+    모델에 선언됐지만 기존 테이블에 없는 컬럼 추가 (create_all 은 이미 있는 테이블을 변경하지 않음)
+    새 컬럼은 NULL 허용이거나 server_default 가 있어야 기존 행이 있는 테이블에 추가됨
+    반환: 추가한 'table.column' 목록
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with db.engine.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+                # 외래키는 CreateColumn 에 포함되지 않으므로 컬럼 제약으로 붙임 (예: stock_transfers.document_id)
+                for fk in column.foreign_keys:
+                    ddl += f' REFERENCES {preparer.format_table(fk.column.table)} ({preparer.quote(fk.column.name)})'
+                    if fk.ondelete:
+                        ddl += f' ON DELETE {fk.ondelete}'
+                conn.execute(text(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}'))
+                added.append(f'{table.name}.{column.name}')
+    return added
+
+SALES_ROLLUP_TABLES = {'sales_daily_rollup', 'sales_daily_store_rollup'}
+STOCK_TOTAL_TABLES = {'variant_stock_totals', 'product_stock_totals'}
+
+def upgrade_schema():
+    """
+    기존 DB 를 데이터 유지한 채 현재 모델에 맞춤 (여러 번 실행해도 안전)
+    1) 없는 테이블 생성 2) 기존 테이블에 없는 컬럼 추가 3) 없는 인덱스 생성
+    컬럼 삭제/타입 변경은 하지 않음
+    판매 집계/재고 합계 테이블을 새로 만든 경우 기존 판매/재고로 채움 (화면은 집계만 읽으므로 비어 있으면 0 으로 보임)
+    반환: (생성한 테이블, 추가한 컬럼, 생성한 인덱스) 이름 목록
+    """
+    existing_tables = set(inspect(db.engine).get_table_names())
+    new_tables = [table for table in db.metadata.sorted_tables if table.name not in existing_tables]
+    db.metadata.create_all(db.engine, tables=new_tables)
+    created_tables = [table.name for table in new_tables]
+    columns, indexes = add_missing_columns(), create_missing_indexes()
 
-        original_prices = [r[0] for r in variant_query.distinct(Variant.original_price).with_entities(Variant.original_price).order_by(Variant.original_price.desc()).all() if r[0] and r[0] > 0]
-        sale_prices = [r[0] for r in variant_query.distinct(Variant.sale_price).with_entities(Variant.sale_price).order_by(Variant.sale_price.desc()).all() if r[0] and r[0] > 0]
+    if STOCK_TOTAL_TABLES & set(created_tables):
+        from flowork.services.stock_totals import rebuild_stock_totals
+        rebuild_stock_totals()
+        db.session.commit()
+    if SALES_ROLLUP_TABLES & set(created_tables):
+        from flowork.services.sales_rollup import rebuild_sales_rollup
+        from flowork.services.analytics import invalidate_analytics_cache
+        rebuild_sales_rollup()
+        db.session.commit()
+        invalidate_analytics_cache()
+    return created_tables, columns, indexes
 
+def _facet_cache_key(brand_id):
+    return f'brand_facets_{brand_id}'
 
-        return {
-            'categories': categories,
-            'years': years,
-            'colors': colors,
-            'sizes': sizes,
-            'original_prices': original_prices,
-            'sale_prices': sale_prices
-        }
+def _empty_facets():
+    facets = {key: [] for key in FACET_KEYS}
+    facets['counts'] = {key: {} for key in FACET_KEYS}
+    return facets
+
+def size_sort_key(size_str):
+    size_str_upper = str(size_str).upper().strip()
+    custom_order = {'2XS': 'XXS', '2XL': 'XXL', '3XL': 'XXXL'}
+    size_str_upper = custom_order.get(size_str_upper, size_str_upper)
+    order_map = {'XXS': 0, 'XS': 1, 'S': 2, 'M': 3, 'L': 4, 'XL': 5, 'XXL': 6, 'XXXL': 7}
+    
+    if size_str_upper.isdigit():
+        return (1, int(size_str_upper), '')
+    elif size_str_upper in order_map:
+        return (2, order_map[size_str_upper], '')
+    else:
+        return (3, 0, size_str_upper)
+
+def build_filter_facets(brand_id):
+    """
+    상세검색 필터 옵션(품목/년도/컬러/사이즈/가격)과 값별 상품 수를 한 번의 스캔으로 계산
+    product_id 순으로 스트리밍하면서 상품 단위로 값을 모아 카운트하므로 메모리 사용이 작음
+    """
+    counts = {key: {} for key in FACET_KEYS}
+
+    rows = db.session.query(
+        Product.id, Product.item_category, Product.release_year,
+        Variant.color, Variant.size, Variant.original_price, Variant.sale_price
+    ).outerjoin(Variant, Variant.product_id == Product.id)\
+     .filter(Product.brand_id == brand_id)\
+     .order_by(Product.id)\
+     .yield_per(5000)
+
+    def flush(seen):
+        for key, values in seen.items():
+            bucket = counts[key]
+            for value in values:
+                bucket[value] = bucket.get(value, 0) + 1
+
+    current_pid = None
+    seen = None
+    for pid, category, year, color, size, o_price, s_price in rows:
+        if pid != current_pid:
+            if seen is not None:
+                flush(seen)
+            current_pid = pid
+            seen = {key: set() for key in FACET_KEYS}
+            if category: seen['categories'].add(category)
+            if year: seen['years'].add(year)
+        if color: seen['colors'].add(color)
+        if size: seen['sizes'].add(size)
+        if o_price and o_price > 0: seen['original_prices'].add(o_price)
+        if s_price and s_price > 0: seen['sale_prices'].add(s_price)
+    if seen is not None:
+        flush(seen)
+
+    return {
+        'categories': sorted(counts['categories']),
+        'years': sorted(counts['years'], reverse=True),
+        'colors': sorted(counts['colors']),
+        'sizes': sorted(counts['sizes'], key=size_sort_key),
+        'original_prices': sorted(counts['original_prices'], reverse=True),
+        'sale_prices': sorted(counts['sale_prices'], reverse=True),
+        'counts': counts
+    }
+
+def rebuild_filter_facets(brand_id):
+    """필터 옵션을 다시 계산해 Redis에 저장 (Celery 백그라운드 작업에서 호출)"""
+    facets = build_filter_facets(brand_id)
+    try:
+        cache.set(_facet_cache_key(brand_id), facets, timeout=FACET_CACHE_TIMEOUT)
+    except Exception as e:
+        print(f"Facet cache store failed: {e}")
+    return facets
+
+def invalidate_filter_facets(brand_id):
+    try:
+        cache.delete(_facet_cache_key(brand_id))
+    except Exception:
+        pass
+
+def get_filter_options_from_db(brand_id):
+    if not brand_id:
+        return _empty_facets()
+    try:
+        try:
+            facets = cache.get(_facet_cache_key(brand_id))
+        except Exception:
+            facets = None
+        if facets is None:
+            # 캐시 미스(최초 조회/Redis 장애)일 때만 직접 계산
+            facets = rebuild_filter_facets(brand_id)
+        return facets
     except Exception as e:
         print(f"Error fetching filter options: {e}")
-        return { 'categories': [], 'years': [], 'colors': [], 'sizes': [], 'original_prices': [], 'sale_prices': [] }
+        return _empty_facets()
 
 def sync_missing_data_in_db(brand_id):
     updated_variant_count = 0
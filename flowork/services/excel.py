@@ -4,9 +4,8 @@ from openpyxl.utils import column_index_from_string
 from flowork.utils import clean_string_upper, get_choseong, generate_barcode
 import traceback
 import json
-import os
-from flask import current_app
-from flowork.models import db, Product, Variant, StoreStock, Setting, Brand
+from flowork.models import db, Product, Variant, StoreStock, Store
+from flowork.services.brand_settings import get_brand_settings
 
 try:
     from flowork.services.transformer import transform_horizontal_to_vertical
@@ -160,22 +159,10 @@ def verify_stock_excel(file_path, form, upload_mode):
 
 def parse_stock_excel(file_path, form, upload_mode, brand_id, excluded_row_indices=None):
     try:
-        settings_query = Setting.query.filter_by(brand_id=brand_id).all()
-        brand_settings = {s.key: s.value for s in settings_query}
-        
-        if 'SIZE_MAPPING' not in brand_settings or 'CATEGORY_MAPPING_RULE' not in brand_settings:
-            try:
-                brand = db.session.get(Brand, brand_id)
-                if brand:
-                    json_path = os.path.join(current_app.root_path, 'brands', f'{brand.brand_name}.json')
-                    if os.path.exists(json_path):
-                        with open(json_path, 'r', encoding='utf-8') as f:
-                            file_config = json.load(f)
-                            for k, v in file_config.items():
-                                if k not in brand_settings:
-                                    brand_settings[k] = json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
-            except Exception as e:
-                print(f"Config file fallback failed: {e}")
+        settings = get_brand_settings(brand_id)
+        # 매핑 설정이 DB에 없으면 brands/*.json 값으로 보완 (파일 내용도 캐시에 포함됨)
+        needs_file_fallback = 'SIZE_MAPPING' not in settings or 'CATEGORY_MAPPING_RULE' not in settings
+        brand_settings = settings.to_dict(with_file_fallback=needs_file_fallback)
 
         is_horizontal = form.get('is_horizontal') == 'on'
 
@@ -250,6 +237,127 @@ def parse_stock_excel(file_path, form, upload_mode, brand_id, excluded_row_indic
         traceback.print_exc()
         return None, f"파싱 오류: {e}"
 
+def _clean_cell(value):
+    """엑셀 셀 값 -> 비교용 대문자 문자열 (숫자로 읽힌 바코드/코드의 '.0' 제거)"""
+    if pd.isna(value):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return clean_string_upper(str(value))
+
+def parse_transfer_allocation_excel(file_stream, form, brand_id):
+    """
+    본사 이동 배분표 파싱 (행: 출고매장 / 입고매장 / 바코드 / 수량)
+    매장은 매장명 또는 매장코드, 열 위치는 폼(col_source, col_target, col_barcode, col_qty, 기본 A~D)
+    반환: ([(source_store_id, target_store_id, variant_id, quantity)], [{'row_index', 'reason'}])
+    """
+    defaults = {'col_source': 'A', 'col_target': 'B', 'col_barcode': 'C', 'col_qty': 'D'}
+    form = {key: form.get(key) or default for key, default in defaults.items()}
+    field_map = {
+        'source_store': ('col_source', True),
+        'target_store': ('col_target', True),
+        'barcode': ('col_barcode', True),
+        'quantity': ('col_qty', True)
+    }
+    column_map_indices = _get_column_indices_from_form(form, field_map)
+    df = _read_excel_data_to_df(file_stream, column_map_indices)
+    if df.empty:
+        return [], [{'row_index': None, 'reason': '처리할 데이터가 없습니다.'}]
+
+    df['_row_index'] = df.index + 2
+
+    stores = Store.query.filter_by(brand_id=brand_id).all()
+    store_map = {}
+    for store in stores:
+        store_map[clean_string_upper(store.store_name)] = store.id
+        if store.store_code:
+            store_map[clean_string_upper(store.store_code)] = store.id
+
+    df['source_store_id'] = df['source_store'].map(_clean_cell).map(store_map)
+    df['target_store_id'] = df['target_store'].map(_clean_cell).map(store_map)
+    df['barcode_cleaned'] = df['barcode'].map(_clean_cell)
+    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).astype(int)
+
+    barcodes = [b for b in df['barcode_cleaned'].unique() if b]
+    variant_map = dict(
+        db.session.query(Variant.barcode_cleaned, Variant.id).join(Product).filter(
+            Product.brand_id == brand_id,
+            Variant.barcode_cleaned.in_(barcodes)
+        ).all()
+    ) if barcodes else {}
+    df['variant_id'] = df['barcode_cleaned'].map(variant_map)
+
+    reasons = np.select(
+        [
+            df['source_store_id'].isna(),
+            df['target_store_id'].isna(),
+            df['variant_id'].isna(),
+            df['quantity'] <= 0,
+            df['source_store_id'] == df['target_store_id']
+        ],
+        ['출고매장 없음', '입고매장 없음', '바코드 없음', '수량 오류', '출고/입고 매장 동일'],
+        default=''
+    )
+    errors = [
+        {'row_index': int(row_index), 'reason': reason}
+        for row_index, reason in zip(df['_row_index'], reasons) if reason
+    ]
+
+    valid = df[reasons == '']
+    lines = list(zip(
+        valid['source_store_id'].astype(int),
+        valid['target_store_id'].astype(int),
+        valid['variant_id'].astype(int),
+        valid['quantity'].astype(int)
+    ))
+    return [tuple(int(v) for v in line) for line in lines], errors
+
+def parse_store_order_excel(file_stream, form, brand_id):
+    """
+    매장 주문서 파싱 (행: 바코드 / 수량, 열 위치는 폼 col_barcode, col_qty, 기본 A~B)
+    같은 바코드가 여러 행이면 수량 합산, 바코드는 IN 조회 한 번으로 옵션 매칭
+    반환: ([(variant_id, quantity)], [{'row_index', 'barcode', 'reason'}])
+    """
+    defaults = {'col_barcode': 'A', 'col_qty': 'B'}
+    form = {key: form.get(key) or default for key, default in defaults.items()}
+    field_map = {
+        'barcode': ('col_barcode', True),
+        'quantity': ('col_qty', True)
+    }
+    column_map_indices = _get_column_indices_from_form(form, field_map)
+    df = _read_excel_data_to_df(file_stream, column_map_indices)
+    if df.empty:
+        return [], [{'row_index': None, 'barcode': None, 'reason': '처리할 데이터가 없습니다.'}]
+
+    df['_row_index'] = df.index + 2
+    df['barcode_cleaned'] = df['barcode'].map(_clean_cell)
+    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).astype(int)
+    df = df[df['barcode_cleaned'] != '']
+
+    barcodes = df['barcode_cleaned'].unique().tolist()
+    variant_map = dict(
+        db.session.query(Variant.barcode_cleaned, Variant.id).join(Product).filter(
+            Product.brand_id == brand_id,
+            Variant.barcode_cleaned.in_(barcodes)
+        ).all()
+    ) if barcodes else {}
+    df['variant_id'] = df['barcode_cleaned'].map(variant_map)
+
+    reasons = np.select(
+        [df['variant_id'].isna(), df['quantity'] <= 0],
+        ['바코드 없음', '수량 오류'],
+        default=''
+    )
+    errors = [
+        {'row_index': int(row_index), 'barcode': barcode, 'reason': reason}
+        for row_index, barcode, reason in zip(df['_row_index'], df['barcode_cleaned'], reasons) if reason
+    ]
+
+    valid = df[reasons == '']
+    totals = valid.groupby(valid['variant_id'].astype(int), sort=False)['quantity'].sum()
+    lines = [(int(variant_id), int(qty)) for variant_id, qty in totals.items()]
+    return lines, errors
+
 def export_db_to_excel(brand_id):
     import io
     import openpyxl
@@ -0,0 +1,168 @@
+import os
+import re
+import gzip
+from datetime import date
+from sqlalchemy import text
+from flask import current_app
+from flowork.extensions import db
+
+PARENT_TABLE = 'stock_history'
+LEGACY_TABLE = 'stock_history_legacy'
+DEFAULT_PARTITION = 'stock_history_default'
+PARTITION_NAME_RE = re.compile(r'^stock_history_y(\d{4})m(\d{2})$')
+
+BRIN_INDEX = 'ix_stock_history_created_at_brin'
+SKU_INDEX = 'ix_stock_history_store_variant_created'
+
+def _month_start(d):
+    return date(d.year, d.month, 1)
+
+def _add_months(d, months):
+    idx = d.year * 12 + (d.month - 1) + months
+    return date(idx // 12, idx % 12 + 1, 1)
+
+def partition_name(month):
+    return f'{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}'
+
+def is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+def is_partitioned(conn):
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name AND c.relnamespace = 'public'::regnamespace"
+    ), {'name': PARENT_TABLE}).scalar())
+
+def list_partitions(conn):
+    """[(파티션명, 해당 월 1일)] (기본 파티션 제외, 오래된 순)"""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {'name': PARENT_TABLE}).scalars().all()
+
+    partitions = []
+    for name in rows:
+        m = PARTITION_NAME_RE.match(name)
+        if m:
+            partitions.append((name, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+def _create_month_partition(conn, month):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    ))
+
+def ensure_partitions(conn, months_ahead=3, from_month=None):
+    """from_month(기본: 이번 달)부터 months_ahead 개월 뒤까지 월 파티션 생성"""
+    start = _month_start(from_month or date.today())
+    end = _add_months(_month_start(date.today()), months_ahead)
+    month = start
+    created = 0
+    while month <= end:
+        _create_month_partition(conn, month)
+        month = _add_months(month, 1)
+        created += 1
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+    return created
+
+def convert_to_partitioned(months_ahead=3):
+    """
+    기존 stock_history 를 created_at 기준 월별 RANGE 파티션 테이블로 변환 (1회성, 단일 트랜잭션)
+    - PK 는 파티션 키를 포함해야 하므로 (id, created_at)
+    - id 시퀀스/외래키는 그대로 유지, 기존 행은 해당 월 파티션으로 이동
+    """
+    if not is_postgres():
+        raise RuntimeError('파티션 변환은 PostgreSQL 에서만 지원됩니다.')
+
+    with db.engine.begin() as conn:
+        if is_partitioned(conn):
+            return 0
+
+        conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(f"UPDATE {PARENT_TABLE} SET created_at = now() WHERE created_at IS NULL"))
+
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+        conn.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {LEGACY_TABLE}_pkey"))
+        conn.execute(text(f"DROP INDEX IF EXISTS {BRIN_INDEX}"))
+        conn.execute(text(f"DROP INDEX IF EXISTS {SKU_INDEX}"))
+
+        conn.execute(text(
+            f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        ))
+        conn.execute(text(f"ALTER SEQUENCE {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN created_at SET NOT NULL"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, created_at)"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (store_id) REFERENCES stores (id)"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (variant_id) REFERENCES variants (id)"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+
+        oldest = conn.execute(text(f"SELECT min(created_at) FROM {LEGACY_TABLE}")).scalar()
+        ensure_partitions(conn, months_ahead, from_month=oldest.date() if oldest else None)
+
+        conn.execute(text(f"CREATE INDEX {BRIN_INDEX} ON {PARENT_TABLE} USING brin (created_at)"))
+        conn.execute(text(f"CREATE INDEX {SKU_INDEX} ON {PARENT_TABLE} (store_id, variant_id, created_at)"))
+
+        moved = conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {LEGACY_TABLE}")).rowcount
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+        return moved
+
+def _export_partition(name, archive_dir):
+    """
+    파티션 내용을 gzip CSV 로 저장 (COPY TO STDOUT)
+    임시 파일에 쓴 뒤 완료되면 이름을 바꾸므로 실패 시 불완전한 보관 파일이 남지 않음
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{name}.csv.gz')
+    tmp_path = f'{path}.tmp'
+    raw_conn = db.engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+        cursor.close()
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        raw_conn.close()
+    return path
+
+def archive_old_partitions(retention_months=None, archive_dir=None, months_ahead=None):
+    """
+    보관 기간이 지난 월 파티션을 압축 파일로 보관 -> 분리(DETACH) 및 삭제 (한 트랜잭션)
+    앞으로 쓸 파티션도 미리 생성. 반환: (보관된 파티션명 목록, 생성 시도한 월 수)
+    """
+    if not is_postgres():
+        return [], 0
+
+    config = current_app.config
+    retention_months = retention_months or config.get('STOCK_HISTORY_RETENTION_MONTHS', 24)
+    archive_dir = archive_dir or config.get('STOCK_HISTORY_ARCHIVE_DIR', '/tmp/stock_history_archive')
+    months_ahead = months_ahead or config.get('STOCK_HISTORY_PARTITIONS_AHEAD', 3)
+
+    with db.engine.begin() as conn:
+        if not is_partitioned(conn):
+            return [], 0
+        created = ensure_partitions(conn, months_ahead)
+        cutoff = _add_months(_month_start(date.today()), -retention_months)
+        expired = [name for name, month in list_partitions(conn) if _add_months(month, 1) <= cutoff]
+
+    archived = []
+    for name in expired:
+        # 붙어 있는 상태에서 먼저 내보내고 성공한 경우에만 분리/삭제
+        # (내보내기 실패 시 파티션은 그대로 남아 다음 실행에서 다시 시도, 지난 월 파티션이라 그 사이 쓰기 없음)
+        path = _export_partition(name, archive_dir)
+
+        with db.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        current_app.logger.info(f"Archived {name} -> {path}")
+        archived.append(name)
+
+    return archived, created
@@ -1,10 +1,15 @@
 import traceback
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, values, column, exists, func, literal, String, Integer
 from flowork.extensions import db
 from flowork.models import Product, Variant, StoreStock, Store, StockHistory
 from flowork.utils import clean_string_upper, get_choseong
 from flowork.constants import StockChangeType
+from flowork.services.stock_totals import apply_stock_deltas, delete_stock_totals
+from flowork.services.db import dialect_insert
+
+ACTUAL_STOCK_CHUNK_SIZE = 5000
+CHECK_ADJUST_CHUNK_SIZE = 5000
 
 class InventoryService:
     @staticmethod
@@ -208,6 +213,7 @@ class InventoryService:
                             db.session.bulk_update_mappings(StoreStock, stocks_to_update)
                         if history_data:
                             db.session.bulk_insert_mappings(StockHistory, history_data)
+                            apply_stock_deltas((h['variant_id'], h['quantity_change']) for h in history_data)
 
                 db.session.commit() # [중요] 배치 단위 커밋
                 processed_count += len(batch_records)
@@ -242,6 +248,7 @@ class InventoryService:
             product_ids = [p[0] for p in product_ids]
             
             if product_ids:
+                delete_stock_totals(product_ids=product_ids)
                 db.session.query(Variant).filter(Variant.product_id.in_(product_ids)).delete(synchronize_session=False)
             
             db.session.query(Product).filter_by(brand_id=brand_id).delete(synchronize_session=False)
@@ -317,4 +324,154 @@ class InventoryService:
         except Exception as e:
             db.session.rollback()
             traceback.print_exc()
-            raise e
\ No newline at end of file
+            raise e
+
+    @staticmethod
+    def set_actual_stock(store_id, brand_id, barcode_quantities, progress_callback=None):
+        """
+        실사재고 일괄 반영 (ORM 객체 없이 집합 연산)
+        - barcode_quantities: {정제된 바코드: 실사 수량}
+        - 청크마다 VALUES 목록을 옵션과 조인해 INSERT ... ON CONFLICT DO UPDATE SET actual_stock = EXCLUDED.actual_stock
+          (재고 행이 없으면 quantity 0 으로 생성, stock_diff = 전산 - 실사)
+        - DB에 없는 바코드는 같은 VALUES 목록의 anti-join 으로 조회
+        반환: (반영된 SKU 수, 미등록 바코드 목록)
+        """
+        items = [(str(barcode), int(qty)) for barcode, qty in barcode_quantities.items() if barcode]
+        total = len(items)
+        updated = 0
+        unknown = []
+
+        try:
+            for i in range(0, total, ACTUAL_STOCK_CHUNK_SIZE):
+                chunk = items[i:i + ACTUAL_STOCK_CHUNK_SIZE]
+                counted = values(
+                    column('barcode', String), column('actual_stock', Integer), name='counted'
+                ).data(chunk).cte('counted')
+
+                matched = select(
+                    literal(store_id, Integer), Variant.id, literal(0, Integer), counted.c.actual_stock, -counted.c.actual_stock
+                ).select_from(counted).join(
+                    Variant, Variant.barcode_cleaned == counted.c.barcode
+                ).join(Product, Product.id == Variant.product_id).where(Product.brand_id == brand_id)
+
+                stmt = dialect_insert(StoreStock).from_select(
+                    ['store_id', 'variant_id', 'quantity', 'actual_stock', 'stock_diff'], matched
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['store_id', 'variant_id'],
+                    set_={
+                        'actual_stock': stmt.excluded.actual_stock,
+                        'stock_diff': func.coalesce(StoreStock.quantity, 0) - stmt.excluded.actual_stock,
+                        'updated_at': func.now()
+                    }
+                ).returning(StoreStock.variant_id)
+                updated += len(db.session.execute(stmt).all())
+
+                unknown.extend(db.session.execute(
+                    select(counted.c.barcode).where(~exists().where(
+                        Variant.barcode_cleaned == counted.c.barcode,
+                        Product.id == Variant.product_id,
+                        Product.brand_id == brand_id
+                    ))
+                ).scalars().all())
+
+                db.session.commit()
+                if progress_callback:
+                    progress_callback(min(i + ACTUAL_STOCK_CHUNK_SIZE, total), total)
+
+            return updated, unknown
+
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            raise e
+
+    @staticmethod
+    def apply_actual_stock(store_id, user_id=None, progress_callback=None):
+        """
+        실사재고를 전산재고로 반영 (CHECK_ADJUST)
+        - 실사값이 있는 재고 행을 id 순 청크로 나눠 청크마다 한 트랜잭션:
+          실사값 있는 행 전체 잠금/조회 -> 차이 행 이력 일괄 INSERT -> 잠근 행 quantity/stock_diff/last_check_date 일괄 UPDATE -> 합계 테이블 증분
+        - stock_diff 에는 반영 직전 차이(전산 - 실사)를 남기고 actual_stock 은 비움
+        반환: {'total': {...}, 'by_category': {분류: {...}}} (skus, plus, minus, net)
+        """
+        def _bucket():
+            return {'skus': 0, 'plus': 0, 'minus': 0, 'net': 0}
+
+        summary = _bucket()
+        by_category = {}
+
+        stock_ids = db.session.execute(
+            select(StoreStock.id).where(
+                StoreStock.store_id == store_id,
+                StoreStock.actual_stock.isnot(None)
+            ).order_by(StoreStock.id)
+        ).scalars().all()
+        total = len(stock_ids)
+
+        try:
+            for i in range(0, total, CHECK_ADJUST_CHUNK_SIZE):
+                chunk_ids = stock_ids[i:i + CHECK_ADJUST_CHUNK_SIZE]
+
+                # 1) 실사값이 있는 행 전체 잠금 (차이 없는 행도 3) 에서 덮어쓰므로 함께 잠가야 그 사이 판매가 유실되지 않음)
+                locked = db.session.execute(
+                    select(StoreStock.id, StoreStock.variant_id, func.coalesce(StoreStock.quantity, 0),
+                           StoreStock.actual_stock, Product.item_category)
+                    .join(Variant, Variant.id == StoreStock.variant_id)
+                    .join(Product, Product.id == Variant.product_id)
+                    .where(StoreStock.id.in_(chunk_ids), StoreStock.actual_stock.isnot(None))
+                    .order_by(StoreStock.variant_id)
+                    .with_for_update(of=StoreStock)
+                ).all()
+                diff_rows = [
+                    (variant_id, actual - quantity, actual, category)
+                    for _, variant_id, quantity, actual, category in locked if actual != quantity
+                ]
+
+                # 2) 이력 (잠근 시점의 값 기준)
+                if diff_rows:
+                    db.session.execute(insert(StockHistory), [{
+                        'store_id': store_id,
+                        'variant_id': variant_id,
+                        'change_type': StockChangeType.CHECK_ADJUST,
+                        'quantity_change': delta,
+                        'current_quantity': actual,
+                        'user_id': user_id,
+                        'description': '실사 반영'
+                    } for variant_id, delta, actual, _ in diff_rows])
+
+                # 3) 잠근 행만 전산재고 = 실사재고 (잠금 중이라 SET 우변은 1) 에서 읽은 값과 같음)
+                #    반영한 실사값은 비워 재실행(작업 재시도/중복 클릭) 시 이후 판매분을 옛 실사값으로 덮지 않음
+                if locked:
+                    db.session.execute(
+                        update(StoreStock).where(
+                            StoreStock.id.in_([row[0] for row in locked])
+                        ).values(
+                            stock_diff=func.coalesce(StoreStock.quantity, 0) - StoreStock.actual_stock,
+                            quantity=StoreStock.actual_stock,
+                            actual_stock=None,
+                            last_check_date=func.now()
+                        ).execution_options(synchronize_session=False)
+                    )
+
+                apply_stock_deltas((variant_id, delta) for variant_id, delta, _, _ in diff_rows)
+                db.session.commit()
+
+                for _, delta, _, category in diff_rows:
+                    for bucket in (summary, by_category.setdefault(category or '미분류', _bucket())):
+                        bucket['skus'] += 1
+                        bucket['net'] += delta
+                        if delta > 0:
+                            bucket['plus'] += delta
+                        else:
+                            bucket['minus'] += -delta
+
+                if progress_callback:
+                    progress_callback(min(i + CHECK_ADJUST_CHUNK_SIZE, total), total)
+
+            return {'total': summary, 'by_category': by_category}
+
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            raise e
@@ -0,0 +1,56 @@
+import time
+import threading
+
+class LocalTTLCache:
+    """
+    프로세스 로컬 TTL 캐시 (gunicorn 워커/스레드 단위)
+    Redis 왕복조차 아까운 핫패스용 1차 캐시로 사용
+    """
+    def __init__(self, ttl_seconds=10, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(value, tag) 반환. 만료되었거나 없으면 (None, None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if not entry:
+                return None, None
+            expires_at, tag, value = entry
+            if expires_at < time.monotonic():
+                return None, tag
+            return value, tag
+
+    def peek(self, key):
+        """만료 여부와 관계없이 (value, tag) 반환 (버전 재검증용)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if not entry:
+                return None, None
+            return entry[2], entry[1]
+
+    def set(self, key, value, tag=None, ttl_seconds=None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            if len(self._data) >= self.max_entries and key not in self._data:
+                oldest_key = min(self._data, key=lambda k: self._data[k][0])
+                self._data.pop(oldest_key, None)
+            self._data[key] = (time.monotonic() + ttl, tag, value)
+
+    def touch(self, key, ttl_seconds=None):
+        """값은 유지하고 만료 시각만 연장"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            entry = self._data.get(key)
+            if entry:
+                self._data[key] = (time.monotonic() + ttl, entry[1], entry[2])
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
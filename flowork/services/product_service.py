@@ -1,9 +1,11 @@
 import traceback
 from sqlalchemy import func
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm import selectinload
 from flask import current_app
 from flowork.extensions import db, cache
 from flowork.models import Product, Variant, Store, StoreStock
+from flowork.services.stock_matrix import get_stock_matrix
+from flowork.services.stock_totals import get_variant_totals, get_product_total
 
 class ProductService:
     @staticmethod
@@ -25,12 +27,16 @@ class ProductService:
                 Variant.product_id == product.id
             ).order_by(Variant.color, Variant.size).all()
             
+            # 전체 매장 합계는 합계 테이블에서 단건 조회
+            total_stock_map = get_variant_totals(v.id for v in variants)
+            
             variants_list_for_json = [{
                 'id': v.id,
                 'barcode': v.barcode,
                 'color': v.color,
                 'size': v.size,
                 'hq_quantity': v.hq_quantity or 0,
+                'total_quantity': total_stock_map.get(v.id, 0),
                 'original_price': v.original_price or 0,
                 'sale_price': v.sale_price or 0
             } for v in variants]
@@ -65,6 +71,8 @@ class ProductService:
                 'variants': variants,
                 'variants_list_for_json': variants_list_for_json,
                 'stock_data_map': stock_data_map,
+                'total_stock_map': total_stock_map,
+                'product_total_stock': get_product_total(product.id),
                 'all_stores': all_stores,
                 'my_store_id': my_store_id,
                 'related_products': related_products
@@ -83,40 +91,15 @@ class ProductService:
             if not brand_id:
                 return {
                     'all_stores': [],
-                    'all_variants': [],
-                    'stock_matrix': {}
+                    'matrix': None
                 }
 
-            all_stores = Store.query.filter(
-                Store.brand_id == brand_id,
-                Store.is_active == True
-            ).order_by(Store.store_name).all()
-            
-            store_id_set = {s.id for s in all_stores}
-
-            all_variants = db.session.query(Variant)\
-                .join(Product)\
-                .filter(Product.brand_id == brand_id)\
-                .options(
-                    joinedload(Variant.product),
-                    selectinload(Variant.store_stocks)
-                )\
-                .order_by(Product.product_number, Variant.color, Variant.size)\
-                .all()
-            
-            stock_matrix = {}
-            for v in all_variants:
-                stock_map_for_variant = {}
-                for stock_level in v.store_stocks:
-                    if stock_level.store_id in store_id_set:
-                        stock_map_for_variant[stock_level.store_id] = stock_level.quantity
-                
-                stock_matrix[v.id] = stock_map_for_variant
+            # (variant_id, store_id, quantity) 단일 프로젝션 쿼리로 만든 int32 배열 (브랜드별 캐시)
+            matrix = get_stock_matrix(brand_id)
                 
             return {
-                'all_stores': all_stores,
-                'all_variants': all_variants,
-                'stock_matrix': stock_matrix
+                'all_stores': matrix.stores,
+                'matrix': matrix
             }
         except Exception as e:
             current_app.logger.error(f"Error in ProductService.get_stock_overview_matrix: {e}")
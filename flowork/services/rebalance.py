@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import select, func
+from flowork.extensions import db
+from flowork.models import SalesDailyRollup
+from flowork.services.stock_matrix import build_stock_matrix, _index_positions
+
+def build_sales_matrix(matrix, days):
+    """재고 매트릭스와 같은 (SKU x 매장) 모양의 최근 days 일 판매 수량 배열"""
+    sold = np.zeros(matrix.shape, dtype=np.int32)
+    if not sold.size:
+        return sold
+
+    cutoff = date.today() - timedelta(days=days)
+    rows = db.session.execute(
+        select(SalesDailyRollup.variant_id, SalesDailyRollup.store_id, func.sum(SalesDailyRollup.quantity))
+        .where(SalesDailyRollup.sale_date > cutoff, SalesDailyRollup.store_id.in_(matrix.store_ids.tolist()))
+        .group_by(SalesDailyRollup.variant_id, SalesDailyRollup.store_id)
+    ).all()
+    if not rows:
+        return sold
+
+    data = np.array(rows, dtype=np.int64)
+    v_order = np.argsort(matrix.variant_ids, kind='stable')
+    s_order = np.argsort(matrix.store_ids, kind='stable')
+    r, r_ok = _index_positions(matrix.variant_ids[v_order], v_order, data[:, 0])
+    c, c_ok = _index_positions(matrix.store_ids[s_order], s_order, data[:, 1])
+    ok = r_ok & c_ok
+    sold[r[ok], c[ok]] = data[ok, 2].astype(np.int32)
+    return sold
+
+def compute_surplus_deficit(stock, sold, days, target_days, min_keep=1):
+    """
+    매장별 재고 일수(days of cover) 기준 과잉/부족 수량
+    - 일 판매속도 = 판매수량 / days, 목표 재고 = ceil(속도 x target_days)
+    - 과잉: 목표 재고(판매가 없으면 min_keep)를 넘는 수량 / 부족: 판매가 있는데 목표에 못 미치는 수량
+    반환: (cover, surplus, deficit) - cover 는 판매가 없으면 inf
+    """
+    stock = np.maximum(stock, 0).astype(np.int64)
+    velocity = sold.astype(np.float64) / float(days)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(velocity > 0, stock / velocity, np.inf)
+
+    target = np.ceil(velocity * target_days).astype(np.int64)
+    keep = np.maximum(target, min_keep)
+    surplus = np.maximum(stock - keep, 0)
+    deficit = np.where(sold > 0, np.maximum(target - stock, 0), 0)
+    return cover, surplus, deficit
+
+def _sorted_entries(amounts):
+    """0이 아닌 셀을 (행 오름차순, 수량 내림차순)으로 정렬한 (row, col, amount)"""
+    rows, cols = np.nonzero(amounts)
+    qty = amounts[rows, cols]
+    order = np.lexsort((-qty, rows))
+    return rows[order], cols[order], qty[order]
+
+def _row_cumsum(rows, qty, n_rows):
+    """행 안에서의 누적합 (행이 바뀌면 0부터)"""
+    total = np.cumsum(qty)
+    row_totals = np.bincount(rows, weights=qty, minlength=n_rows).astype(np.int64)
+    row_start = np.concatenate(([0], np.cumsum(row_totals)[:-1]))
+    return total - row_start[rows], row_totals
+
+def match_transfers(surplus, deficit):
+    """
+    SKU 별 그리디 매칭 (과잉이 큰 매장 -> 부족이 큰 매장), 전체 행을 한 번에 벡터 처리
+    각 행의 공급/수요를 수직선 위 구간으로 펼친 뒤 구간 경계로 잘라 겹치는 길이를 이동 수량으로 사용
+    반환: (rows, source_cols, target_cols, quantities)
+    """
+    n_rows = surplus.shape[0]
+    empty = (np.array([], dtype=np.int64),) * 4
+    if not n_rows:
+        return empty
+
+    s_rows, s_cols, s_qty = _sorted_entries(surplus)
+    d_rows, d_cols, d_qty = _sorted_entries(deficit)
+    if not len(s_rows) or not len(d_rows):
+        return empty
+
+    s_cum, s_tot = _row_cumsum(s_rows, s_qty, n_rows)
+    d_cum, d_tot = _row_cumsum(d_rows, d_qty, n_rows)
+
+    matched = np.minimum(s_tot, d_tot)
+    base = np.concatenate(([0], np.cumsum(matched)[:-1]))
+    if matched.sum() == 0:
+        return empty
+
+    # 행별 매칭 가능량(matched) 안으로 잘라 전역 좌표로 변환
+    s_end = base[s_rows] + np.minimum(s_cum, matched[s_rows])
+    d_end = base[d_rows] + np.minimum(d_cum, matched[d_rows])
+
+    points = np.unique(np.concatenate((s_end, d_end, base[matched > 0])))
+    starts, ends = points[:-1], points[1:]
+    lengths = ends - starts
+
+    s_idx = np.searchsorted(s_end, starts, side='right')
+    d_idx = np.searchsorted(d_end, starts, side='right')
+    valid = (lengths > 0) & (s_idx < len(s_end)) & (d_idx < len(d_end))
+    s_idx, d_idx, lengths = s_idx[valid], d_idx[valid], lengths[valid]
+
+    same_row = s_rows[s_idx] == d_rows[d_idx]
+    s_idx, d_idx, lengths = s_idx[same_row], d_idx[same_row], lengths[same_row]
+
+    return s_rows[s_idx], s_cols[s_idx], d_cols[d_idx], lengths
+
+def suggest_rebalance(brand_id, days=28, target_days=14, min_keep=1, min_quantity=1):
+    """
+    브랜드 전체 재고 재배치 제안 계산 (DB 쓰기 없음)
+    반환: ([(source_store_id, target_store_id, variant_id, quantity)], 요약 dict)
+    """
+    matrix = build_stock_matrix(brand_id)
+    sold = build_sales_matrix(matrix, days)
+    cover, surplus, deficit = compute_surplus_deficit(matrix.quantities, sold, days, target_days, min_keep)
+
+    rows, src, dst, qty = match_transfers(surplus, deficit)
+    keep = qty >= min_quantity
+    rows, src, dst, qty = rows[keep], src[keep], dst[keep], qty[keep]
+
+    suggestions = list(zip(
+        matrix.store_ids[src].tolist(),
+        matrix.store_ids[dst].tolist(),
+        matrix.variant_ids[rows].tolist(),
+        qty.astype(int).tolist()
+    ))
+    summary = {
+        'skus': int(matrix.shape[0]),
+        'stores': int(matrix.shape[1]),
+        'surplus_units': int(surplus.sum()),
+        'deficit_units': int(deficit.sum()),
+        'suggested_lines': len(suggestions),
+        'suggested_units': int(qty.sum()),
+        'stockout_cells': int(np.count_nonzero((sold > 0) & (matrix.quantities <= 0))),
+        'median_cover_days': float(np.median(cover[np.isfinite(cover)])) if np.isfinite(cover).any() else None
+    }
+    return suggestions, summary
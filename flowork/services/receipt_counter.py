@@ -0,0 +1,26 @@
+from sqlalchemy import select, func, literal
+from flowork.extensions import db
+from flowork.models import Sale, ReceiptCounter
+from flowork.services.db import dialect_insert
+
+def allocate_daily_number(store_id, sale_date, count=1):
+    """
+    매장/일자별 영수증 번호 count 개를 연속으로 발급하고 첫 번호 반환 (별도 커넥션의 짧은 트랜잭션에서 즉시 커밋)
+    - 카운터 행이 없으면 기존 판매의 MAX(daily_number) 다음부터
+    - 있으면 last_number + count (UPSERT ... RETURNING 한 문장, 카운터 행만 잠시 잠김)
+    판매가 롤백되면 발급된 번호는 재사용하지 않음 (번호 건너뜀 허용)
+    """
+    seed = select(
+        literal(store_id, db.Integer),
+        literal(sale_date, db.Date),
+        func.coalesce(func.max(Sale.daily_number), 0) + count
+    ).where(Sale.store_id == store_id, Sale.sale_date == sale_date)
+
+    stmt = dialect_insert(ReceiptCounter).from_select(['store_id', 'sale_date', 'last_number'], seed)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['store_id', 'sale_date'],
+        set_={'last_number': ReceiptCounter.last_number + count}
+    ).returning(ReceiptCounter.last_number)
+
+    with db.engine.begin() as conn:
+        return conn.execute(stmt).scalar() - count + 1
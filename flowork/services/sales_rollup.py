@@ -0,0 +1,153 @@
+from collections import defaultdict
+from sqlalchemy import select, delete, func
+from flowork.extensions import db
+from flowork.models import Sale, SaleItem, SalesDailyRollup, SalesDailyStoreRollup
+from flowork.constants import SaleStatus
+from flowork.services.db import dialect_insert
+
+UPSERT_CHUNK_SIZE = 1000
+AMOUNT_FIELDS = ('quantity', 'gross_amount', 'discount_amount', 'net_amount')
+
+def rollup_line(store_id, sale_date, variant_id, quantity, unit_price, discount_amount, discounted_price):
+    """
+    판매 상세 1건의 집계 증감 (환불은 quantity 를 음수로)
+    반환: (store_id, sale_date, variant_id, 수량, 총액, 할인액, 실판매액)
+    """
+    quantity = int(quantity)
+    return (
+        int(store_id), sale_date, int(variant_id), quantity,
+        (unit_price or 0) * quantity, (discount_amount or 0) * quantity, (discounted_price or 0) * quantity
+    )
+
+def _upsert_add(model, keys, fields, rows):
+    """집계 컬럼 = 기존값 + 증감 (키 순서대로 실행해 동시 트랜잭션 간 교착 방지)"""
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = dialect_insert(model).values(rows[i:i + UPSERT_CHUNK_SIZE])
+        set_ = {field: getattr(model, field) + getattr(stmt.excluded, field) for field in fields}
+        set_['updated_at'] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=set_)
+        db.session.execute(stmt)
+
+def apply_sales_deltas(lines, sale_counts=()):
+    """
+    판매 집계 테이블 증분 반영 (커밋은 호출한 서비스의 트랜잭션에서)
+    - lines: rollup_line() 결과 목록 (같은 키는 합산)
+    - sale_counts: [(store_id, sale_date, 판매 건수 증감)]
+    """
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for store_id, sale_date, variant_id, *values in lines:
+        acc = totals[(store_id, sale_date, variant_id)]
+        for idx, value in enumerate(values):
+            acc[idx] += int(value)
+
+    rows = [
+        {'store_id': s, 'sale_date': d, 'variant_id': v, **dict(zip(AMOUNT_FIELDS, values))}
+        for (s, d, v), values in sorted(totals.items()) if any(values)
+    ]
+    if rows:
+        _upsert_add(SalesDailyRollup, ['store_id', 'sale_date', 'variant_id'], AMOUNT_FIELDS, rows)
+
+    counts = defaultdict(int)
+    for store_id, sale_date, delta in sale_counts:
+        counts[(int(store_id), sale_date)] += int(delta)
+    count_rows = [
+        {'store_id': s, 'sale_date': d, 'sale_count': delta}
+        for (s, d), delta in sorted(counts.items()) if delta
+    ]
+    if count_rows:
+        _upsert_add(SalesDailyStoreRollup, ['store_id', 'sale_date'], ('sale_count',), count_rows)
+
+def _scope_filters(model, store_ids=None, start_date=None, end_date=None):
+    filters = []
+    if store_ids is not None:
+        filters.append(model.store_id.in_(store_ids))
+    if start_date:
+        filters.append(model.sale_date >= start_date)
+    if end_date:
+        filters.append(model.sale_date <= end_date)
+    return filters
+
+def rebuild_sales_rollup(store_ids=None, start_date=None, end_date=None):
+    """
+    Sale/SaleItem 기준으로 범위 내 집계를 다시 계산 (집합 연산, 정합성 점검/최초 적재용)
+    범위 안의 기존 집계를 지운 뒤 INSERT ... SELECT, 동시 증분 갱신과 겹치면 재계산 값으로 덮어씀
+    반환: (옵션 집계 행 수, 매장 집계 행 수)
+    """
+    db.session.execute(delete(SalesDailyRollup).where(
+        *_scope_filters(SalesDailyRollup, store_ids, start_date, end_date)
+    ))
+    db.session.execute(delete(SalesDailyStoreRollup).where(
+        *_scope_filters(SalesDailyStoreRollup, store_ids, start_date, end_date)
+    ))
+
+    sale_filters = [Sale.status == SaleStatus.VALID, *_scope_filters(Sale, store_ids, start_date, end_date)]
+
+    line_sums = (
+        select(
+            Sale.store_id, Sale.sale_date, SaleItem.variant_id,
+            func.sum(SaleItem.quantity),
+            func.sum(SaleItem.unit_price * SaleItem.quantity),
+            func.sum(func.coalesce(SaleItem.discount_amount, 0) * SaleItem.quantity),
+            func.sum(SaleItem.subtotal)
+        )
+        .join(SaleItem, SaleItem.sale_id == Sale.id)
+        .where(*sale_filters)
+        .group_by(Sale.store_id, Sale.sale_date, SaleItem.variant_id)
+    )
+    stmt = dialect_insert(SalesDailyRollup).from_select(
+        ['store_id', 'sale_date', 'variant_id', *AMOUNT_FIELDS], line_sums
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['store_id', 'sale_date', 'variant_id'],
+        set_={**{field: getattr(stmt.excluded, field) for field in AMOUNT_FIELDS}, 'updated_at': func.now()}
+    ).returning(SalesDailyRollup.variant_id)
+    line_count = len(db.session.execute(stmt).all())
+
+    count_sums = (
+        select(Sale.store_id, Sale.sale_date, func.count(Sale.id))
+        .where(*sale_filters)
+        .group_by(Sale.store_id, Sale.sale_date)
+    )
+    stmt = dialect_insert(SalesDailyStoreRollup).from_select(['store_id', 'sale_date', 'sale_count'], count_sums)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['store_id', 'sale_date'],
+        set_={'sale_count': stmt.excluded.sale_count, 'updated_at': func.now()}
+    ).returning(SalesDailyStoreRollup.store_id)
+    store_count = len(db.session.execute(stmt).all())
+
+    return line_count, store_count
+
+def get_sales_summary(start_date, end_date, store_ids=None):
+    """
+    기간 판매 요약 (유효 판매 기준)
+    반환: {'total_amount', 'total_discount', 'total_gross', 'total_quantity', 'total_count'}
+    """
+    gross, discount, net, quantity = db.session.execute(
+        select(
+            func.sum(SalesDailyRollup.gross_amount),
+            func.sum(SalesDailyRollup.discount_amount),
+            func.sum(SalesDailyRollup.net_amount),
+            func.sum(SalesDailyRollup.quantity)
+        ).where(*_scope_filters(SalesDailyRollup, store_ids, start_date, end_date))
+    ).one()
+    count = db.session.execute(
+        select(func.sum(SalesDailyStoreRollup.sale_count))
+        .where(*_scope_filters(SalesDailyStoreRollup, store_ids, start_date, end_date))
+    ).scalar()
+    return {
+        'total_amount': int(net or 0),
+        'total_discount': int(discount or 0),
+        'total_gross': int(gross or 0),
+        'total_quantity': int(quantity or 0),
+        'total_count': int(count or 0)
+    }
+
+def get_sold_quantity(store_id, start_date, end_date, variant_ids):
+    """매장의 기간 내 옵션 목록 판매 수량 합계"""
+    quantity = db.session.execute(
+        select(func.sum(SalesDailyRollup.quantity)).where(
+            *_scope_filters(SalesDailyRollup, [store_id], start_date, end_date),
+            SalesDailyRollup.variant_id.in_(variant_ids)
+        )
+    ).scalar()
+    return int(quantity or 0)
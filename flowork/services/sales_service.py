@@ -1,25 +1,108 @@
 import traceback
+from collections import defaultdict
 from datetime import datetime, date
-from sqlalchemy import func, exc
 from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
 from flowork.extensions import db
-from flowork.models import Sale, SaleItem, StoreStock, StockHistory, Variant, Store
+from flowork.models import Sale, SaleItem, Variant, Store
 from flowork.constants import SaleStatus, StockChangeType
+from flowork.services.db import dialect_insert
+from flowork.services.receipt_counter import allocate_daily_number
+from flowork.services.sales_rollup import apply_sales_deltas, rollup_line
+from flowork.services.stock_ledger import apply_stock_changes, lock_stock_rows
+
+BULK_SALES_CHUNK_SIZE = 200
+
+def _parse_items(items):
+    """판매 상품 입력 검증 -> [(variant_id, 수량, 할인액)]"""
+    parsed = []
+    for item in items:
+        try:
+            variant_id = int(item.get('variant_id'))
+        except (ValueError, TypeError):
+            raise ValueError(f"상품 정보를 찾을 수 없습니다. Variant ID: {item.get('variant_id')}")
+
+        try:
+            qty = int(item.get('quantity', 1))
+        except (ValueError, TypeError):
+            raise ValueError("수량은 숫자여야 합니다.")
+
+        if qty <= 0:
+            raise ValueError(f"판매 수량은 1개 이상이어야 합니다. 입력값: {qty}")
+
+        try:
+            discount_amt = max(int(item.get('discount_amount', 0)), 0)
+        except (ValueError, TypeError):
+            raise ValueError("할인 금액은 숫자여야 합니다.")
+        parsed.append((variant_id, qty, discount_amt))
+    return parsed
+
+def _load_variants(variant_ids):
+    """옵션 + 상품 정보 한 번에 조회 {variant_id: Variant}"""
+    if not variant_ids:
+        return {}
+    return {
+        v.id: v for v in Variant.query.options(joinedload(Variant.product))
+                                     .filter(Variant.id.in_(variant_ids)).all()
+    }
+
+def _build_sale_items(parsed, variant_map):
+    """판매 상세 행(sale_id 제외)과 합계 계산"""
+    rows = []
+    total_amount = 0
+    for variant_id, qty, discount_amt in parsed:
+        variant = variant_map.get(variant_id)
+        if not variant:
+            raise ValueError(f"상품 정보를 찾을 수 없습니다. Variant ID: {variant_id}")
+
+        unit_price = variant.sale_price
+        if discount_amt > unit_price:
+            raise ValueError(f"할인 금액이 상품 가격보다 클 수 없습니다. {variant.product.product_name}")
+
+        discounted_price = unit_price - discount_amt
+        subtotal = discounted_price * qty
+        rows.append({
+            'variant_id': variant_id,
+            'product_name': variant.product.product_name,
+            'product_number': variant.product.product_number,
+            'color': variant.color,
+            'size': variant.size,
+            'original_price': variant.original_price,
+            'unit_price': unit_price,
+            'discount_amount': discount_amt,
+            'discounted_price': discounted_price,
+            'quantity': qty,
+            'subtotal': subtotal
+        })
+        total_amount += subtotal
+    return rows, total_amount
+
+def _rollup_lines(store_id, sale_date, item_rows, sign=1):
+    """판매 상세 행 -> 판매 집계 증감 (sign=-1 이면 취소)"""
+    return [
+        rollup_line(store_id, sale_date, row['variant_id'], sign * row['quantity'],
+                    row['unit_price'], row['discount_amount'], row['discounted_price'])
+        for row in item_rows
+    ]
+
+def _parse_sale_date(sale_date_str):
+    return datetime.strptime(sale_date_str, '%Y-%m-%d').date() if sale_date_str else date.today()
 
 class SalesService:
     @staticmethod
     def create_sale(store_id, user_id, sale_date_str, items, payment_method, is_online):
         try:
-            store = db.session.query(Store).with_for_update().get(store_id)
+            store = db.session.get(Store, store_id)
             if not store:
                 raise ValueError("매장을 찾을 수 없습니다.")
 
-            sale_date = datetime.strptime(sale_date_str, '%Y-%m-%d').date() if sale_date_str else date.today()
-            
-            last_sale = Sale.query.filter_by(store_id=store_id, sale_date=sale_date)\
-                                  .order_by(Sale.daily_number.desc()).first()
-            next_num = (last_sale.daily_number + 1) if last_sale else 1
-            
+            sale_date = _parse_sale_date(sale_date_str)
+            parsed = _parse_items(items)
+
+            # 매장 행을 잠그지 않고 카운터에서 번호만 발급 (재고 처리 동안 다른 판매와 직렬화되지 않음)
+            next_num = allocate_daily_number(store_id, sale_date)
+
             date_prefix = sale_date.strftime('%Y%m%d')
             receipt_number = f"{date_prefix}-{store_id}-{next_num:04d}"
 
@@ -35,73 +118,27 @@ class SalesService:
             )
             db.session.add(new_sale)
             db.session.flush()
-            
-            total_amount = 0
-            
-            for item in items:
-                variant_id = item.get('variant_id')
-                
-                try:
-                    qty = int(item.get('quantity', 1))
-                except (ValueError, TypeError):
-                    raise ValueError("수량은 숫자여야 합니다.")
-                    
-                if qty <= 0:
-                    raise ValueError(f"판매 수량은 1개 이상이어야 합니다. 입력값: {qty}")
-                
-                variant = db.session.get(Variant, variant_id)
-                if not variant:
-                    raise ValueError(f"상품 정보를 찾을 수 없습니다. Variant ID: {variant_id}")
 
-                unit_price = variant.sale_price
-                
-                discount_amt = int(item.get('discount_amount', 0))
-                if discount_amt < 0: discount_amt = 0
-                if discount_amt > unit_price:
-                    raise ValueError(f"할인 금액이 상품 가격보다 클 수 없습니다. {variant.product.product_name}")
+            variant_ids = sorted({variant_id for variant_id, _, _ in parsed})
+            variant_map = _load_variants(variant_ids)
+
+            # 해당 매장 재고 행을 variant_id 순서로 한 번에 잠금
+            lock_stock_rows(store_id, variant_ids)
+
+            sale_item_rows, total_amount = _build_sale_items(parsed, variant_map)
+            for row in sale_item_rows:
+                row['sale_id'] = new_sale.id
+
+            # 판매 상세 / 재고 / 이력 일괄 반영
+            if sale_item_rows:
+                db.session.execute(insert(SaleItem), sale_item_rows)
 
-                discounted_price = unit_price - discount_amt
-                subtotal = discounted_price * qty
-                
-                stock = db.session.query(StoreStock).filter_by(store_id=store_id, variant_id=variant_id).with_for_update().first()
-                if not stock:
-                    try:
-                        with db.session.begin_nested():
-                            stock = StoreStock(store_id=store_id, variant_id=variant_id, quantity=0)
-                            db.session.add(stock)
-                    except exc.IntegrityError:
-                        stock = db.session.query(StoreStock).filter_by(store_id=store_id, variant_id=variant_id).with_for_update().first()
-                
-                stock.quantity -= qty
-                
-                history = StockHistory(
-                    store_id=store_id,
-                    variant_id=variant_id,
-                    change_type=StockChangeType.SALE,
-                    quantity_change=-qty,
-                    current_quantity=stock.quantity,
-                    user_id=user_id
-                )
-                db.session.add(history)
-                
-                sale_item = SaleItem(
-                    sale_id=new_sale.id,
-                    variant_id=variant_id,
-                    product_name=variant.product.product_name,
-                    product_number=variant.product.product_number,
-                    color=variant.color,
-                    size=variant.size,
-                    original_price=variant.original_price,
-                    unit_price=unit_price,
-                    discount_amount=discount_amt,
-                    discounted_price=discounted_price,
-                    quantity=qty,
-                    subtotal=subtotal
-                )
-                db.session.add(sale_item)
-                total_amount += subtotal
-                
             new_sale.total_amount = total_amount
+            apply_stock_changes(
+                [(store_id, variant_id, -qty) for variant_id, qty, _ in parsed],
+                StockChangeType.SALE, user_id
+            )
+            apply_sales_deltas(_rollup_lines(store_id, sale_date, sale_item_rows), [(store_id, sale_date, 1)])
             db.session.commit()
             
             return {
@@ -116,6 +153,169 @@ class SalesService:
             traceback.print_exc()
             return {'status': 'error', 'message': f'판매 등록 중 오류 발생: {str(e)}'}
 
+    @staticmethod
+    def create_sales_bulk(store_id, user_id, sales, chunk_size=BULK_SALES_CHUNK_SIZE):
+        """
+        여러 판매 일괄 등록 (POS/온라인 재전송 동기화용)
+        - 각 판매는 클라이언트가 만든 idempotency_key 필수. 이미 등록된 키는 'duplicate' 로 기존 판매를 돌려줌
+        - chunk_size 건씩 한 트랜잭션: 옵션 조회/재고 잠금/판매·상세·재고·이력 INSERT 를 청크 단위로 한 번씩
+        - 입력 오류는 해당 판매만 'error', DB 오류는 해당 청크 전체 'error'
+        반환: 입력 순서대로 [{'idempotency_key', 'status': created|duplicate|error, 'sale_id', 'receipt_number', 'message'}]
+        """
+        store = db.session.get(Store, store_id)
+        if not store:
+            return [{'idempotency_key': (s or {}).get('idempotency_key'), 'status': 'error',
+                     'message': '매장을 찾을 수 없습니다.'} for s in sales]
+
+        results = [None] * len(sales)
+        pending = []
+        seen_keys = {}
+
+        for idx, sale in enumerate(sales):
+            key = str((sale or {}).get('idempotency_key') or '').strip()
+            if not key or len(key) > 64:
+                results[idx] = {'idempotency_key': key or None, 'status': 'error',
+                                'message': 'idempotency_key 가 없거나 너무 깁니다. (최대 64자)'}
+                continue
+            if key in seen_keys:
+                results[idx] = {'idempotency_key': key, 'status': 'duplicate', 'duplicate_of': seen_keys[key]}
+                continue
+            seen_keys[key] = idx
+
+            try:
+                if not sale.get('items'):
+                    raise ValueError('상품 없음')
+                pending.append({
+                    'idx': idx,
+                    'key': key,
+                    'sale_date': _parse_sale_date(sale.get('sale_date')),
+                    'parsed': _parse_items(sale['items']),
+                    'payment_method': sale.get('payment_method', '카드'),
+                    'is_online': bool(sale.get('is_online', False))
+                })
+            except ValueError as e:
+                results[idx] = {'idempotency_key': key, 'status': 'error', 'message': str(e)}
+
+        for i in range(0, len(pending), chunk_size):
+            chunk = pending[i:i + chunk_size]
+            try:
+                for entry in SalesService._create_sales_chunk(store_id, user_id, chunk):
+                    results[entry['idx']] = entry['result']
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Bulk Sale Chunk Error: {e}")
+                traceback.print_exc()
+                for entry in chunk:
+                    results[entry['idx']] = {'idempotency_key': entry['key'], 'status': 'error',
+                                             'message': f'판매 등록 중 오류 발생: {str(e)}'}
+
+        # 같은 요청 안의 중복 키는 첫 번째 판매 결과를 따름
+        for idx, result in enumerate(results):
+            if result.get('duplicate_of') is not None:
+                origin = results[result.pop('duplicate_of')]
+                if origin.get('sale_id'):
+                    result.update(sale_id=origin['sale_id'], receipt_number=origin.get('receipt_number'))
+                else:
+                    result.update(status='error', message=origin.get('message'))
+
+        return results
+
+    @staticmethod
+    def _create_sales_chunk(store_id, user_id, chunk):
+        """create_sales_bulk 의 한 청크 처리 (커밋은 호출한 쪽에서). 반환: [{'idx', 'result'}]"""
+        output = []
+
+        def _done(entry, **result):
+            output.append({'idx': entry['idx'], 'result': {'idempotency_key': entry['key'], **result}})
+
+        def _duplicate(entry, sale):
+            if sale.store_id != store_id:
+                _done(entry, status='error', message='다른 매장에서 이미 사용된 idempotency_key 입니다.')
+            else:
+                _done(entry, status='duplicate', sale_id=sale.id, receipt_number=sale.receipt_number)
+
+        # 1) 이미 처리된 키
+        existing = {
+            sale.idempotency_key: sale for sale in
+            Sale.query.filter(Sale.idempotency_key.in_([e['key'] for e in chunk])).all()
+        }
+        fresh = []
+        for entry in chunk:
+            if entry['key'] in existing:
+                _duplicate(entry, existing[entry['key']])
+            else:
+                fresh.append(entry)
+
+        # 2) 옵션 한 번에 조회 후 판매별 상세 계산 (상품 오류는 해당 판매만 제외)
+        variant_map = _load_variants(sorted({vid for e in fresh for vid, _, _ in e['parsed']}))
+        valid = []
+        for entry in fresh:
+            try:
+                entry['item_rows'], entry['total_amount'] = _build_sale_items(entry['parsed'], variant_map)
+                valid.append(entry)
+            except ValueError as e:
+                _done(entry, status='error', message=str(e))
+
+        if not valid:
+            return output
+
+        # 3) 일자별 영수증 번호를 한 번에 발급
+        by_date = defaultdict(list)
+        for entry in valid:
+            by_date[entry['sale_date']].append(entry)
+        for sale_date, entries in sorted(by_date.items()):
+            first_num = allocate_daily_number(store_id, sale_date, count=len(entries))
+            date_prefix = sale_date.strftime('%Y%m%d')
+            for offset, entry in enumerate(entries):
+                entry['daily_number'] = first_num + offset
+                entry['receipt_number'] = f"{date_prefix}-{store_id}-{entry['daily_number']:04d}"
+
+        # 4) 판매 INSERT (동시에 같은 키가 들어온 경우는 ON CONFLICT DO NOTHING 으로 건너뜀)
+        stmt = dialect_insert(Sale).values([{
+            'store_id': store_id,
+            'user_id': user_id,
+            'idempotency_key': entry['key'],
+            'payment_method': entry['payment_method'],
+            'sale_date': entry['sale_date'],
+            'daily_number': entry['daily_number'],
+            'receipt_number': entry['receipt_number'],
+            'total_amount': entry['total_amount'],
+            'status': SaleStatus.VALID,
+            'is_online': entry['is_online']
+        } for entry in valid]).on_conflict_do_nothing(index_elements=['idempotency_key'])
+        inserted = dict(db.session.execute(stmt.returning(Sale.idempotency_key, Sale.id)).all())
+
+        raced = [entry for entry in valid if entry['key'] not in inserted]
+        if raced:
+            raced_sales = {
+                sale.idempotency_key: sale for sale in
+                Sale.query.filter(Sale.idempotency_key.in_([e['key'] for e in raced])).all()
+            }
+            for entry in raced:
+                _duplicate(entry, raced_sales[entry['key']])
+        created = [entry for entry in valid if entry['key'] in inserted]
+
+        # 5) 재고 행 잠금 -> 판매 상세 / 재고 / 이력 일괄 반영
+        lock_stock_rows(store_id, {vid for e in created for vid, _, _ in e['parsed']})
+
+        sale_item_rows = []
+        stock_changes = []
+        rollup_lines = []
+        for entry in created:
+            sale_id = inserted[entry['key']]
+            for row in entry['item_rows']:
+                sale_item_rows.append({**row, 'sale_id': sale_id})
+            stock_changes.extend((store_id, vid, -qty) for vid, qty, _ in entry['parsed'])
+            rollup_lines.extend(_rollup_lines(store_id, entry['sale_date'], entry['item_rows']))
+            _done(entry, status='created', sale_id=sale_id, receipt_number=entry['receipt_number'])
+
+        if sale_item_rows:
+            db.session.execute(insert(SaleItem), sale_item_rows)
+        apply_stock_changes(stock_changes, StockChangeType.SALE, user_id)
+        apply_sales_deltas(rollup_lines, [(store_id, entry['sale_date'], 1) for entry in created])
+        return output
+
     @staticmethod
     def refund_sale_full(sale_id, store_id, user_id):
         try:
@@ -124,29 +324,19 @@ class SalesService:
             if sale.status == SaleStatus.REFUNDED: 
                 return {'status': 'error', 'message': '이미 환불된 건입니다.'}
             
-            for item in sale.items:
-                if item.quantity <= 0: continue
-                
-                stock = StoreStock.query.filter_by(store_id=store_id, variant_id=item.variant_id).with_for_update().first()
-                if not stock:
-                    try:
-                        with db.session.begin_nested():
-                            stock = StoreStock(store_id=store_id, variant_id=item.variant_id, quantity=0)
-                            db.session.add(stock)
-                    except exc.IntegrityError:
-                        stock = StoreStock.query.filter_by(store_id=store_id, variant_id=item.variant_id).with_for_update().first()
-
-                stock.quantity += item.quantity
-                
-                history = StockHistory(
-                    store_id=store_id,
-                    variant_id=item.variant_id,
-                    change_type=StockChangeType.REFUND_FULL,
-                    quantity_change=item.quantity,
-                    current_quantity=stock.quantity,
-                    user_id=user_id
-                )
-                db.session.add(history)
+            stock_changes = [
+                (store_id, item.variant_id, item.quantity)
+                for item in sale.items if item.quantity > 0
+            ]
+            apply_stock_changes(stock_changes, StockChangeType.REFUND_FULL, user_id)
+            apply_sales_deltas(
+                [
+                    rollup_line(store_id, sale.sale_date, item.variant_id, -item.quantity,
+                                item.unit_price, item.discount_amount, item.discounted_price)
+                    for item in sale.items if item.quantity > 0
+                ],
+                [(store_id, sale.sale_date, -1)]
+            )
                 
             sale.status = SaleStatus.REFUNDED
             db.session.commit()
@@ -166,6 +356,8 @@ class SalesService:
                 return {'status': 'error', 'message': '이미 전체 환불된 건입니다.'}
 
             total_refunded_amount = 0
+            stock_changes = []
+            rollup_lines = []
 
             for r_item in refund_items:
                 variant_id = r_item['variant_id']
@@ -183,26 +375,11 @@ class SalesService:
                     sale.total_amount -= refund_amount
                     total_refunded_amount += refund_amount
                     
-                    stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).with_for_update().first()
-                    if not stock:
-                        try:
-                            with db.session.begin_nested():
-                                stock = StoreStock(store_id=store_id, variant_id=variant_id, quantity=0)
-                                db.session.add(stock)
-                        except exc.IntegrityError:
-                            stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).with_for_update().first()
-
-                    stock.quantity += refund_qty
-                        
-                    history = StockHistory(
-                        store_id=store_id,
-                        variant_id=variant_id,
-                        change_type=StockChangeType.REFUND_PARTIAL,
-                        quantity_change=refund_qty,
-                        current_quantity=stock.quantity,
-                        user_id=user_id
-                    )
-                    db.session.add(history)
+                    stock_changes.append((store_id, variant_id, refund_qty))
+                    rollup_lines.append(rollup_line(
+                        store_id, sale.sale_date, variant_id, -refund_qty,
+                        sale_item.unit_price, sale_item.discount_amount, sale_item.discounted_price
+                    ))
 
             all_zero = True
             for item in sale.items:
@@ -213,6 +390,8 @@ class SalesService:
             if all_zero:
                 sale.status = SaleStatus.REFUNDED
 
+            apply_stock_changes(stock_changes, StockChangeType.REFUND_PARTIAL, user_id)
+            apply_sales_deltas(rollup_lines, [(store_id, sale.sale_date, -1)] if all_zero else [])
             db.session.commit()
             return {'status': 'success', 'message': '부분 환불이 완료되었습니다.'}
 
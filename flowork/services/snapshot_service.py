@@ -0,0 +1,90 @@
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, func, literal, text
+from flask import current_app
+from flowork.extensions import db
+from flowork.models import StoreStock, StockHistory, StockSnapshot, StockSnapshotItem
+
+class StockSnapshotService:
+    @staticmethod
+    def take_snapshot():
+        """
+        현재 StoreStock 전체를 스냅샷으로 저장 (INSERT ... SELECT 한 번, 0 재고 행은 생략)
+        stock_history 를 SHARE 모드로 잠가 이력을 쓴 트랜잭션이 모두 커밋된 뒤 재고를 읽고,
+        그 시점의 마지막 이력 id 를 기준점으로 기록. 재고 변경 트랜잭션은 이 동안 이력 INSERT 에서 대기
+        """
+        try:
+            if db.session.get_bind().dialect.name == 'postgresql':
+                db.session.execute(text('LOCK TABLE stock_history IN SHARE MODE'))
+                # now() 는 잠금 대기 전 트랜잭션 시작 시각이므로 실제 시각 사용
+                taken_at = db.session.execute(select(func.clock_timestamp())).scalar()
+            else:
+                taken_at = db.session.execute(select(func.now())).scalar()
+            last_history_id = db.session.execute(select(func.max(StockHistory.id))).scalar() or 0
+
+            snapshot = StockSnapshot(taken_at=taken_at, last_history_id=last_history_id)
+            db.session.add(snapshot)
+            db.session.flush()
+
+            stmt = insert(StockSnapshotItem).from_select(
+                ['snapshot_id', 'store_id', 'variant_id', 'quantity'],
+                select(literal(snapshot.id), StoreStock.store_id, StoreStock.variant_id, StoreStock.quantity)
+                .where(StoreStock.quantity != 0)
+            )
+            snapshot.row_count = db.session.execute(stmt).rowcount
+            db.session.commit()
+            return {'status': 'success', 'message': f'스냅샷 저장 완료 ({snapshot.row_count}건)', 'snapshot_id': snapshot.id}
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Stock Snapshot Error: {e}")
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def purge_snapshots(retention_days):
+        """보관 기간이 지난 스냅샷 삭제 (가장 최근 스냅샷은 항상 유지)"""
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        latest_id = db.session.query(func.max(StockSnapshot.id)).scalar()
+        old_ids = select(StockSnapshot.id).where(StockSnapshot.taken_at < cutoff, StockSnapshot.id != latest_id)
+
+        db.session.execute(delete(StockSnapshotItem).where(StockSnapshotItem.snapshot_id.in_(old_ids)))
+        result = db.session.execute(delete(StockSnapshot).where(StockSnapshot.id.in_(old_ids)))
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def get_stock_as_of(store_id, as_of, variant_ids=None):
+        """
+        as_of 시각의 매장 재고 {variant_id: 수량}
+        직전 스냅샷 + (스냅샷 기준 이력 id 이후 ~ as_of) StockHistory 증감 합계. 스냅샷이 없으면 이력 전체 합산
+        반환: (재고 dict, 기준 스냅샷 또는 None)
+        """
+        snapshot = StockSnapshot.query.filter(StockSnapshot.taken_at <= as_of)\
+                                      .order_by(StockSnapshot.taken_at.desc()).first()
+
+        stock = {}
+        if snapshot:
+            base = select(StockSnapshotItem.variant_id, StockSnapshotItem.quantity).where(
+                StockSnapshotItem.snapshot_id == snapshot.id,
+                StockSnapshotItem.store_id == store_id
+            )
+            if variant_ids is not None:
+                base = base.where(StockSnapshotItem.variant_id.in_(variant_ids))
+            stock = dict(db.session.execute(base).all())
+
+        deltas = select(StockHistory.variant_id, func.sum(StockHistory.quantity_change)).where(
+            StockHistory.store_id == store_id,
+            StockHistory.created_at <= as_of
+        )
+        if snapshot and snapshot.last_history_id is not None:
+            deltas = deltas.where(StockHistory.id > snapshot.last_history_id)
+        elif snapshot:
+            deltas = deltas.where(StockHistory.created_at > snapshot.taken_at)
+        if variant_ids is not None:
+            deltas = deltas.where(StockHistory.variant_id.in_(variant_ids))
+        deltas = deltas.group_by(StockHistory.variant_id)
+
+        for variant_id, change in db.session.execute(deltas).all():
+            stock[variant_id] = stock.get(variant_id, 0) + int(change or 0)
+
+        return {vid: qty for vid, qty in stock.items() if qty}, snapshot
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from sqlalchemy import insert, update, select, func, tuple_, or_
+from flowork.extensions import db
+from flowork.models import StoreStock, StockHistory, Variant, HqStockHistory
+from flowork.services.db import dialect_insert
+from flowork.services.stock_totals import apply_stock_deltas
+
+UPSERT_CHUNK_SIZE = 1000
+
+class InsufficientStockError(ValueError):
+    """재고 부족 (shortages: [(store_id, variant_id, 요청 수량, 현재 재고)])"""
+    def __init__(self, shortages):
+        self.shortages = shortages
+        store_id, variant_id, requested, available = shortages[0]
+        super().__init__(f'재고가 부족합니다. (현재: {available}, 요청: {requested})')
+
+class InsufficientHqStockError(ValueError):
+    """본사 재고 부족 (shortages: [(variant_id, 요청 수량, 현재 재고)])"""
+    def __init__(self, shortages):
+        self.shortages = shortages
+        variant_id, requested, available = shortages[0]
+        super().__init__(f'본사 재고가 부족합니다. (현재: {available}, 요청: {requested})')
+
+def lock_stock_rows(store_id, variant_ids):
+    """
+    한 매장의 재고 행들을 variant_id 순서로 한 번에 잠금 (SELECT ... ORDER BY variant_id FOR UPDATE)
+    여러 옵션을 다루는 트랜잭션이 항상 같은 순서로 잠그도록 해 교착 방지
+    """
+    variant_ids = sorted({int(vid) for vid in variant_ids})
+    if not variant_ids:
+        return []
+    stmt = select(StoreStock.variant_id).where(
+        StoreStock.store_id == store_id,
+        StoreStock.variant_id.in_(variant_ids)
+    ).order_by(StoreStock.variant_id).with_for_update()
+    return db.session.execute(stmt).scalars().all()
+
+def lock_stock_pairs(pairs):
+    """
+    여러 매장에 걸친 (store_id, variant_id) 재고 행을 한 번에 잠그고 현재 수량 반환
+    (store_id, variant_id) 순으로 잠가 교착 방지. 반환: {(store_id, variant_id): 수량} (행이 없으면 키 없음)
+    """
+    pairs = sorted({(int(s), int(v)) for s, v in pairs})
+    if not pairs:
+        return {}
+    stmt = select(StoreStock.store_id, StoreStock.variant_id, func.coalesce(StoreStock.quantity, 0)).where(
+        tuple_(StoreStock.store_id, StoreStock.variant_id).in_(pairs)
+    ).order_by(StoreStock.store_id, StoreStock.variant_id).with_for_update()
+    return {(store_id, variant_id): qty for store_id, variant_id, qty in db.session.execute(stmt)}
+
+def lock_hq_rows(variant_ids):
+    """옵션 행을 variant_id 순으로 잠그고 본사 재고 반환. 반환: {variant_id: hq_quantity}"""
+    variant_ids = sorted({int(vid) for vid in variant_ids})
+    if not variant_ids:
+        return {}
+    stmt = select(Variant.id, func.coalesce(Variant.hq_quantity, 0)).where(
+        Variant.id.in_(variant_ids)
+    ).order_by(Variant.id).with_for_update()
+    return dict(db.session.execute(stmt).all())
+
+def _upsert_deltas(keyed_deltas, non_negative=False):
+    """
+    INSERT ... ON CONFLICT (store_id, variant_id) DO UPDATE SET quantity = quantity + delta RETURNING
+    입력(키 정렬됨) 순서대로 행을 잠그므로 증가/차감이 섞여도 잠금 순서 유지
+    non_negative=True 이면 음수가 되는 차감은 DO UPDATE ... WHERE 로 건너뛰고(행은 잠김),
+    반환되지 않은 키와 새로 INSERT 된 음수 행을 모아 InsufficientStockError
+    (이미 갱신된 행은 호출한 서비스의 rollback 으로 되돌림)
+    """
+    result = {}
+    for i in range(0, len(keyed_deltas), UPSERT_CHUNK_SIZE):
+        chunk = keyed_deltas[i:i + UPSERT_CHUNK_SIZE]
+        stmt = dialect_insert(StoreStock).values([
+            {'store_id': store_id, 'variant_id': variant_id, 'quantity': delta}
+            for (store_id, variant_id), delta in chunk
+        ])
+        current = func.coalesce(StoreStock.quantity, 0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['store_id', 'variant_id'],
+            set_={'quantity': current + stmt.excluded.quantity, 'updated_at': func.now()},
+            where=or_(stmt.excluded.quantity >= 0, current + stmt.excluded.quantity >= 0) if non_negative else None
+        ).returning(StoreStock.store_id, StoreStock.variant_id, StoreStock.quantity)
+        for store_id, variant_id, quantity in db.session.execute(stmt):
+            result[(store_id, variant_id)] = quantity
+
+    if non_negative:
+        # 반환되지 않은 키 = 재고 부족으로 건너뛴 차감, 음수로 반환된 차감 = 행이 없어 새로 INSERT 된 경우
+        shortages = [(key, delta) for key, delta in keyed_deltas
+                     if key not in result or (delta < 0 and result[key] < 0)]
+        if shortages:
+            available = _current_quantities([key for key, _ in shortages if key not in result])
+            raise InsufficientStockError([
+                (store_id, variant_id, -delta, available.get((store_id, variant_id), 0))
+                for (store_id, variant_id), delta in shortages
+            ])
+    return result
+
+def _current_quantities(keys):
+    """{(store_id, variant_id): 현재 수량} (재고 부족 메시지용)"""
+    if not keys:
+        return {}
+    stmt = select(StoreStock.store_id, StoreStock.variant_id, func.coalesce(StoreStock.quantity, 0)).where(
+        tuple_(StoreStock.store_id, StoreStock.variant_id).in_(keys)
+    )
+    return {(store_id, variant_id): qty for store_id, variant_id, qty in db.session.execute(stmt)}
+
+def apply_stock_changes(changes, change_type, user_id=None, description=None, non_negative=False):
+    """
+    매장 재고 증감 공통 처리 (커밋은 호출한 서비스에서)
+    - changes: [(store_id, variant_id, 증감)] (같은 매장/옵션은 합산해 한 번만 갱신)
+    - non_negative=True 이면 차감 결과가 음수가 되는 경우 InsufficientStockError
+    - 증가/차감 모두 (store_id, variant_id) 순으로 한 문장(청크당)에서 갱신해 동시 트랜잭션 간 교착 방지
+    - StockHistory 는 입력 건별로 일괄 INSERT, 합계 테이블도 같은 트랜잭션에서 갱신
+    반환: {(store_id, variant_id): 변경 후 수량}
+    """
+    changes = [(int(s), int(v), int(d)) for s, v, d in changes if d]
+    if not changes:
+        return {}
+
+    totals = defaultdict(int)
+    for store_id, variant_id, delta in changes:
+        totals[(store_id, variant_id)] += delta
+    keyed = sorted((key, delta) for key, delta in totals.items() if delta)
+
+    quantities = _upsert_deltas(keyed, non_negative)
+
+    # 같은 키가 여러 건이면 입력 순서대로 누적한 중간 수량을 이력에 기록
+    running = {key: quantities.get(key, 0) - total for key, total in totals.items()}
+    history_rows = []
+    for store_id, variant_id, delta in changes:
+        key = (store_id, variant_id)
+        running[key] += delta
+        history_rows.append({
+            'store_id': store_id,
+            'variant_id': variant_id,
+            'change_type': change_type,
+            'quantity_change': delta,
+            'current_quantity': running[key],
+            'user_id': user_id,
+            'description': description
+        })
+    db.session.execute(insert(StockHistory), history_rows)
+
+    apply_stock_deltas((variant_id, delta) for (_, variant_id), delta in keyed)
+    return quantities
+
+def apply_hq_stock_changes(changes, change_type, user_id=None, description=None, non_negative=True):
+    """
+    본사 재고(Variant.hq_quantity) 증감 공통 처리 (커밋은 호출한 서비스에서)
+    - changes: [(variant_id, 증감, 상대 store_id 또는 None)]
+    - 옵션별로 합산해 variant_id 순으로 UPDATE ... RETURNING 한 번씩 (행 잠금은 UPDATE 가 처리)
+    - non_negative=True 이면 차감은 hq_quantity >= 요청 수량일 때만 적용, 하나라도 부족하면
+      InsufficientHqStockError (이미 갱신된 행은 호출한 서비스의 rollback 으로 되돌림)
+    - HqStockHistory 는 입력 건별로 일괄 INSERT
+    반환: {variant_id: 변경 후 본사 재고}
+    """
+    changes = [(int(v), int(d), int(s) if s else None) for v, d, s in changes if d]
+    if not changes:
+        return {}
+
+    totals = defaultdict(int)
+    for variant_id, delta, _ in changes:
+        totals[variant_id] += delta
+
+    quantities = {}
+    shortages = []
+    current = func.coalesce(Variant.hq_quantity, 0)
+    for variant_id, delta in sorted(totals.items()):
+        stmt = update(Variant).where(Variant.id == variant_id)
+        if non_negative and delta < 0:
+            stmt = stmt.where(current + delta >= 0)
+        stmt = stmt.values(hq_quantity=current + delta).returning(Variant.hq_quantity).execution_options(
+            synchronize_session=False
+        )
+        quantity = db.session.execute(stmt).scalar()
+        if quantity is None:
+            available = db.session.execute(select(current).where(Variant.id == variant_id)).scalar()
+            shortages.append((variant_id, -delta, available or 0))
+        else:
+            quantities[variant_id] = quantity
+    if shortages:
+        raise InsufficientHqStockError(shortages)
+
+    running = {vid: quantities[vid] - total for vid, total in totals.items()}
+    history_rows = []
+    for variant_id, delta, store_id in changes:
+        running[variant_id] += delta
+        history_rows.append({
+            'variant_id': variant_id,
+            'store_id': store_id,
+            'change_type': change_type,
+            'quantity_change': delta,
+            'current_quantity': running[variant_id],
+            'user_id': user_id,
+            'description': description
+        })
+    db.session.execute(insert(HqStockHistory), history_rows)
+    return quantities
@@ -0,0 +1,244 @@
+import threading
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select, func
+from flask import current_app
+from flowork.extensions import db
+from flowork.models import Product, Variant, Store, StoreStock
+from flowork.services.local_cache import LocalTTLCache
+
+DEFAULT_TTL_SECONDS = 60
+STREAM_CHUNK_SIZE = 50000
+
+StockRow = namedtuple('StockRow', [
+    'variant_id', 'product_id', 'product_number', 'product_name',
+    'color', 'size', 'quantities', 'total'
+])
+
+_matrix_cache = LocalTTLCache(ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=32)
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+class StockMatrix:
+    """
+    브랜드 전체 재고를 (SKU x 매장) int32 배열로 보관하는 통합 재고 엔진
+    - quantities[i, j]: variant_ids[i] 의 store_ids[j] 매장 재고
+    - 행 메타데이터(품번/품명/컬러/사이즈/품목/년도)는 행 순서와 같은 병렬 배열
+    """
+    def __init__(self, brand_id, store_ids, store_names, variant_ids, product_ids,
+                 product_numbers, product_names, colors, sizes, categories, years, quantities):
+        self.brand_id = brand_id
+        self.store_ids = store_ids
+        self.store_names = store_names
+        self.variant_ids = variant_ids
+        self.product_ids = product_ids
+        self.product_numbers = product_numbers
+        self.product_names = product_names
+        self.colors = colors
+        self.sizes = sizes
+        self.categories = categories
+        self.years = years
+        self.quantities = quantities
+        self.built_at = datetime.now()
+
+        self.row_totals = quantities.sum(axis=1, dtype=np.int64)
+        self.column_totals = quantities.sum(axis=0, dtype=np.int64)
+        self.grand_total = int(self.row_totals.sum())
+
+        self._store_pos = {int(sid): i for i, sid in enumerate(store_ids)}
+
+    @property
+    def shape(self):
+        return self.quantities.shape
+
+    @property
+    def stores(self):
+        return [{'id': int(sid), 'store_name': name} for sid, name in zip(self.store_ids, self.store_names)]
+
+    def store_column(self, store_id):
+        return self._store_pos.get(int(store_id)) if store_id is not None else None
+
+    def filter_rows(self, category=None, year=None, pn_prefix=None, only_nonzero=False, only_negative=False):
+        """조건에 맞는 행 인덱스 배열 반환 (벡터 연산)"""
+        mask = np.ones(len(self.variant_ids), dtype=bool)
+        if category:
+            mask &= (self.categories == category)
+        if year:
+            mask &= (self.years == int(year))
+        if pn_prefix:
+            prefix = str(pn_prefix).strip().upper()
+            mask &= np.char.startswith(np.char.upper(self.product_numbers.astype(str)), prefix)
+        if only_nonzero:
+            mask &= np.any(self.quantities != 0, axis=1)
+        if only_negative:
+            mask &= np.any(self.quantities < 0, axis=1)
+        return np.nonzero(mask)[0]
+
+    def sort_rows(self, rows, sort_by=None, store_id=None, descending=True):
+        """행 인덱스를 합계 또는 특정 매장 재고 기준으로 정렬 (안정 정렬로 기본 순서 유지)"""
+        if sort_by == 'total':
+            keys = self.row_totals[rows]
+        elif sort_by == 'store':
+            col = self.store_column(store_id)
+            if col is None:
+                return rows
+            keys = self.quantities[rows, col]
+        else:
+            return rows
+        order = np.argsort(-keys if descending else keys, kind='stable')
+        return rows[order]
+
+    def slice(self, rows, col_start=0, col_end=None):
+        """행 인덱스 x 열 범위 부분 배열"""
+        return self.quantities[rows, col_start:col_end]
+
+    def window(self, rows, row_offset=0, row_limit=100, col_offset=0, col_limit=20):
+        """
+        필터/정렬된 행 인덱스 중 화면에 보이는 구간만 열 지향(병렬 배열) dict 로 반환
+        셀 값은 행 단위 리스트 (quantities[r] = 해당 행의 열 구간 재고)
+        """
+        total_rows = len(rows)
+        n_cols = len(self.store_ids)
+        row_offset = min(max(int(row_offset), 0), total_rows)
+        col_offset = min(max(int(col_offset), 0), n_cols)
+        page = rows[row_offset:row_offset + max(int(row_limit), 0)]
+        col_end = min(col_offset + max(int(col_limit), 0), n_cols)
+
+        return {
+            'total_rows': int(total_rows),
+            'total_stores': int(n_cols),
+            'row_offset': row_offset,
+            'col_offset': col_offset,
+            'filtered_total': int(self.row_totals[rows].sum()) if total_rows else 0,
+            'stores': {
+                'id': self.store_ids[col_offset:col_end].tolist(),
+                'name': self.store_names[col_offset:col_end],
+                'total': self.column_totals[col_offset:col_end].tolist()
+            },
+            'rows': {
+                'variant_id': self.variant_ids[page].tolist(),
+                'product_id': self.product_ids[page].tolist(),
+                'product_number': self.product_numbers[page].tolist(),
+                'product_name': self.product_names[page].tolist(),
+                'color': self.colors[page].tolist(),
+                'size': self.sizes[page].tolist(),
+                'total': self.row_totals[page].tolist()
+            },
+            'quantities': self.quantities[page, col_offset:col_end].tolist()
+        }
+
+    def row_indices(self, variant_ids):
+        lookup = {int(vid): i for i, vid in enumerate(self.variant_ids)}
+        return np.array([lookup[v] for v in variant_ids if v in lookup], dtype=np.int64)
+
+    def iter_rows(self, rows=None):
+        if rows is None:
+            rows = range(len(self.variant_ids))
+        for i in rows:
+            yield StockRow(
+                int(self.variant_ids[i]), int(self.product_ids[i]),
+                self.product_numbers[i], self.product_names[i],
+                self.colors[i], self.sizes[i],
+                self.quantities[i].tolist(), int(self.row_totals[i])
+            )
+
+def _index_positions(sorted_ids, order, ids):
+    """ids 를 원래 행/열 위치로 변환 (정렬된 id 배열에 대한 searchsorted)"""
+    pos = np.searchsorted(sorted_ids, ids)
+    pos = np.clip(pos, 0, max(len(sorted_ids) - 1, 0))
+    valid = sorted_ids[pos] == ids if len(sorted_ids) else np.zeros(len(ids), dtype=bool)
+    return order[pos], valid
+
+def build_stock_matrix(brand_id):
+    stores = db.session.execute(
+        select(Store.id, Store.store_name)
+        .where(Store.brand_id == brand_id, Store.is_active == True)
+        .order_by(Store.store_name)
+    ).all()
+
+    variants = db.session.execute(
+        select(
+            Variant.id, Product.id, Product.product_number, Product.product_name,
+            Variant.color, Variant.size, Product.item_category, Product.release_year
+        )
+        .join(Product, Variant.product_id == Product.id)
+        .where(Product.brand_id == brand_id)
+        .order_by(Product.product_number, Variant.color, Variant.size)
+    ).all()
+
+    store_ids = np.array([s[0] for s in stores], dtype=np.int64)
+    store_names = [s[1] for s in stores]
+
+    n_rows, n_cols = len(variants), len(stores)
+    columns = list(zip(*variants)) if variants else [[] for _ in range(8)]
+
+    variant_ids = np.array(columns[0], dtype=np.int64)
+    quantities = np.zeros((n_rows, n_cols), dtype=np.int32)
+
+    if n_rows and n_cols:
+        v_order = np.argsort(variant_ids, kind='stable')
+        v_sorted = variant_ids[v_order]
+        s_order = np.argsort(store_ids, kind='stable')
+        s_sorted = store_ids[s_order]
+
+        stock_stmt = (
+            select(StoreStock.variant_id, StoreStock.store_id, func.coalesce(StoreStock.quantity, 0))
+            .join(Store, StoreStock.store_id == Store.id)
+            .where(Store.brand_id == brand_id, Store.is_active == True)
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        result = db.session.execute(stock_stmt)
+        for partition in result.partitions():
+            chunk = np.array(partition, dtype=np.int64)
+            if chunk.size == 0:
+                continue
+            rows, row_ok = _index_positions(v_sorted, v_order, chunk[:, 0])
+            cols, col_ok = _index_positions(s_sorted, s_order, chunk[:, 1])
+            ok = row_ok & col_ok
+            quantities[rows[ok], cols[ok]] = chunk[ok, 2].astype(np.int32)
+
+    return StockMatrix(
+        brand_id=brand_id,
+        store_ids=store_ids,
+        store_names=store_names,
+        variant_ids=variant_ids,
+        product_ids=np.array(columns[1], dtype=np.int64),
+        product_numbers=np.array(columns[2], dtype=object),
+        product_names=np.array(columns[3], dtype=object),
+        colors=np.array(columns[4], dtype=object),
+        sizes=np.array(columns[5], dtype=object),
+        categories=np.array(columns[6], dtype=object),
+        years=np.array([y or 0 for y in columns[7]], dtype=np.int32),
+        quantities=quantities
+    )
+
+def _brand_lock(brand_id):
+    with _build_locks_guard:
+        lock = _build_locks.get(brand_id)
+        if lock is None:
+            lock = _build_locks[brand_id] = threading.Lock()
+        return lock
+
+def get_stock_matrix(brand_id, refresh=False):
+    """브랜드별 재고 매트릭스 (프로세스 로컬 캐시, 동시 요청은 한 번만 빌드)"""
+    if not refresh:
+        matrix, _ = _matrix_cache.get(brand_id)
+        if matrix is not None:
+            return matrix
+
+    with _brand_lock(brand_id):
+        if not refresh:
+            matrix, _ = _matrix_cache.get(brand_id)
+            if matrix is not None:
+                return matrix
+        matrix = build_stock_matrix(brand_id)
+        ttl = current_app.config.get('STOCK_MATRIX_TTL', DEFAULT_TTL_SECONDS)
+        _matrix_cache.set(brand_id, matrix, ttl_seconds=ttl)
+        return matrix
+
+def invalidate_stock_matrix(brand_id=None):
+    if brand_id is None:
+        _matrix_cache.clear()
+    else:
+        _matrix_cache.pop(brand_id)
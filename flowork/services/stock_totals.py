@@ -0,0 +1,131 @@
+from collections import defaultdict
+from sqlalchemy import select, delete, func
+from flowork.extensions import db
+from flowork.models import Product, Variant, StoreStock, VariantStockTotal, ProductStockTotal
+from flowork.services.db import dialect_insert
+
+UPSERT_CHUNK_SIZE = 1000
+
+def _aggregate(deltas):
+    items = deltas.items() if isinstance(deltas, dict) else deltas
+    totals = defaultdict(int)
+    for variant_id, delta in items:
+        if variant_id is None or not delta:
+            continue
+        totals[int(variant_id)] += int(delta)
+    return {vid: qty for vid, qty in totals.items() if qty}
+
+def _upsert_add(model, key, rows):
+    """quantity = 기존값 + 증감 (키 순서대로 실행해 동시 트랜잭션 간 교착 방지)"""
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = dialect_insert(model).values(rows[i:i + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={'quantity': model.quantity + stmt.excluded.quantity, 'updated_at': func.now()}
+        )
+        db.session.execute(stmt)
+
+def apply_stock_deltas(deltas):
+    """
+    매장 재고 증감을 합계 테이블에 반영 (커밋은 호출한 서비스의 트랜잭션에서)
+    deltas: {variant_id: 증감} 또는 (variant_id, 증감) 목록. 같은 옵션은 합산됨
+    """
+    totals = _aggregate(deltas)
+    if not totals:
+        return
+
+    variant_ids = sorted(totals)
+    product_map = dict(db.session.execute(
+        select(Variant.id, Variant.product_id).where(Variant.id.in_(variant_ids))
+    ).all())
+
+    variant_rows = []
+    product_totals = defaultdict(int)
+    for vid in variant_ids:
+        product_id = product_map.get(vid)
+        if product_id is None:
+            continue
+        variant_rows.append({'variant_id': vid, 'product_id': product_id, 'quantity': totals[vid]})
+        product_totals[product_id] += totals[vid]
+
+    if not variant_rows:
+        return
+
+    _upsert_add(VariantStockTotal, 'variant_id', variant_rows)
+    _upsert_add(ProductStockTotal, 'product_id', [
+        {'product_id': pid, 'quantity': qty} for pid, qty in sorted(product_totals.items()) if qty
+    ])
+
+def _product_scope(brand_id=None, product_ids=None):
+    scope = select(Product.id)
+    if brand_id:
+        scope = scope.where(Product.brand_id == brand_id)
+    if product_ids is not None:
+        scope = scope.where(Product.id.in_(product_ids))
+    return scope
+
+def delete_stock_totals(brand_id=None, product_ids=None):
+    """상품/옵션 일괄 삭제 전에 호출 (합계 행이 외래키로 삭제를 막지 않도록)"""
+    scope = _product_scope(brand_id, product_ids)
+    db.session.execute(delete(VariantStockTotal).where(VariantStockTotal.product_id.in_(scope)))
+    db.session.execute(delete(ProductStockTotal).where(ProductStockTotal.product_id.in_(scope)))
+
+def rebuild_stock_totals(brand_id=None, product_ids=None):
+    """
+    StoreStock 기준으로 합계 테이블 재계산 (집합 연산, 정합성 점검용)
+    행을 지우지 않고 덮어쓰기 upsert 하므로 재계산 중에도 조회/증분 갱신이 가능
+    """
+    scope = _product_scope(brand_id, product_ids)
+
+    variant_sums = (
+        select(Variant.id, Variant.product_id, func.coalesce(func.sum(StoreStock.quantity), 0))
+        .outerjoin(StoreStock, StoreStock.variant_id == Variant.id)
+        .where(Variant.product_id.in_(scope))
+        .group_by(Variant.id, Variant.product_id)
+    )
+    stmt = dialect_insert(VariantStockTotal).from_select(['variant_id', 'product_id', 'quantity'], variant_sums)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['variant_id'],
+        set_={'product_id': stmt.excluded.product_id, 'quantity': stmt.excluded.quantity, 'updated_at': func.now()}
+    )
+    variant_count = db.session.execute(stmt).rowcount
+
+    # 삭제된 옵션의 잔여 합계 정리
+    db.session.execute(delete(VariantStockTotal).where(
+        VariantStockTotal.product_id.in_(scope),
+        VariantStockTotal.variant_id.not_in(select(Variant.id).where(Variant.product_id.in_(scope)))
+    ))
+
+    product_sums = (
+        select(Product.id, func.coalesce(func.sum(VariantStockTotal.quantity), 0))
+        .outerjoin(VariantStockTotal, VariantStockTotal.product_id == Product.id)
+        .where(Product.id.in_(scope))
+        .group_by(Product.id)
+    )
+    stmt = dialect_insert(ProductStockTotal).from_select(['product_id', 'quantity'], product_sums)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['product_id'],
+        set_={'quantity': stmt.excluded.quantity, 'updated_at': func.now()}
+    )
+    product_count = db.session.execute(stmt).rowcount
+
+    return variant_count, product_count
+
+def get_variant_totals(variant_ids):
+    """{variant_id: 전체 매장 재고 합계} (행이 없으면 0)"""
+    variant_ids = list(variant_ids)
+    if not variant_ids:
+        return {}
+    rows = db.session.execute(
+        select(VariantStockTotal.variant_id, VariantStockTotal.quantity)
+        .where(VariantStockTotal.variant_id.in_(variant_ids))
+    ).all()
+    totals = dict.fromkeys(variant_ids, 0)
+    totals.update(dict(rows))
+    return totals
+
+def get_product_total(product_id):
+    quantity = db.session.execute(
+        select(ProductStockTotal.quantity).where(ProductStockTotal.product_id == product_id)
+    ).scalar()
+    return quantity or 0
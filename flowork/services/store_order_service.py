@@ -1,8 +1,87 @@
 import traceback
 from datetime import datetime, date
+from sqlalchemy import insert
 from flowork.extensions import db
-from flowork.models import StoreOrder, StoreReturn, StoreStock, StockHistory, Variant
+from flowork.models import StoreOrder, StoreReturn, Store
 from flowork.constants import TransferStatus, StockChangeType
+from flowork.services.stock_ledger import (
+    apply_stock_changes, apply_hq_stock_changes, InsufficientStockError, InsufficientHqStockError,
+    lock_stock_pairs, lock_hq_rows
+)
+
+def _load_batch(model, items, brand_id):
+    """
+    일괄 처리 대상 행을 id 순으로 한 번에 잠가 조회하고 항목별 기본 검증
+    반환: (결과 dict {id: {...}}, 승인 대상 [(row, 확정 수량)], 거절 대상 [row])
+    """
+    results = {}
+    parsed = {}
+    for item in items:
+        try:
+            row_id = int(item.get('id'))
+            qty = int(item.get('confirmed_quantity') or 0)
+        except (ValueError, TypeError):
+            continue
+        parsed[row_id] = (item.get('status'), qty)
+
+    query = model.query.filter(model.id.in_(list(parsed.keys())))
+    if brand_id:
+        query = query.join(Store, model.store_id == Store.id).filter(Store.brand_id == brand_id)
+    rows = {row.id: row for row in query.order_by(model.id).with_for_update(of=model).all()} if parsed else {}
+
+    approvals, rejections = [], []
+    for row_id, (status, qty) in parsed.items():
+        row = rows.get(row_id)
+        if not row:
+            results[row_id] = {'id': row_id, 'status': 'error', 'message': '내역 없음'}
+        elif row.status != TransferStatus.REQUESTED:
+            results[row_id] = {'id': row_id, 'status': 'error', 'message': '이미 처리됨'}
+        elif status == 'APPROVED':
+            if qty <= 0:
+                results[row_id] = {'id': row_id, 'status': 'error', 'message': '확정 수량 오류'}
+            else:
+                approvals.append((row, qty))
+        elif status == 'REJECTED':
+            rejections.append(row)
+        else:
+            results[row_id] = {'id': row_id, 'status': 'error', 'message': '잘못된 상태값'}
+    return results, approvals, rejections
+
+def _allocate(approvals, available, key_fn):
+    """요청 순서대로 잠근 재고 안에서 배정. 반환: (배정된 [(row, qty)], 부족한 [(row, 남은 재고)])"""
+    accepted, short = [], []
+    for row, qty in approvals:
+        key = key_fn(row)
+        remaining = available.get(key, 0)
+        if remaining >= qty:
+            available[key] = remaining - qty
+            accepted.append((row, qty))
+        else:
+            short.append((row, remaining))
+    return accepted, short
+
+def _batch_summary(results, order):
+    rows = [results[row_id] for row_id in order if row_id in results]
+    approved = sum(1 for r in rows if r['status'] == 'APPROVED')
+    rejected = sum(1 for r in rows if r['status'] == 'REJECTED')
+    failed = sum(1 for r in rows if r['status'] == 'error')
+    return {
+        'status': 'success',
+        'message': f'승인 {approved}건, 거절 {rejected}건, 실패 {failed}건',
+        'approved': approved,
+        'rejected': rejected,
+        'failed': failed,
+        'results': rows
+    }
+
+def _item_ids(items):
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item.get('id')))
+        except (ValueError, TypeError):
+            continue
+    return list(dict.fromkeys(ids))
 
 class StoreOrderService:
     @staticmethod
@@ -27,10 +106,47 @@ class StoreOrderService:
             db.session.rollback()
             return {'status': 'error', 'message': str(e)}
 
+    @staticmethod
+    def create_orders_bulk(store_id, lines, order_date_str=None):
+        """
+        매장 주문서 일괄 요청 (lines: [(variant_id, quantity)])
+        StoreOrder 행을 한 번의 다중 INSERT 로 생성
+        """
+        try:
+            rows = [(int(vid), int(qty)) for vid, qty in lines]
+            if not rows:
+                return {'status': 'error', 'message': '주문할 품목이 없습니다.'}
+            if any(qty <= 0 for _, qty in rows):
+                return {'status': 'error', 'message': '수량은 1개 이상이어야 합니다.'}
+
+            order_date = datetime.strptime(order_date_str, '%Y-%m-%d').date() if order_date_str else date.today()
+
+            db.session.execute(insert(StoreOrder), [
+                {
+                    'store_id': store_id,
+                    'variant_id': variant_id,
+                    'order_date': order_date,
+                    'quantity': qty,
+                    'status': TransferStatus.REQUESTED
+                }
+                for variant_id, qty in rows
+            ])
+            db.session.commit()
+            return {
+                'status': 'success',
+                'message': f'{len(rows)}건의 주문이 요청되었습니다.',
+                'created': len(rows),
+                'total_quantity': sum(qty for _, qty in rows)
+            }
+        except Exception as e:
+            db.session.rollback()
+            return {'status': 'error', 'message': str(e)}
+
     @staticmethod
     def update_order_status(order_id, status, confirmed_qty, user_id):
         try:
-            order = db.session.get(StoreOrder, order_id)
+            # 같은 주문의 중복 승인 방지 (처리 완료까지 주문 행 잠금)
+            order = db.session.get(StoreOrder, order_id, with_for_update=True)
             if not order: return {'status': 'error', 'message': '주문 내역 없음'}
             if order.status != TransferStatus.REQUESTED: 
                 return {'status': 'error', 'message': '이미 처리된 주문입니다.'}
@@ -39,27 +155,19 @@ class StoreOrderService:
                 if confirmed_qty <= 0: 
                     return {'status': 'error', 'message': '확정 수량 오류'}
                 
-                variant = db.session.get(Variant, order.variant_id)
-                if variant.hq_quantity < confirmed_qty:
-                     return {'status': 'error', 'message': f'본사 재고가 부족합니다. (현재: {variant.hq_quantity})'}
-
-                variant.hq_quantity -= confirmed_qty
-                
-                stock = StoreStock.query.filter_by(store_id=order.store_id, variant_id=order.variant_id).first()
-                if not stock:
-                    stock = StoreStock(store_id=order.store_id, variant_id=order.variant_id, quantity=0)
-                    db.session.add(stock)
-                stock.quantity += confirmed_qty
+                try:
+                    apply_hq_stock_changes(
+                        [(order.variant_id, -confirmed_qty, order.store_id)],
+                        StockChangeType.HQ_ORDER_OUT, user_id, description=f'매장 주문 #{order.id}'
+                    )
+                except InsufficientHqStockError as e:
+                    db.session.rollback()
+                    return {'status': 'error', 'message': f'본사 재고가 부족합니다. (현재: {e.shortages[0][2]})'}
                 
-                history = StockHistory(
-                    store_id=order.store_id,
-                    variant_id=order.variant_id,
-                    user_id=user_id,
-                    change_type=StockChangeType.ORDER_IN,
-                    quantity_change=confirmed_qty,
-                    current_quantity=stock.quantity
+                apply_stock_changes(
+                    [(order.store_id, order.variant_id, confirmed_qty)],
+                    StockChangeType.ORDER_IN, user_id
                 )
-                db.session.add(history)
                 
                 order.confirmed_quantity = confirmed_qty
                 order.status = 'APPROVED'
@@ -74,6 +182,45 @@ class StoreOrderService:
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
+    @staticmethod
+    def update_orders_bulk(items, user_id, brand_id=None):
+        """
+        본사: 매장 주문 일괄 승인/거절 (items: [{'id', 'status', 'confirmed_quantity'}])
+        - 주문 행과 본사 재고 행을 각각 한 번의 SELECT ... FOR UPDATE 로 잠근 뒤 요청 순서대로 배정
+        - 본사 재고가 모자란 건만 실패 처리, 나머지는 재고/이력을 일괄 반영해 한 번에 커밋
+        """
+        try:
+            results, approvals, rejections = _load_batch(StoreOrder, items, brand_id)
+
+            hq_stock = lock_hq_rows(row.variant_id for row, _ in approvals)
+            accepted, short = _allocate(approvals, hq_stock, lambda row: row.variant_id)
+            for row, remaining in short:
+                results[row.id] = {'id': row.id, 'status': 'error', 'message': f'본사 재고가 부족합니다. (현재: {remaining})'}
+
+            if accepted:
+                apply_hq_stock_changes(
+                    [(row.variant_id, -qty, row.store_id) for row, qty in accepted],
+                    StockChangeType.HQ_ORDER_OUT, user_id, description='매장 주문 일괄 승인'
+                )
+                apply_stock_changes(
+                    [(row.store_id, row.variant_id, qty) for row, qty in accepted],
+                    StockChangeType.ORDER_IN, user_id
+                )
+            for row, qty in accepted:
+                row.confirmed_quantity = qty
+                row.status = 'APPROVED'
+                results[row.id] = {'id': row.id, 'status': 'APPROVED', 'confirmed_quantity': qty}
+            for row in rejections:
+                row.status = 'REJECTED'
+                results[row.id] = {'id': row.id, 'status': 'REJECTED'}
+
+            db.session.commit()
+            return _batch_summary(results, _item_ids(items))
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
     @staticmethod
     def create_return(store_id, variant_id, quantity, return_date_str):
         try:
@@ -98,7 +245,7 @@ class StoreOrderService:
     @staticmethod
     def update_return_status(return_id, status, confirmed_qty, user_id):
         try:
-            ret = db.session.get(StoreReturn, return_id)
+            ret = db.session.get(StoreReturn, return_id, with_for_update=True)
             if not ret: return {'status': 'error', 'message': '내역 없음'}
             if ret.status != TransferStatus.REQUESTED: 
                 return {'status': 'error', 'message': '이미 처리됨'}
@@ -106,27 +253,21 @@ class StoreOrderService:
             if status == 'APPROVED':
                 if confirmed_qty <= 0: return {'status': 'error', 'message': '수량 오류'}
                 
-                stock = StoreStock.query.filter_by(store_id=ret.store_id, variant_id=ret.variant_id).first()
-                
-                current_qty = stock.quantity if stock else 0
-                if current_qty < confirmed_qty:
-                    return {'status': 'error', 'message': f'매장 재고가 부족합니다. (현재: {current_qty})'}
-
-                if stock:
-                    stock.quantity -= confirmed_qty
-                    
-                    history = StockHistory(
-                        store_id=ret.store_id,
-                        variant_id=ret.variant_id,
-                        user_id=user_id,
-                        change_type=StockChangeType.RETURN_OUT,
-                        quantity_change=-confirmed_qty,
-                        current_quantity=stock.quantity
+                # 주문 승인과 같은 순서(본사 재고 -> 매장 재고)로 잠가 교착 방지
+                lock_hq_rows([ret.variant_id])
+                try:
+                    apply_stock_changes(
+                        [(ret.store_id, ret.variant_id, -confirmed_qty)],
+                        StockChangeType.RETURN_OUT, user_id, non_negative=True
                     )
-                    db.session.add(history)
+                except InsufficientStockError as e:
+                    db.session.rollback()
+                    return {'status': 'error', 'message': f'매장 재고가 부족합니다. (현재: {e.shortages[0][3]})'}
                 
-                variant = db.session.get(Variant, ret.variant_id)
-                variant.hq_quantity += confirmed_qty
+                apply_hq_stock_changes(
+                    [(ret.variant_id, confirmed_qty, ret.store_id)],
+                    StockChangeType.HQ_RETURN_IN, user_id, description=f'매장 반품 #{ret.id}'
+                )
                 
                 ret.confirmed_quantity = confirmed_qty
                 ret.status = 'APPROVED'
@@ -138,4 +279,45 @@ class StoreOrderService:
             return {'status': 'success', 'message': '처리되었습니다.'}
         except Exception as e:
             db.session.rollback()
-            return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def update_returns_bulk(items, user_id, brand_id=None):
+        """
+        본사: 매장 반품 일괄 승인/거절 (items: [{'id', 'status', 'confirmed_quantity'}])
+        - 본사 재고 행, 대상 매장 재고 행 순으로 한 번에 잠가 검증, 매장 재고가 모자란 건만 실패 처리
+        - 매장 재고 차감 / 본사 재고 입고 / 이력을 일괄 반영해 한 번에 커밋
+        """
+        try:
+            results, approvals, rejections = _load_batch(StoreReturn, items, brand_id)
+
+            # 주문 일괄 처리와 같은 순서(본사 재고 -> 매장 재고)로 잠가 교착 방지
+            lock_hq_rows(row.variant_id for row, _ in approvals)
+            store_stock = lock_stock_pairs((row.store_id, row.variant_id) for row, _ in approvals)
+            accepted, short = _allocate(approvals, store_stock, lambda row: (row.store_id, row.variant_id))
+            for row, remaining in short:
+                results[row.id] = {'id': row.id, 'status': 'error', 'message': f'매장 재고가 부족합니다. (현재: {remaining})'}
+
+            if accepted:
+                apply_stock_changes(
+                    [(row.store_id, row.variant_id, -qty) for row, qty in accepted],
+                    StockChangeType.RETURN_OUT, user_id, non_negative=True
+                )
+                apply_hq_stock_changes(
+                    [(row.variant_id, qty, row.store_id) for row, qty in accepted],
+                    StockChangeType.HQ_RETURN_IN, user_id, description='매장 반품 일괄 승인'
+                )
+            for row, qty in accepted:
+                row.confirmed_quantity = qty
+                row.status = 'APPROVED'
+                results[row.id] = {'id': row.id, 'status': 'APPROVED', 'confirmed_quantity': qty}
+            for row in rejections:
+                row.status = 'REJECTED'
+                results[row.id] = {'id': row.id, 'status': 'REJECTED'}
+
+            db.session.commit()
+            return _batch_summary(results, _item_ids(items))
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
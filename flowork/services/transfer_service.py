@@ -1,9 +1,48 @@
 import traceback
+from collections import defaultdict
+from sqlalchemy import select, insert, update, delete, func
 from flowork.extensions import db
-from flowork.models import StockTransfer, StoreStock, StockHistory
+from flowork.models import StockTransfer, TransferDocument, Store, Variant, Product
 from flowork.constants import TransferType, TransferStatus, StockChangeType
+from flowork.services.stock_ledger import apply_stock_changes, InsufficientStockError
 
 class TransferService:
+    @staticmethod
+    def _lock_document(document_id):
+        """지시서 헤더 잠금 (같은 지시서의 상태 갱신을 한 트랜잭션씩 처리, 라인보다 먼저 잠금)"""
+        return db.session.get(TransferDocument, document_id, with_for_update=True, populate_existing=True)
+
+    @staticmethod
+    def _lock_transfer(transfer_id):
+        """
+        이동 라인 잠금. 지시서 라인이면 지시서 헤더를 먼저 잠가 _process_document 와 같은 순서 유지
+        반환: (transfer 또는 None, document 또는 None)
+        """
+        document_id = db.session.execute(
+            select(StockTransfer.document_id).where(StockTransfer.id == transfer_id)
+        ).scalar()
+        document = TransferService._lock_document(document_id) if document_id else None
+        transfer = db.session.get(StockTransfer, transfer_id, with_for_update=True, populate_existing=True)
+        return transfer, document
+
+    @staticmethod
+    def _refresh_document_status(document):
+        """
+        라인 상태로 지시서 상태 재계산 (헤더를 잠근 트랜잭션에서 호출)
+        거부된 라인은 제외하고, 남은 라인이 모두 입고면 RECEIVED, 출고 대기가 없으면 SHIPPED
+        """
+        counts = dict(db.session.execute(
+            select(StockTransfer.status, func.count()).where(StockTransfer.document_id == document.id)
+            .group_by(StockTransfer.status)
+        ).all())
+        if not counts.get(TransferStatus.REQUESTED) and not counts.get(TransferStatus.SHIPPED):
+            if counts.get(TransferStatus.RECEIVED):
+                document.status = TransferStatus.RECEIVED
+            elif counts.get(TransferStatus.REJECTED):
+                document.status = TransferStatus.REJECTED
+        elif not counts.get(TransferStatus.REQUESTED):
+            document.status = TransferStatus.SHIPPED
+
     @staticmethod
     def request_transfer(source_store_id, target_store_id, variant_id, quantity):
         try:
@@ -20,7 +59,7 @@ class TransferService:
             )
             db.session.add(transfer)
             db.session.commit()
-            return {'status': 'success', 'message': '재고 이동 요청이 등록되었습니다.'}
+            return {'status': 'success', 'message': '재고 이동 요청이 등록되었습니다.', 'transfer_id': transfer.id}
         except Exception as e:
             db.session.rollback()
             return {'status': 'error', 'message': str(e)}
@@ -50,7 +89,7 @@ class TransferService:
     def ship_transfer(transfer_id, user_store_id, user_id):
         """출고 확정 (보내는 매장 재고 차감)"""
         try:
-            transfer = db.session.get(StockTransfer, transfer_id)
+            transfer, document = TransferService._lock_transfer(transfer_id)
             if not transfer: return {'status': 'error', 'message': '내역 없음'}
             
             if transfer.source_store_id != user_store_id:
@@ -59,31 +98,20 @@ class TransferService:
             if transfer.status != TransferStatus.REQUESTED:
                 return {'status': 'error', 'message': '처리할 수 없는 상태입니다.'}
 
-            # 재고 차감
-            stock = StoreStock.query.filter_by(
-                store_id=transfer.source_store_id, 
-                variant_id=transfer.variant_id
-            ).with_for_update().first()
-            
-            if not stock or stock.quantity < transfer.quantity:
-                return {'status': 'error', 'message': '재고가 부족합니다.'}
-                
-            stock.quantity -= transfer.quantity
-            
-            # 이력 기록
-            history = StockHistory(
-                store_id=transfer.source_store_id,
-                variant_id=transfer.variant_id,
-                user_id=user_id,
-                change_type=StockChangeType.TRANSFER_OUT,
-                quantity_change=-transfer.quantity,
-                current_quantity=stock.quantity
+            # 재고 차감 (부족하면 차감하지 않음) + 이력 기록
+            apply_stock_changes(
+                [(transfer.source_store_id, transfer.variant_id, -transfer.quantity)],
+                StockChangeType.TRANSFER_OUT, user_id, non_negative=True
             )
-            db.session.add(history)
             
             transfer.status = TransferStatus.SHIPPED
+            if document:
+                TransferService._refresh_document_status(document)
             db.session.commit()
             return {'status': 'success', 'message': '출고(이동등록) 처리되었습니다.'}
+        except InsufficientStockError:
+            db.session.rollback()
+            return {'status': 'error', 'message': '재고가 부족합니다.'}
         except Exception as e:
             db.session.rollback()
             traceback.print_exc()
@@ -93,7 +121,7 @@ class TransferService:
     def receive_transfer(transfer_id, user_store_id, user_id):
         """입고 확정 (받는 매장 재고 증가)"""
         try:
-            transfer = db.session.get(StockTransfer, transfer_id)
+            transfer, document = TransferService._lock_transfer(transfer_id)
             if not transfer: return {'status': 'error', 'message': '내역 없음'}
             
             if transfer.target_store_id != user_store_id:
@@ -103,28 +131,14 @@ class TransferService:
                 return {'status': 'error', 'message': '아직 출고되지 않았거나 이미 처리된 건입니다.'}
 
             # 재고 증가 (없으면 생성)
-            stock = StoreStock.query.filter_by(
-                store_id=transfer.target_store_id, 
-                variant_id=transfer.variant_id
-            ).with_for_update().first()
-            
-            if not stock:
-                stock = StoreStock(store_id=transfer.target_store_id, variant_id=transfer.variant_id, quantity=0)
-                db.session.add(stock)
-                
-            stock.quantity += transfer.quantity
-            
-            history = StockHistory(
-                store_id=transfer.target_store_id,
-                variant_id=transfer.variant_id,
-                user_id=user_id,
-                change_type=StockChangeType.TRANSFER_IN,
-                quantity_change=transfer.quantity,
-                current_quantity=stock.quantity
+            apply_stock_changes(
+                [(transfer.target_store_id, transfer.variant_id, transfer.quantity)],
+                StockChangeType.TRANSFER_IN, user_id
             )
-            db.session.add(history)
             
             transfer.status = TransferStatus.RECEIVED
+            if document:
+                TransferService._refresh_document_status(document)
             db.session.commit()
             return {'status': 'success', 'message': '입고 확정되었습니다.'}
         except Exception as e:
@@ -136,7 +150,7 @@ class TransferService:
     def reject_transfer(transfer_id, user_store_id):
         """출고 거부"""
         try:
-            transfer = db.session.get(StockTransfer, transfer_id)
+            transfer, document = TransferService._lock_transfer(transfer_id)
             if not transfer: return {'status': 'error', 'message': '내역 없음'}
             
             if transfer.source_store_id != user_store_id:
@@ -146,8 +160,192 @@ class TransferService:
                 return {'status': 'error', 'message': '거부할 수 없는 상태입니다.'}
                 
             transfer.status = TransferStatus.REJECTED
+            if document:
+                TransferService._refresh_document_status(document)
             db.session.commit()
             return {'status': 'success', 'message': '요청을 거부했습니다.'}
         except Exception as e:
             db.session.rollback()
-            return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def create_document(brand_id, user_id, lines, title=None, status=TransferStatus.REQUESTED):
+        """
+        본사 이동 지시서 일괄 생성 (배분표 업로드, 재배치 제안 등)
+        lines: [(source_store_id, target_store_id, variant_id, quantity)] - 같은 매장/옵션 조합은 합산
+        status=DRAFT 이면 확정(confirm_document) 전까지 매장에 노출되지 않는 제안 문서
+        """
+        try:
+            merged = defaultdict(int)
+            for source_id, target_id, variant_id, qty in lines:
+                if int(qty) <= 0:
+                    return {'status': 'error', 'message': '수량은 1개 이상이어야 합니다.'}
+                if int(source_id) == int(target_id):
+                    return {'status': 'error', 'message': '보내는 매장과 받는 매장이 같습니다.'}
+                merged[(int(source_id), int(target_id), int(variant_id))] += int(qty)
+
+            if not merged:
+                return {'status': 'error', 'message': '지시할 품목이 없습니다.'}
+
+            store_ids = {k[0] for k in merged} | {k[1] for k in merged}
+            valid_stores = set(db.session.execute(
+                select(Store.id).where(Store.brand_id == brand_id, Store.id.in_(store_ids))
+            ).scalars())
+            variant_ids = {k[2] for k in merged}
+            valid_variants = set(db.session.execute(
+                select(Variant.id).join(Product).where(Product.brand_id == brand_id, Variant.id.in_(variant_ids))
+            ).scalars())
+            if store_ids - valid_stores or variant_ids - valid_variants:
+                return {'status': 'error', 'message': '브랜드에 없는 매장 또는 상품이 포함되어 있습니다.'}
+
+            document = TransferDocument(
+                brand_id=brand_id,
+                title=title,
+                status=status,
+                line_count=len(merged),
+                total_quantity=sum(merged.values()),
+                created_by=user_id
+            )
+            db.session.add(document)
+            db.session.flush()
+
+            db.session.execute(insert(StockTransfer), [{
+                'document_id': document.id,
+                'transfer_type': TransferType.INSTRUCTION,
+                'status': status,
+                'source_store_id': source_id,
+                'target_store_id': target_id,
+                'variant_id': variant_id,
+                'quantity': qty
+            } for (source_id, target_id, variant_id), qty in sorted(merged.items())])
+
+            db.session.commit()
+            return {
+                'status': 'success',
+                'message': f'이동 지시서가 등록되었습니다. ({document.line_count}건, {document.total_quantity}개)',
+                'document_id': document.id
+            }
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def _process_document(document_id, brand_id, user_id, store_id, from_status, to_status):
+        """
+        지시서 라인 일괄 출고/입고 공통 처리
+        - store_id 가 있으면 해당 매장 라인만 (매장 계정), 없으면 문서 전체 (본사)
+        - 지시서 헤더 잠금 -> 대상 라인 잠금 -> 재고 증감 한 번(이력 일괄 INSERT) -> 라인 상태 일괄 UPDATE -> 문서 상태 갱신
+        """
+        document = TransferService._lock_document(document_id)
+        if not document or document.brand_id != brand_id:
+            return None, {'status': 'error', 'message': '지시서를 찾을 수 없습니다.'}
+
+        shipping = to_status == TransferStatus.SHIPPED
+        store_col = StockTransfer.source_store_id if shipping else StockTransfer.target_store_id
+
+        stmt = select(StockTransfer.id, store_col, StockTransfer.variant_id, StockTransfer.quantity).where(
+            StockTransfer.document_id == document_id,
+            StockTransfer.status == from_status
+        )
+        if store_id:
+            stmt = stmt.where(store_col == store_id)
+        rows = db.session.execute(stmt.order_by(StockTransfer.id).with_for_update()).all()
+        if not rows:
+            msg = '출고할 품목이 없습니다.' if shipping else '입고할 품목이 없습니다.'
+            return None, {'status': 'error', 'message': msg}
+
+        sign = -1 if shipping else 1
+        apply_stock_changes(
+            [(row_store, variant_id, sign * qty) for _, row_store, variant_id, qty in rows],
+            StockChangeType.TRANSFER_OUT if shipping else StockChangeType.TRANSFER_IN,
+            user_id,
+            description=f'이동지시서 #{document_id}',
+            non_negative=shipping
+        )
+
+        db.session.execute(
+            update(StockTransfer).where(StockTransfer.id.in_([r[0] for r in rows]))
+            .values(status=to_status).execution_options(synchronize_session=False)
+        )
+
+        TransferService._refresh_document_status(document)
+        return rows, None
+
+    @staticmethod
+    def ship_document(document_id, brand_id, user_id, store_id=None):
+        """지시서 일괄 출고 (재고 부족 품목이 하나라도 있으면 전체 취소)"""
+        try:
+            rows, error = TransferService._process_document(
+                document_id, brand_id, user_id, store_id, TransferStatus.REQUESTED, TransferStatus.SHIPPED
+            )
+            if error:
+                return error
+            db.session.commit()
+            return {'status': 'success', 'message': f'{len(rows)}건 출고 처리되었습니다.'}
+        except InsufficientStockError as e:
+            db.session.rollback()
+            return {
+                'status': 'error',
+                'message': f'재고가 부족한 품목이 {len(e.shortages)}건 있습니다.',
+                'shortages': [
+                    {'store_id': s, 'variant_id': v, 'requested': req, 'available': avail}
+                    for s, v, req, avail in e.shortages
+                ]
+            }
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def receive_document(document_id, brand_id, user_id, store_id=None):
+        """지시서 일괄 입고"""
+        try:
+            rows, error = TransferService._process_document(
+                document_id, brand_id, user_id, store_id, TransferStatus.SHIPPED, TransferStatus.RECEIVED
+            )
+            if error:
+                return error
+            db.session.commit()
+            return {'status': 'success', 'message': f'{len(rows)}건 입고 확정되었습니다.'}
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def confirm_document(document_id, brand_id):
+        """제안(DRAFT) 지시서 확정 -> 매장 출고 대상(REQUESTED)"""
+        try:
+            document = db.session.get(TransferDocument, document_id)
+            if not document or document.brand_id != brand_id:
+                return {'status': 'error', 'message': '지시서를 찾을 수 없습니다.'}
+            if document.status != TransferStatus.DRAFT:
+                return {'status': 'error', 'message': '제안 상태의 지시서만 확정할 수 있습니다.'}
+
+            db.session.execute(
+                update(StockTransfer).where(
+                    StockTransfer.document_id == document_id,
+                    StockTransfer.status == TransferStatus.DRAFT
+                ).values(status=TransferStatus.REQUESTED).execution_options(synchronize_session=False)
+            )
+            document.status = TransferStatus.REQUESTED
+            db.session.commit()
+            return {'status': 'success', 'message': f'지시서 #{document_id} 가 확정되었습니다.'}
+        except Exception as e:
+            db.session.rollback()
+            return {'status': 'error', 'message': str(e)}
+
+    @staticmethod
+    def discard_draft_documents(brand_id, document_id=None):
+        """제안(DRAFT) 지시서 삭제 (document_id 없으면 브랜드의 모든 제안). 반환: 삭제된 문서 수"""
+        doc_ids = select(TransferDocument.id).where(
+            TransferDocument.brand_id == brand_id,
+            TransferDocument.status == TransferStatus.DRAFT
+        )
+        if document_id:
+            doc_ids = doc_ids.where(TransferDocument.id == document_id)
+        db.session.execute(delete(StockTransfer).where(StockTransfer.document_id.in_(doc_ids)))
+        result = db.session.execute(delete(TransferDocument).where(TransferDocument.id.in_(doc_ids)))
+        return result.rowcount
@@ -15,18 +15,28 @@ class CheckApp {
             targetStoreSelect: this.container.querySelector('#target_store_select'),
             exportBtn: this.container.querySelector('#btn-export-excel'),
             resetHiddenInput: this.container.querySelector('#reset_target_store_id'),
-            resetForm: this.container.querySelector('#form-reset-stock')
+            resetForm: this.container.querySelector('#form-reset-stock'),
+            sessionStatus: this.container.querySelector('#count-session-status'),
+            applyBtn: this.container.querySelector('#btn-apply-actual-stock')
         };
 
         this.urls = {
             fetch: this.container.dataset.apiFetchVariantUrl,
-            update: this.container.dataset.bulkUpdateActualStockUrl
+            update: this.container.dataset.bulkUpdateActualStockUrl,
+            countSessions: this.container.dataset.countSessionsUrl,
+            apply: this.container.dataset.applyActualStockUrl
         };
 
         this.state = {
             isScanning: false,
             scanList: {},
-            targetStoreId: this.dom.targetStoreSelect ? this.dom.targetStoreSelect.value : null
+            targetStoreId: this.dom.targetStoreSelect ? this.dom.targetStoreSelect.value : null,
+            // 서버 실사 세션 (여러 단말 스캔 합산)
+            sessionId: null,
+            pendingScans: {},
+            syncTimer: null,
+            progressTimer: null,
+            deviceId: this.getDeviceId()
         };
 
         this.init();
@@ -36,6 +46,7 @@ class CheckApp {
         if (this.dom.targetStoreSelect) {
             this.dom.targetStoreSelect.addEventListener('change', () => {
                 this.state.targetStoreId = this.dom.targetStoreSelect.value;
+                if (this.state.sessionId) this.stopSession();
                 this.updateUiForStore(this.state.targetStoreId);
                 
                 if (Object.keys(this.state.scanList).length > 0) {
@@ -76,6 +87,10 @@ class CheckApp {
             this.dom.submitBtn.addEventListener('click', () => this.submitScan());
         }
 
+        if (this.dom.applyBtn) {
+            this.dom.applyBtn.addEventListener('click', () => this.applyActualStock());
+        }
+
         if (this.dom.resetForm) {
             this.dom.resetForm.addEventListener('submit', (e) => {
                 if (this.dom.targetStoreSelect && !this.dom.resetHiddenInput.value) {
@@ -113,6 +128,7 @@ class CheckApp {
         const input = this.dom.barcodeInput;
 
         if (this.state.isScanning) {
+            if (this.urls.countSessions && !this.state.sessionId) this.startSession();
             btn.classList.replace('btn-success', 'btn-danger');
             btn.innerHTML = '<i class="bi bi-stop-circle me-1"></i>종료';
             input.disabled = false;
@@ -163,8 +179,81 @@ class CheckApp {
         }
     }
 
+    getDeviceId() {
+        let deviceId = localStorage.getItem('flowork_count_device');
+        if (!deviceId) {
+            deviceId = `dev-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+            localStorage.setItem('flowork_count_device', deviceId);
+        }
+        return deviceId;
+    }
+
+    async startSession() {
+        try {
+            const data = await Flowork.post(this.urls.countSessions, { target_store_id: this.state.targetStoreId });
+            this.state.sessionId = data.session_id;
+            if (!data.created) Flowork.toast('진행 중인 실사 세션에 합류했습니다.', 'info');
+            this.renderProgress(data.progress);
+            this.state.syncTimer = setInterval(() => this.syncScans(), 1000);
+            this.state.progressTimer = setInterval(() => this.refreshProgress(), 3000);
+        } catch (e) {
+            this.state.sessionId = null;
+        }
+    }
+
+    stopSession() {
+        clearInterval(this.state.syncTimer);
+        clearInterval(this.state.progressTimer);
+        this.state.sessionId = null;
+        this.state.pendingScans = {};
+        this.renderProgress(null);
+    }
+
+    queueScan(barcode, delta) {
+        if (!this.state.sessionId || !delta) return;
+        this.state.pendingScans[barcode] = (this.state.pendingScans[barcode] || 0) + delta;
+    }
+
+    async syncScans() {
+        const pending = this.state.pendingScans;
+        const scans = Object.entries(pending)
+            .filter(([, qty]) => qty)
+            .map(([barcode, quantity]) => ({ barcode, quantity }));
+        if (!this.state.sessionId || scans.length === 0) return;
+
+        this.state.pendingScans = {};
+        try {
+            await Flowork.post(`${this.urls.countSessions}/${this.state.sessionId}/scans`, {
+                scans, device_id: this.state.deviceId
+            });
+        } catch (e) {
+            // 전송 실패분은 다음 주기에 다시 보냄
+            scans.forEach(({ barcode, quantity }) => this.queueScan(barcode, quantity));
+        }
+    }
+
+    async refreshProgress() {
+        if (!this.state.sessionId) return;
+        try {
+            const data = await Flowork.get(`${this.urls.countSessions}/${this.state.sessionId}`);
+            this.renderProgress(data.progress);
+        } catch (e) { /* 다음 주기에 재시도 */ }
+    }
+
+    renderProgress(progress) {
+        if (!this.dom.sessionStatus) return;
+        if (!progress) {
+            this.dom.sessionStatus.textContent = '';
+            return;
+        }
+        const devices = Object.keys(progress.devices || {}).length;
+        this.dom.sessionStatus.textContent =
+            `세션 전체 ${Flowork.fmtNum(progress.total_units)}개 (${Flowork.fmtNum(progress.sku_count)}종, 단말 ${devices}대)`;
+    }
+
     addToList(data) {
         const key = data.barcode; 
+        this.queueScan(key, 1);
         if (this.state.scanList[key]) {
             this.state.scanList[key].scan_quantity += 1;
         } else {
@@ -218,6 +307,7 @@ class CheckApp {
                 const bc = e.target.dataset.barcode;
                 const newQty = parseInt(e.target.value);
                 if (this.state.scanList[bc] && newQty >= 0) {
+                    this.queueScan(bc, newQty - this.state.scanList[bc].scan_quantity);
                     this.state.scanList[bc].scan_quantity = newQty;
                     this.renderTable(); 
                 }
@@ -226,13 +316,29 @@ class CheckApp {
     }
 
     clearScanList() {
+        // 세션에서는 이 단말이 스캔한 수량만 되돌림
+        Object.values(this.state.scanList).forEach(item => this.queueScan(item.barcode, -item.scan_quantity));
         this.state.scanList = {};
         this.renderTable();
         this.setStatus('초기화됨', 'text-info');
         this.dom.barcodeInput.focus();
     }
 
+    async submitSession() {
+        if (!confirm('실사 세션을 마감하고 모든 단말의 스캔 합계를 반영하시겠습니까?')) return;
+        try {
+            await this.syncScans();
+            const result = await Flowork.post(`${this.urls.countSessions}/${this.state.sessionId}/flush`, {});
+            Flowork.toast(result.message, 'success');
+            this.stopSession();
+            this.state.scanList = {};
+            this.renderTable();
+        } catch (e) { /* 오류 메시지는 Flowork.api 에서 표시 */ }
+    }
+
     async submitScan() {
+        if (this.state.sessionId) return this.submitSession();
+
         const items = Object.values(this.state.scanList);
         if (items.length === 0) return Flowork.toast('스캔 내역이 없습니다.', 'warning');
         if (this.dom.targetStoreSelect && !this.state.targetStoreId) return Flowork.toast('매장을 선택하세요.', 'warning');
@@ -259,7 +365,10 @@ class CheckApp {
 
             const result = await response.json();
 
-            if (response.ok && result.status === 'success') {
+            if (response.ok && result.status === 'success' && result.task_id) {
+                this.setStatus('실사 재고 반영 중...', 'text-info');
+                this.pollTask(result.task_id);
+            } else if (response.ok && result.status === 'success') {
                 Flowork.toast('실사 재고가 반영되었습니다.', 'success');
                 this.state.scanList = {};
                 this.renderTable();
@@ -273,6 +382,48 @@ class CheckApp {
         }
     }
 
+    async applyActualStock() {
+        if (this.dom.targetStoreSelect && !this.state.targetStoreId) return Flowork.toast('매장을 선택하세요.', 'warning');
+        if (!confirm('저장된 실사재고를 전산재고로 반영하시겠습니까? (차이 수량은 재고 이력에 기록됩니다)')) return;
+
+        try {
+            const data = await Flowork.post(this.urls.apply, { target_store_id: this.state.targetStoreId });
+            this.dom.applyBtn.disabled = true;
+            this.setStatus('전산 반영 중...', 'text-info');
+            this.pollTask(data.task_id, (result) => {
+                this.dom.applyBtn.disabled = false;
+                if (!result) return;
+                const lines = Object.entries(result.by_category || {})
+                    .map(([cat, t]) => `${cat}: ${t.skus}개 (${t.net >= 0 ? '+' : ''}${t.net})`);
+                if (lines.length) alert(`${result.message}\n\n${lines.join('\n')}`);
+            });
+        } catch (e) { /* 오류 메시지는 Flowork.api 에서 표시 */ }
+    }
+
+    pollTask(taskId, onDone = null) {
+        const interval = setInterval(async () => {
+            try {
+                const task = await Flowork.get(`/api/task_status/${taskId}`);
+                if (task.status === 'processing') {
+                    this.setStatus(`실사 재고 반영 중... ${task.percent}%`, 'text-info');
+                    return;
+                }
+                clearInterval(interval);
+                if (task.status === 'completed') {
+                    Flowork.toast(task.result.message, 'success');
+                    this.setStatus('반영 완료', 'text-success');
+                    if (onDone) return onDone(task.result);
+                    this.state.scanList = {};
+                    this.renderTable();
+                } else {
+                    Flowork.toast(`작업 오류: ${task.message}`, 'danger');
+                    this.setStatus('반영 실패', 'text-danger');
+                    if (onDone) onDone(null);
+                }
+            } catch (e) { clearInterval(interval); }
+        }, 1000);
+    }
+
     setStatus(msg, cls) {
         this.dom.scanStatusMsg.textContent = msg;
         this.dom.scanStatusMsg.className = cls;
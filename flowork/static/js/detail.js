@@ -11,6 +11,7 @@ class DetailApp {
             toggleFavoriteUrl: ds.toggleFavoriteUrl,
             updateActualStockUrl: ds.updateActualStockUrl,
             updateProductDetailsUrl: ds.updateProductDetailsUrl,
+            salesMatrixUrl: ds.salesMatrixUrl,
             currentProductID: ds.productId,
             myStoreID: parseInt(ds.myStoreId, 10) || 0
         };
@@ -27,7 +28,13 @@ class DetailApp {
             saveProductBtn: this.container.querySelector('#save-product-btn'),
             cancelEditBtn: this.container.querySelector('#cancel-edit-btn'),
             deleteProductBtn: this.container.querySelector('#delete-product-btn'),
-            deleteProductForm: this.container.querySelector('#delete-product-form')
+            deleteProductForm: this.container.querySelector('#delete-product-form'),
+            matrixStartDate: this.container.querySelector('#matrix-start-date'),
+            matrixEndDate: this.container.querySelector('#matrix-end-date'),
+            matrixLoadBtn: this.container.querySelector('#matrix-load-btn'),
+            matrixThead: this.container.querySelector('#matrix-thead'),
+            matrixTbody: this.container.querySelector('#matrix-tbody'),
+            matrixSellThrough: this.container.querySelector('#matrix-sell-through')
         };
 
         this.state = {
@@ -74,6 +81,62 @@ class DetailApp {
             initialStoreId = this.config.myStoreID;
         }
         this.renderStockTable(initialStoreId);
+        this.setupSalesMatrix();
+    }
+
+    setupSalesMatrix() {
+        if (!this.dom.matrixLoadBtn) return;
+        const end = new Date();
+        const start = new Date(end.getTime() - 29 * 24 * 60 * 60 * 1000);
+        this.dom.matrixEndDate.value = end.toISOString().slice(0, 10);
+        this.dom.matrixStartDate.value = start.toISOString().slice(0, 10);
+        this.dom.matrixLoadBtn.addEventListener('click', () => this.loadSalesMatrix());
+    }
+
+    async loadSalesMatrix() {
+        const params = new URLSearchParams({
+            start_date: this.dom.matrixStartDate.value,
+            end_date: this.dom.matrixEndDate.value
+        });
+        if (this.dom.storeSelector && this.dom.storeSelector.value) {
+            params.set('store_id', this.dom.storeSelector.value);
+        }
+        this.dom.matrixLoadBtn.disabled = true;
+        try {
+            const data = await Flowork.get(`${this.config.salesMatrixUrl}?${params.toString()}`);
+            this.renderSalesMatrix(data);
+        } catch (error) {
+            Flowork.toast(error.message, 'danger');
+        } finally {
+            this.dom.matrixLoadBtn.disabled = false;
+        }
+    }
+
+    renderSalesMatrix(data) {
+        const cell = (sold, stock) => `<span class="fw-bold">${Flowork.fmtNum(sold)}</span> <span class="text-muted small">/ ${Flowork.fmtNum(stock)}</span>`;
+
+        this.dom.matrixThead.innerHTML = `<tr><th>컬러</th>${data.sizes.map(size => `<th>${size}</th>`).join('')}<th>합계</th></tr>`;
+
+        if (!data.colors.length) {
+            this.dom.matrixTbody.innerHTML = `<tr><td colspan="${data.sizes.length + 2}" class="text-muted py-4">데이터가 없습니다.</td></tr>`;
+            this.dom.matrixSellThrough.textContent = '-';
+            return;
+        }
+
+        const rows = data.colors.map((color, i) => `
+            <tr>
+                <th class="table-light">${color}</th>
+                ${data.sizes.map((_, j) => `<td>${cell(data.sold[i][j], data.stock[i][j])}</td>`).join('')}
+                <td class="table-light">${cell(data.color_totals.sold[i], data.color_totals.stock[i])}</td>
+            </tr>`);
+        rows.push(`
+            <tr class="table-light">
+                <th>합계</th>
+                ${data.sizes.map((_, j) => `<td>${cell(data.size_totals.sold[j], data.size_totals.stock[j])}</td>`).join('')}
+                <td>${cell(data.total.sold, data.total.stock)}</td>
+            </tr>`);
+        this.dom.matrixTbody.innerHTML = rows.join('');
+        this.dom.matrixSellThrough.textContent = `판매율 ${(data.total.sell_through * 100).toFixed(1)}%`;
     }
 
     setupEditMode() {
@@ -0,0 +1,248 @@
+class StockOverviewGrid {
+    constructor() {
+        this.container = document.querySelector('.stock-overview-container:not([data-initialized])');
+        if (!this.container) return;
+        this.container.dataset.initialized = "true";
+
+        this.brandId = this.container.dataset.brandId;
+        if (!this.brandId) return;
+
+        this.ROW_HEIGHT = 31;
+        this.BLOCK_SIZE = 200;
+        this.COL_LIMIT = 20;
+        this.OVERSCAN = 10;
+        this.MAX_BLOCKS = 20;
+
+        this.dom = {
+            form: this.container.querySelector('#overview-filter-form'),
+            viewport: this.container.querySelector('#overview-viewport'),
+            headRow: this.container.querySelector('#overview-head-row'),
+            body: this.container.querySelector('#overview-body'),
+            summary: this.container.querySelector('#overview-summary'),
+            colRange: this.container.querySelector('#overview-col-range'),
+            colPrev: this.container.querySelector('#btn-col-prev'),
+            colNext: this.container.querySelector('#btn-col-next')
+        };
+
+        this.sort = { by: null, storeId: null, order: 'desc' };
+        this.colOffset = 0;
+        this.totalRows = 0;
+        this.totalStores = 0;
+        this.stores = null;
+        this.blocks = new Map();
+        this.pending = new Map();
+        this.queryVersion = 0;
+        this.renderQueued = false;
+
+        this.init();
+    }
+
+    init() {
+        let pnTimer = null;
+        this.dom.form.addEventListener('submit', (e) => e.preventDefault());
+        this.dom.form.addEventListener('change', (e) => {
+            if (e.target.name !== 'pn') this.reset();
+        });
+        this.dom.form.querySelector('input[name="pn"]').addEventListener('input', () => {
+            clearTimeout(pnTimer);
+            pnTimer = setTimeout(() => this.reset(), 300);
+        });
+
+        this.dom.viewport.addEventListener('scroll', () => this.scheduleRender());
+        window.addEventListener('resize', () => this.scheduleRender());
+
+        this.dom.colPrev.addEventListener('click', () => this.moveColumns(-this.COL_LIMIT));
+        this.dom.colNext.addEventListener('click', () => this.moveColumns(this.COL_LIMIT));
+
+        this.dom.headRow.addEventListener('click', (e) => {
+            const th = e.target.closest('th');
+            if (!th) return;
+            if (th.classList.contains('sort-total')) {
+                this.toggleSort('total', null);
+            } else if (th.dataset.storeId) {
+                this.toggleSort('store', th.dataset.storeId);
+            }
+        });
+
+        this.reset();
+    }
+
+    toggleSort(by, storeId) {
+        if (this.sort.by === by && this.sort.storeId === storeId) {
+            if (this.sort.order === 'desc') {
+                this.sort.order = 'asc';
+            } else {
+                this.sort = { by: null, storeId: null, order: 'desc' };
+            }
+        } else {
+            this.sort = { by, storeId, order: 'desc' };
+        }
+        this.reset();
+    }
+
+    moveColumns(delta) {
+        const next = this.colOffset + delta;
+        if (next < 0 || next >= this.totalStores) return;
+        this.colOffset = next;
+        this.reset(false);
+    }
+
+    buildParams(rowOffset) {
+        const params = new URLSearchParams();
+        new FormData(this.dom.form).forEach((value, key) => {
+            if (value) params.append(key, value);
+        });
+        params.set('brand_id', this.brandId);
+        params.set('row_offset', rowOffset);
+        params.set('row_limit', this.BLOCK_SIZE);
+        params.set('col_offset', this.colOffset);
+        params.set('col_limit', this.COL_LIMIT);
+        if (this.sort.by) {
+            params.set('sort', this.sort.by);
+            params.set('order', this.sort.order);
+            if (this.sort.storeId) params.set('store_id', this.sort.storeId);
+        }
+        return params.toString();
+    }
+
+    reset(scrollTop = true) {
+        this.queryVersion++;
+        this.blocks.clear();
+        this.pending.clear();
+        this.stores = null;
+        if (scrollTop) this.dom.viewport.scrollTop = 0;
+        this.loadBlock(this.currentBlock());
+    }
+
+    currentBlock() {
+        return Math.floor(this.dom.viewport.scrollTop / this.ROW_HEIGHT / this.BLOCK_SIZE);
+    }
+
+    loadBlock(index) {
+        if (this.blocks.has(index) || this.pending.has(index)) return;
+        const version = this.queryVersion;
+        const url = `/api/stock_overview/grid?${this.buildParams(index * this.BLOCK_SIZE)}`;
+
+        const request = Flowork.get(url).then((data) => {
+            if (version !== this.queryVersion) return;
+            this.pending.delete(index);
+            this.totalRows = data.total_rows;
+            this.totalStores = data.total_stores;
+            this.filteredTotal = data.filtered_total;
+            if (!this.stores) {
+                this.stores = data.stores;
+                this.renderHead();
+            }
+            this.blocks.set(index, data);
+            this.evictBlocks(index);
+            this.scheduleRender();
+        }).catch(() => {
+            if (version === this.queryVersion) this.pending.delete(index);
+        });
+        this.pending.set(index, request);
+    }
+
+    evictBlocks(keepIndex) {
+        if (this.blocks.size <= this.MAX_BLOCKS) return;
+        const far = [...this.blocks.keys()].sort((a, b) => Math.abs(b - keepIndex) - Math.abs(a - keepIndex));
+        far.slice(0, this.blocks.size - this.MAX_BLOCKS).forEach((key) => this.blocks.delete(key));
+    }
+
+    scheduleRender() {
+        if (this.renderQueued) return;
+        this.renderQueued = true;
+        requestAnimationFrame(() => {
+            this.renderQueued = false;
+            this.renderBody();
+        });
+    }
+
+    escape(value) {
+        return String(value ?? '').replace(/[&<>"']/g, (c) => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[c]));
+    }
+
+    sortMark(by, storeId) {
+        if (this.sort.by !== by || this.sort.storeId !== storeId) return '';
+        return this.sort.order === 'desc' ? ' ▼' : ' ▲';
+    }
+
+    renderHead() {
+        this.dom.headRow.querySelectorAll('th.store-col').forEach((th) => th.remove());
+        const totalTh = this.dom.headRow.querySelector('.sort-total');
+        const ids = this.stores.id;
+
+        ids.forEach((storeId, i) => {
+            const th = document.createElement('th');
+            th.className = 'fw-normal store-col';
+            th.style.minWidth = '70px';
+            th.style.cursor = 'pointer';
+            th.dataset.storeId = String(storeId);
+            th.title = this.stores.name[i];
+            th.innerHTML = `${this.escape(this.stores.name[i].slice(0, 4))}..${this.sortMark('store', String(storeId))}`
+                + `<div class="small text-muted">${Flowork.fmtNum(this.stores.total[i])}</div>`;
+            this.dom.headRow.insertBefore(th, totalTh);
+        });
+        totalTh.innerHTML = `합계${this.sortMark('total', null)}`;
+
+        const colEnd = this.colOffset + ids.length;
+        this.dom.colRange.textContent = this.totalStores
+            ? `매장 ${this.colOffset + 1}-${colEnd} / ${this.totalStores}`
+            : '-';
+        this.dom.colPrev.disabled = this.colOffset === 0;
+        this.dom.colNext.disabled = colEnd >= this.totalStores;
+    }
+
+    renderBody() {
+        const colCount = 5 + (this.stores ? this.stores.id.length : 0);
+        this.dom.summary.textContent = `${Flowork.fmtNum(this.totalRows)}개 옵션 · 합계 ${Flowork.fmtNum(this.filteredTotal)}`;
+
+        if (!this.totalRows) {
+            this.dom.body.innerHTML = `<tr><td colspan="${colCount}" class="p-5 text-muted">${this.pending.size ? '데이터를 불러오는 중입니다...' : '데이터가 없습니다.'}</td></tr>`;
+            return;
+        }
+
+        const viewHeight = this.dom.viewport.clientHeight;
+        const first = Math.max(0, Math.floor(this.dom.viewport.scrollTop / this.ROW_HEIGHT) - this.OVERSCAN);
+        const last = Math.min(this.totalRows, Math.ceil((this.dom.viewport.scrollTop + viewHeight) / this.ROW_HEIGHT) + this.OVERSCAN);
+
+        const firstBlock = Math.floor(first / this.BLOCK_SIZE);
+        const lastBlock = Math.floor(Math.max(first, last - 1) / this.BLOCK_SIZE);
+        for (let b = firstBlock; b <= lastBlock; b++) this.loadBlock(b);
+
+        const html = [];
+        html.push(`<tr style="height: ${first * this.ROW_HEIGHT}px;"><td colspan="${colCount}" class="p-0 border-0"></td></tr>`);
+
+        for (let r = first; r < last; r++) {
+            const block = this.blocks.get(Math.floor(r / this.BLOCK_SIZE));
+            if (!block) {
+                html.push(`<tr style="height: ${this.ROW_HEIGHT}px;"><td colspan="${colCount}" class="text-muted small">...</td></tr>`);
+                continue;
+            }
+            const i = r - block.row_offset;
+            const rows = block.rows;
+            const cells = block.quantities[i].map((qty) =>
+                `<td class="${qty === 0 ? 'bg-light text-muted opacity-25' : (qty < 0 ? 'fw-bold text-danger' : 'fw-bold')}">${qty !== 0 ? qty : '-'}</td>`
+            ).join('');
+
+            html.push(
+                `<tr style="height: ${this.ROW_HEIGHT}px;">`
+                + `<td class="fw-bold sticky-col border-end text-start ps-2" style="left: 0;">${this.escape(rows.product_number[i])}</td>`
+                + `<td class="text-start text-truncate sticky-col second-col border-end ps-2" style="max-width: 140px;" title="${this.escape(rows.product_name[i])}">${this.escape(rows.product_name[i])}</td>`
+                + `<td>${this.escape(rows.color[i])}</td>`
+                + `<td>${this.escape(rows.size[i])}</td>`
+                + cells
+                + `<td class="fw-bold bg-light border-start">${rows.total[i]}</td>`
+                + `</tr>`
+            );
+        }
+
+        html.push(`<tr style="height: ${(this.totalRows - last) * this.ROW_HEIGHT}px;"><td colspan="${colCount}" class="p-0 border-0"></td></tr>`);
+        this.dom.body.innerHTML = html.join('');
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    if (document.querySelector('.stock-overview-container')) new StockOverviewGrid();
+});
@@ -12,6 +12,8 @@ class StoreOrderApp {
 
         this.dom = {
             openBtn: this.container.querySelector('.btn-open-modal'),
+            uploadBtn: this.container.querySelector('.btn-upload-sheet'),
+            sheetInput: this.container.querySelector('#order-sheet-file'),
             dateInput: pageLayer.querySelector('#req-date'),
             reqPnInput: pageLayer.querySelector('#req-pn'),
             searchBtn: pageLayer.querySelector('#btn-search-prod'),
@@ -38,6 +40,11 @@ class StoreOrderApp {
             });
         }
 
+        if (this.dom.uploadBtn && this.dom.sheetInput) {
+            this.dom.uploadBtn.addEventListener('click', () => this.dom.sheetInput.click());
+            this.dom.sheetInput.addEventListener('change', () => this.uploadOrderSheet());
+        }
+
         if (this.dom.searchBtn) {
             this.dom.searchBtn.addEventListener('click', (e) => {
                 e.preventDefault();
@@ -174,6 +181,41 @@ class StoreOrderApp {
         } catch(e) { Flowork.toast('통신 오류', 'danger'); }
     }
 
+    async uploadOrderSheet() {
+        const file = this.dom.sheetInput.files[0];
+        const url = document.body.dataset.apiUpload;
+        if (!file || !url) return;
+
+        const formData = new FormData();
+        formData.append('excel_file', file);
+        if (this.dom.dateInput) formData.append('date', this.dom.dateInput.value);
+
+        try {
+            const res = await fetch(url, {
+                method: 'POST',
+                headers: { 'X-CSRFToken': this.csrfToken },
+                body: formData
+            });
+            const data = await res.json();
+            if (data.status === 'success') {
+                let msg = data.message;
+                if (data.unknown_barcodes && data.unknown_barcodes.length) {
+                    msg += `\n\n등록되지 않은 바코드:\n${data.unknown_barcodes.slice(0, 30).join('\n')}`;
+                    alert(msg);
+                } else {
+                    Flowork.toast(msg, 'success');
+                }
+                setTimeout(() => window.location.reload(), 1000);
+            } else {
+                Flowork.toast(data.message, 'danger');
+            }
+        } catch(e) {
+            Flowork.toast('통신 오류', 'danger');
+        } finally {
+            this.dom.sheetInput.value = '';
+        }
+    }
+
     async updateStatus(id, status, qty) {
         const urlPrefix = document.body.dataset.apiStatusPrefix;
         if (!urlPrefix) return;
@@ -70,16 +70,32 @@ def generate_barcode(row_data, brand_settings=None):
         print(f"Error generating barcode for {row_data}: {e}")
         return None
 
+def size_sort_value(size, custom_order_map=None):
+    """사이즈 정렬 키 (브랜드 SIZE_SORT_ORDER 우선, 그다음 숫자 / XS~XXXL / 문자열 순)"""
+    size_str = str(size).upper().strip()
+    if custom_order_map and size_str in custom_order_map:
+        return (0, custom_order_map[size_str], '')
+
+    custom_order = {'2XS': 'XXS', '2XL': 'XXL', '3XL': 'XXXL'}
+    size_str = custom_order.get(size_str, size_str)
+    order_map = {'XXS': 0, 'XS': 1, 'S': 2, 'M': 3, 'L': 4, 'XL': 5, 'XXL': 6, 'XXXL': 7}
+
+    if size_str.isdigit():
+        return (1, int(size_str), '')
+    elif size_str in order_map:
+        return (2, order_map[size_str], '')
+    return (3, 0, size_str)
+
 def get_sort_key(variant, brand_settings=None):
     product_number = ''
     if variant.product:
         product_number = variant.product.product_number
         
     color = variant.color or ''
-    size_str = str(variant.size).upper().strip()
     
-    custom_order_map = None
-    if brand_settings:
+    # BrandSettings 객체는 정렬 맵을 미리 파싱해 두므로 variant마다 json.loads 하지 않음
+    custom_order_map = getattr(brand_settings, 'size_order_map', None)
+    if custom_order_map is None and brand_settings:
         size_order_json = brand_settings.get('SIZE_SORT_ORDER')
         if size_order_json:
             try:
@@ -88,18 +104,4 @@ def get_sort_key(variant, brand_settings=None):
             except json.JSONDecodeError:
                 pass
 
-    if custom_order_map and size_str in custom_order_map:
-        sort_val = (0, custom_order_map[size_str], '')
-    else:
-        custom_order = {'2XS': 'XXS', '2XL': 'XXL', '3XL': 'XXXL'}
-        size_str = custom_order.get(size_str, size_str)
-        order_map = {'XXS': 0, 'XS': 1, 'S': 2, 'M': 3, 'L': 4, 'XL': 5, 'XXL': 6, 'XXXL': 7}
-        
-        if size_str.isdigit(): 
-            sort_val = (1, int(size_str), '')
-        elif size_str in order_map: 
-            sort_val = (2, order_map[size_str], '')
-        else: 
-            sort_val = (3, 0, size_str)
-            
-    return (product_number, color, sort_val)
\ No newline at end of file
+    return (product_number, color, size_sort_value(variant.size, custom_order_map))
\ No newline at end of file
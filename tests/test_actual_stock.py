@@ -0,0 +1,92 @@
+from flowork.extensions import db
+from flowork.models import Variant, StoreStock, StockHistory
+from flowork.constants import StockChangeType
+from flowork.services.inventory_service import InventoryService
+from flowork.services.sales_service import SalesService
+from flowork.services.stock_totals import get_variant_totals
+
+def test_set_actual_stock_upserts_and_reports_unknown(app, setup_data):
+    store_id = setup_data['store'].id
+    brand_id = setup_data['brand'].id
+
+    # 재고 행이 없는 옵션
+    other = Variant(product_id=setup_data['product'].id, barcode="987654321", barcode_cleaned="987654321",
+                    color="WHT", size="M", sale_price=10000)
+    db.session.add(other)
+    setup_data['variant'].barcode_cleaned = "123456789"
+    db.session.commit()
+
+    updated, unknown = InventoryService.set_actual_stock(store_id, brand_id, {
+        '123456789': 7,
+        '987654321': 3,
+        'NOPE0001': 1
+    })
+
+    assert updated == 2
+    assert unknown == ['NOPE0001']
+
+    existing = StoreStock.query.filter_by(store_id=store_id, variant_id=setup_data['variant'].id).one()
+    assert existing.quantity == 10
+    assert existing.actual_stock == 7
+    assert existing.stock_diff == 3
+
+    created = StoreStock.query.filter_by(store_id=store_id, variant_id=other.id).one()
+    assert created.quantity == 0
+    assert created.actual_stock == 3
+    assert created.stock_diff == -3
+
+
+def test_apply_actual_stock_adjusts_quantity_and_logs_history(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+    setup_data['product'].item_category = '신발'
+    stock = setup_data['stock']
+    stock.actual_stock = 6
+    db.session.commit()
+
+    report = InventoryService.apply_actual_stock(store_id, setup_data['user'].id)
+
+    assert report['total'] == {'skus': 1, 'plus': 0, 'minus': 4, 'net': -4}
+    assert report['by_category']['신발']['net'] == -4
+
+    stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).one()
+    assert stock.quantity == 6
+    assert stock.stock_diff == 4
+    assert stock.actual_stock is None
+    assert stock.last_check_date is not None
+
+    history = StockHistory.query.filter_by(change_type=StockChangeType.CHECK_ADJUST).one()
+    assert history.quantity_change == -4
+    assert history.current_quantity == 6
+    # setup 데이터는 합계 테이블 없이 생성되어 증감분만 남음
+    assert get_variant_totals([variant_id])[variant_id] == -4
+
+    # 반영 후 판매가 있어도 재실행(작업 재시도)이 옛 실사값으로 되돌리지 않음
+    stock.quantity = 5
+    db.session.commit()
+    assert InventoryService.apply_actual_stock(store_id)['total']['skus'] == 0
+    assert StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).one().quantity == 5
+    assert StockHistory.query.filter_by(change_type=StockChangeType.CHECK_ADJUST).count() == 1
+
+def test_apply_actual_stock_after_sale_since_count_keeps_ledger_consistent(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+    setup_data['variant'].barcode_cleaned = '123456789'
+    db.session.commit()
+
+    # 실사 시점에는 차이 없음 (10 = 10), 반영 전에 판매 2개
+    InventoryService.set_actual_stock(store_id, setup_data['brand'].id, {'123456789': 10})
+    SalesService.create_sale(store_id, None, None, [{'variant_id': variant_id, 'quantity': 2}], '카드', False)
+
+    report = InventoryService.apply_actual_stock(store_id)
+    assert report['total'] == {'skus': 1, 'plus': 2, 'minus': 0, 'net': 2}
+
+    stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).one()
+    assert (stock.quantity, stock.stock_diff, stock.actual_stock) == (10, -2, None)
+
+    # 판매(-2)와 실사 조정(+2) 이력이 모두 남아 이력/합계 테이블이 재고와 일치
+    history = StockHistory.query.filter_by(store_id=store_id, variant_id=variant_id).order_by(StockHistory.id).all()
+    assert [(h.change_type, h.quantity_change, h.current_quantity) for h in history][-1] == \
+        (StockChangeType.CHECK_ADJUST, 2, 10)
+    assert sum(h.quantity_change for h in history) == 0
+    assert get_variant_totals([variant_id])[variant_id] == 0
@@ -0,0 +1,131 @@
+from datetime import date
+import numpy as np
+from flowork.extensions import db
+from flowork.models import Product, Variant, StoreStock
+from flowork.services.sales_service import SalesService
+from flowork.services.analytics import AnalyticsService, classify_abc, invalidate_analytics_cache, build_size_color_matrix
+
+def _add_variant(setup_data, number, price):
+    product = Product(product_number=number, product_name=f'상품{number}', brand_id=setup_data['brand'].id,
+                      item_category='아우터')
+    db.session.add(product)
+    db.session.flush()
+    variant = Variant(product_id=product.id, color='BK', size='M', sale_price=price, original_price=price)
+    db.session.add(variant)
+    db.session.flush()
+    db.session.add(StoreStock(store_id=setup_data['store'].id, variant_id=variant.id, quantity=6))
+    db.session.commit()
+    return variant
+
+def test_classify_abc_uses_preceding_cumulative_share():
+    classes = classify_abc(np.array([10, 50, 30, 5, 5]))
+    # 누적 비중(앞선 항목): 50 -> 0, 30 -> .5, 10 -> .8, 5 -> .9, 5 -> .95
+    assert classes.tolist() == ['B', 'A', 'A', 'B', 'C']
+    assert classify_abc(np.array([0, 0])).tolist() == ['C', 'C']
+
+def test_analytics_from_rollup(app, setup_data):
+    store_id = setup_data['store'].id
+    user_id = setup_data['user'].id
+    base = setup_data['variant']
+    other = _add_variant(setup_data, 'P200', 50000)
+
+    SalesService.create_sale(store_id, user_id, '2024-06-01', [{'variant_id': base.id, 'quantity': 4}], '카드', False)
+    SalesService.create_sale(store_id, user_id, '2024-06-02', [{'variant_id': other.id, 'quantity': 2}], '카드', False)
+    start, end = date(2024, 6, 1), date(2024, 6, 30)
+    brand_id = setup_data['brand'].id
+
+    top = AnalyticsService.top_sellers(brand_id, start, end, dimension='product', metric='net_amount')
+    assert [(t['product_number'], t['rank'], t['net_amount']) for t in top] == [('P200', 1, 100000), (base.product.product_number, 2, 40000)]
+    assert round(top[0]['share'], 2) == 0.71
+
+    by_qty = AnalyticsService.top_sellers(brand_id, start, end, dimension='variant', metric='quantity', limit=1)
+    assert [t['variant_id'] for t in by_qty] == [base.id]
+
+    sell_through = AnalyticsService.sell_through(brand_id, start, end, store_id=store_id, dimension='variant')
+    # 판매 후 재고: 기본 옵션 10-4=6, 추가 옵션 6-2=4
+    assert sell_through['total'] == {'sold': 6, 'stock': 10, 'sell_through': 0.375}
+    assert [(i['variant_id'], i['sell_through']) for i in sell_through['items']] == [(base.id, 0.4), (other.id, 0.3333)]
+
+    abc = AnalyticsService.abc_classification(brand_id, start, end, a_share=0.7)
+    assert abc['variant_id'] == [other.id, base.id]
+    assert abc['class'] == ['A', 'B']
+    assert abc['summary']['A'] == {'skus': 1, 'value': 100000, 'share': 0.7143}
+
+def test_analytics_results_cached_until_day_close(app, setup_data):
+    store_id = setup_data['store'].id
+    brand_id = setup_data['brand'].id
+    variant_id = setup_data['variant'].id
+    day = date(2024, 6, 1)
+
+    SalesService.create_sale(store_id, None, '2024-06-01', [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+    first = AnalyticsService.top_sellers(brand_id, day, day)
+    SalesService.create_sale(store_id, None, '2024-06-01', [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+
+    assert AnalyticsService.top_sellers(brand_id, day, day) == first
+    invalidate_analytics_cache()
+    assert AnalyticsService.top_sellers(brand_id, day, day)[0]['quantity'] == 2
+
+def test_open_period_and_live_stock_not_held_until_day_close(app, setup_data):
+    store_id = setup_data['store'].id
+    brand_id = setup_data['brand'].id
+    variant_id = setup_data['variant'].id
+    today, closed = date.today(), date(2024, 6, 1)
+    app.config['ANALYTICS_LIVE_CACHE_TIMEOUT'] = 0
+
+    SalesService.create_sale(store_id, None, None, [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+    assert AnalyticsService.top_sellers(brand_id, today, today)[0]['quantity'] == 1
+    SalesService.create_sale(store_id, None, None, [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+    assert AnalyticsService.top_sellers(brand_id, today, today)[0]['quantity'] == 2
+
+    # 마감된 기간이라도 판매율은 현재 재고를 읽으므로 재고 변동 반영
+    SalesService.create_sale(store_id, None, '2024-06-01', [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+    before = AnalyticsService.sell_through(brand_id, closed, closed, dimension='variant')
+    StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).one().quantity = 1
+    db.session.commit()
+    after = AnalyticsService.sell_through(brand_id, closed, closed, dimension='variant')
+    assert (before['total']['stock'], after['total']['stock']) == (7, 1)
+
+def test_analytics_endpoint_scopes_store_user(client, setup_data):
+    user = setup_data['user']
+    user.is_active = True
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+
+    res = client.get('/api/analytics/top_sellers?dimension=store&start_date=2024-06-01&end_date=2024-06-30')
+    assert res.status_code == 200
+    assert res.get_json()['store_id'] == setup_data['store'].id
+
+    assert client.get('/api/analytics/abc?a=0.9&b=0.5').status_code == 400
+    assert client.get('/api/analytics/sell_through?dimension=color').status_code == 400
+
+def test_size_color_matrix(app, setup_data):
+    store_id = setup_data['store'].id
+    product = setup_data['variant'].product
+    variants = {('BK', 'M'): setup_data['variant']}
+    for color, size in (('BK', 'S'), ('WH', 'S'), ('WH', 'L')):
+        variant = Variant(product_id=product.id, color=color, size=size, sale_price=10000, original_price=10000)
+        db.session.add(variant)
+        db.session.flush()
+        variants[(color, size)] = variant
+    db.session.add(StoreStock(store_id=store_id, variant_id=variants[('WH', 'L')].id, quantity=3))
+    db.session.commit()
+    setup_data['variant'].color = 'BK'
+    setup_data['variant'].size = 'M'
+    db.session.commit()
+
+    SalesService.create_sale(store_id, None, '2024-06-01', [
+        {'variant_id': variants[('BK', 'M')].id, 'quantity': 2},
+        {'variant_id': variants[('WH', 'L')].id, 'quantity': 1}
+    ], '카드', False)
+
+    matrix = build_size_color_matrix(product.id, date(2024, 6, 1), date(2024, 6, 30), store_id,
+                                     size_order_map={'L': 0, 'M': 1, 'S': 2})
+
+    assert matrix['colors'] == ['BK', 'WH']
+    assert matrix['sizes'] == ['L', 'M', 'S']
+    assert matrix['sold'] == [[0, 2, 0], [1, 0, 0]]
+    assert matrix['stock'] == [[0, 8, 0], [2, 0, 0]]
+    assert matrix['color_totals'] == {'sold': [2, 1], 'stock': [8, 2]}
+    assert matrix['size_totals'] == {'sold': [1, 2, 0], 'stock': [2, 8, 0]}
+    assert matrix['total'] == {'sold': 3, 'stock': 10, 'sell_through': 0.2308}
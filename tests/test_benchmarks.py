@@ -0,0 +1,49 @@
+import numpy as np
+from benchmarks.datagen import generate_dataset
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.runner import run_scenario, compare_reports
+from benchmarks.loadtest import prepare_load_context, run_load, ClientTransport, classify
+
+TINY_SPEC = {
+    'stores': 2, 'products': 6, 'colors_per_product': 2, 'stock_ratio': 0.5,
+    'days': 3, 'sales_per_store_day': 3, 'max_items_per_sale': 2, 'import_products': 3
+}
+
+def test_benchmark_scenarios_smoke(app, client):
+    dataset = generate_dataset(TINY_SPEC, seed=1)
+    assert dataset['counts']['variants'] == 6 * 2 * 6
+    assert dataset['counts']['sale_items'] > 0
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(dataset['user_id'])
+        sess['_fresh'] = True
+    ctx = {**dataset, 'client': client, 'rng': np.random.default_rng(1), 'import_products': 3}
+
+    results = {name: run_scenario(factory, ctx, iterations=2, warmup=0) for name, factory in SCENARIOS.items()}
+    for name, result in results.items():
+        assert result['iterations'] == 2
+        assert result['queries']['mean'] > 0, name
+        assert result['latency_ms']['p50'] <= result['latency_ms']['max']
+
+    report = {'meta': {}, 'scenarios': results}
+    assert len(compare_reports(report, report)) == len(results) + 2
+
+def test_loadtest_single_cashier_is_consistent(app):
+    dataset = generate_dataset(TINY_SPEC, seed=2)
+    ctx = prepare_load_context(dataset, {'sale': 6, 'refund': 2, 'transfer': 2}, hot_skus=5, seed=2)
+
+    summary = run_load(ctx, lambda: ClientTransport(app, ctx['store_users']), cashiers=1, duration=60, max_ops=30)
+
+    actions = summary['actions']
+    assert actions['sale']['ok'] > 0
+    assert summary['sales_created'] == actions['sale']['ok']
+    assert summary['deadlocks'] == summary['lock_timeouts'] == summary['errors'] == 0
+    assert summary['consistency']['ok'], summary['consistency']
+    assert sum(actions['sale']['histogram'].values()) == actions['sale']['ok']
+
+def test_loadtest_classify():
+    assert classify(500, {'status': 'error', 'message': '판매 등록 중 오류 발생: deadlock detected'}) == 'deadlock'
+    assert classify(500, {'status': 'error', 'message': 'canceling statement due to lock timeout'}) == 'lock_timeout'
+    assert classify(400, {'status': 'error', 'message': '재고가 부족합니다.'}) == 'rejected'
+    assert classify(200, {'status': 'success'}) == 'ok'
+    assert classify(500, {'status': 'error', 'message': 'boom'}) == 'error'
@@ -0,0 +1,32 @@
+from flowork.extensions import db
+from flowork.models import Setting
+from flowork.services.brand_settings import get_brand_settings, invalidate_brand_settings
+
+def test_brand_settings_parsed_and_cached(app, setup_data):
+    brand_id = setup_data['brand'].id
+    db.session.add(Setting(brand_id=brand_id, key='SIZE_SORT_ORDER', value='["S", "M", "L"]'))
+    db.session.add(Setting(brand_id=brand_id, key='IMAGE_URL_PREFIX', value='https://img.test/'))
+    db.session.commit()
+    invalidate_brand_settings(brand_id)
+
+    settings = get_brand_settings(brand_id)
+    assert settings.image_url_prefix == 'https://img.test/'
+    assert settings.size_sort_order == ['S', 'M', 'L']
+    assert settings.size_order_map['L'] == 2
+    # 기존 dict 기반 코드 호환 (원본 문자열)
+    assert settings.get('SIZE_SORT_ORDER') == '["S", "M", "L"]'
+
+    # 캐시된 객체 재사용
+    assert get_brand_settings(brand_id) is settings
+
+def test_brand_settings_invalidated_on_write(app, setup_data):
+    brand_id = setup_data['brand'].id
+    invalidate_brand_settings(brand_id)
+    settings = get_brand_settings(brand_id)
+    assert settings.barcode_format is None
+
+    db.session.add(Setting(brand_id=brand_id, key='BARCODE_FORMAT', value='{pn_final}{color}{size_final}'))
+    db.session.commit()
+    invalidate_brand_settings(brand_id)
+
+    assert get_brand_settings(brand_id).barcode_format == '{pn_final}{color}{size_final}'
@@ -0,0 +1,109 @@
+import pytest
+from flowork.extensions import db
+from flowork.models import StoreStock
+from flowork.services.inventory_service import InventoryService
+from flowork.services.count_session import CountSessionService, CountSessionError, STATUS_OPEN, STATUS_FLUSHING
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa', reason='Lua 스크립트 실행에 fakeredis[lua] 필요')
+
+@pytest.fixture
+def fake_redis(app):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    app.extensions['count_session_redis'] = client
+    return client
+
+@pytest.fixture
+def count_data(setup_data):
+    setup_data['variant'].barcode_cleaned = '123456789'
+    db.session.commit()
+    return setup_data
+
+def _stock(data):
+    return StoreStock.query.filter_by(store_id=data['store'].id, variant_id=data['variant'].id).one()
+
+def test_devices_join_one_session_and_scans_merge(fake_redis, count_data):
+    store, brand = count_data['store'], count_data['brand']
+
+    session_id, created = CountSessionService.start_session(store.id, brand.id, count_data['user'].id)
+    joined_id, joined_created = CountSessionService.start_session(store.id, brand.id, None)
+    assert created and not joined_created
+    assert joined_id == session_id
+
+    CountSessionService.record_scans(session_id, [{'barcode': '123456789'}, {'barcode': '123456789', 'quantity': 2}], 'pda-1')
+    total = CountSessionService.record_scans(session_id, [{'barcode': '123-456-789', 'quantity': 4},
+                                                         {'barcode': 'NOPE', 'quantity': 1}], 'pda-2')
+    # 정정(음수) 스캔
+    total = CountSessionService.record_scans(session_id, [{'barcode': '123456789', 'quantity': -1}], 'pda-1')
+    assert total == 7
+
+    progress = CountSessionService.get_progress(session_id)
+    assert progress['status'] == STATUS_OPEN
+    assert progress['sku_count'] == 2
+    assert progress['devices'] == {'pda-1': 2, 'pda-2': 5}
+
+    with pytest.raises(CountSessionError):
+        CountSessionService.record_scans(session_id, [{'barcode': '123456789', 'quantity': 'x'}])
+
+def test_flush_applies_counts_and_rejects_later_scans(fake_redis, count_data):
+    store, brand = count_data['store'], count_data['brand']
+    session_id, _ = CountSessionService.start_session(store.id, brand.id, None)
+    CountSessionService.record_scans(session_id, [{'barcode': '123456789', 'quantity': 6}, {'barcode': 'NOPE'}])
+
+    updated, unknown = CountSessionService.flush_session(session_id)
+    assert (updated, unknown) == (1, ['NOPE'])
+    stock = _stock(count_data)
+    assert (stock.actual_stock, stock.stock_diff) == (6, 4)
+
+    # 마감 후 키가 모두 삭제되어 스캔/재마감 거부, 새 실사는 새 세션
+    assert fake_redis.keys('count_session:*') == []
+    with pytest.raises(CountSessionError):
+        CountSessionService.record_scans(session_id, [{'barcode': '123456789'}])
+    with pytest.raises(CountSessionError):
+        CountSessionService.flush_session(session_id)
+    assert CountSessionService.start_session(store.id, brand.id, None)[0] != session_id
+
+def test_flush_failure_reopens_session(fake_redis, count_data, monkeypatch):
+    store, brand = count_data['store'], count_data['brand']
+    session_id, _ = CountSessionService.start_session(store.id, brand.id, None)
+    CountSessionService.record_scans(session_id, [{'barcode': '123456789', 'quantity': 3}])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('db down')
+    monkeypatch.setattr(InventoryService, 'set_actual_stock', staticmethod(fail))
+
+    with pytest.raises(RuntimeError):
+        CountSessionService.flush_session(session_id)
+    assert CountSessionService.get_progress(session_id)['status'] == STATUS_OPEN
+    assert CountSessionService.record_scans(session_id, [{'barcode': '123456789'}]) == 4
+
+def test_count_session_endpoints(client, fake_redis, count_data):
+    user = count_data['user']
+    user.is_active = True
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+
+    res = client.post('/api/count_sessions', json={})
+    assert res.status_code == 200
+    session_id = res.get_json()['session_id']
+    assert client.post('/api/count_sessions', json={}).get_json()['created'] is False
+
+    res = client.post(f'/api/count_sessions/{session_id}/scans',
+                      json={'device_id': 'pda-1', 'scans': [{'barcode': '123456789', 'quantity': 8}]})
+    assert res.get_json()['total_units'] == 8
+    progress = client.get(f'/api/count_sessions/{session_id}').get_json()['progress']
+    assert (progress['sku_count'], progress['devices']) == (1, {'pda-1': 8})
+
+    # 마감 진행 중에는 스캔 거부
+    fake_redis.hset(f'count_session:{session_id}:meta', 'status', STATUS_FLUSHING)
+    assert client.post(f'/api/count_sessions/{session_id}/scans', json={'scans': [{'barcode': '123456789'}]}).status_code == 409
+    fake_redis.hset(f'count_session:{session_id}:meta', 'status', STATUS_OPEN)
+
+    res = client.post(f'/api/count_sessions/{session_id}/flush')
+    assert res.status_code == 200
+    assert res.get_json()['updated'] == 1
+    assert _stock(count_data).actual_stock == 8
+
+    assert client.post(f'/api/count_sessions/{session_id}/scans', json={'scans': [{'barcode': '123456789'}]}).status_code == 404
+    assert client.get('/api/count_sessions/unknown').status_code == 404
@@ -0,0 +1,50 @@
+from datetime import date
+import numpy as np
+from flowork.extensions import db
+from flowork.models import Store, Sale, SaleItem, StockTransfer, TransferDocument
+from flowork.constants import TransferStatus
+from flowork.services.sales_rollup import rebuild_sales_rollup
+from flowork.services.rebalance import match_transfers, suggest_rebalance
+from flowork.services.transfer_service import TransferService
+
+def test_match_transfers_is_greedy_and_bounded():
+    surplus = np.array([[5, 0, 0], [0, 0, 0], [2, 3, 0]])
+    deficit = np.array([[0, 2, 4], [1, 0, 0], [0, 0, 4]])
+
+    rows, src, dst, qty = match_transfers(surplus, deficit)
+    moves = sorted(zip(rows.tolist(), src.tolist(), dst.tolist(), qty.tolist()))
+
+    # 행 0: 과잉 5 -> 부족이 큰 매장(4) 먼저, 남은 1 은 다음 매장 / 행 1: 공급 없음 / 행 2: 큰 과잉(3) 부터
+    assert moves == [(0, 0, 1, 1), (0, 0, 2, 4), (2, 0, 2, 1), (2, 1, 2, 3)]
+
+def test_suggest_rebalance_creates_draft_document(app, setup_data):
+    brand_id = setup_data['brand'].id
+    variant = setup_data['variant']
+    source = setup_data['store']
+    target = Store(store_name='SellingStore', brand_id=brand_id)
+    db.session.add(target)
+    db.session.flush()
+
+    # 판매 매장: 최근 28일 14개 판매, 재고 없음 -> 목표 14일분 = 7개 부족
+    sale = Sale(store_id=target.id, sale_date=date.today(), daily_number=1, receipt_number='R-1', status='valid')
+    db.session.add(sale)
+    db.session.flush()
+    db.session.add(SaleItem(sale_id=sale.id, variant_id=variant.id, quantity=14, unit_price=0, subtotal=0))
+    db.session.flush()
+    rebuild_sales_rollup()
+    db.session.commit()
+
+    suggestions, summary = suggest_rebalance(brand_id, days=28, target_days=14)
+
+    # 판매 없는 매장 재고 10개 중 1개는 남기고 이동
+    assert suggestions == [(source.id, target.id, variant.id, 7)]
+    assert summary['suggested_units'] == 7
+
+    result = TransferService.create_document(brand_id, None, suggestions, status=TransferStatus.DRAFT)
+    doc_id = result['document_id']
+    assert StockTransfer.query.filter_by(document_id=doc_id, status=TransferStatus.DRAFT).count() == 1
+
+    assert TransferService.confirm_document(doc_id, brand_id)['status'] == 'success'
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.REQUESTED
+    assert StockTransfer.query.filter_by(document_id=doc_id, status=TransferStatus.REQUESTED).count() == 1
+    assert TransferService.discard_draft_documents(brand_id) == 0
@@ -0,0 +1,55 @@
+from flowork.extensions import db
+from flowork.services.sales_service import SalesService
+from flowork.models import Sale, SaleItem, StoreStock, StockHistory
+
+def _stock(store_id, variant_id):
+    return StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).first().quantity
+
+def test_bulk_sales_are_idempotent(app, setup_data):
+    store_id = setup_data['store'].id
+    user_id = setup_data['user'].id
+    variant_id = setup_data['variant'].id
+
+    sales = [
+        {'idempotency_key': 'pos1-0001', 'sale_date': '2023-01-01', 'items': [{'variant_id': variant_id, 'quantity': 2}]},
+        {'idempotency_key': 'pos1-0002', 'sale_date': '2023-01-01', 'items': [{'variant_id': variant_id, 'quantity': 1, 'discount_amount': 1000}]},
+        {'idempotency_key': 'pos1-0002', 'sale_date': '2023-01-01', 'items': [{'variant_id': variant_id, 'quantity': 1}]},
+        {'idempotency_key': 'pos1-0003', 'sale_date': '2023-01-01', 'items': [{'variant_id': 999999, 'quantity': 1}]},
+        {'sale_date': '2023-01-01', 'items': [{'variant_id': variant_id, 'quantity': 1}]},
+    ]
+
+    results = SalesService.create_sales_bulk(store_id, user_id, sales, chunk_size=2)
+
+    assert [r['status'] for r in results] == ['created', 'created', 'duplicate', 'error', 'error']
+    assert results[2]['sale_id'] == results[1]['sale_id']
+    assert results[0]['receipt_number'] == f'20230101-{store_id}-0001'
+    assert results[1]['receipt_number'] == f'20230101-{store_id}-0002'
+
+    assert _stock(store_id, variant_id) == 7
+    assert StockHistory.query.count() == 2
+    assert db.session.get(Sale, results[1]['sale_id']).total_amount == 9000
+
+    # 재전송: 새로 등록되지 않고 기존 판매를 돌려줌
+    retry = SalesService.create_sales_bulk(store_id, user_id, sales[:2])
+    assert [r['status'] for r in retry] == ['duplicate', 'duplicate']
+    assert retry[0]['sale_id'] == results[0]['sale_id']
+    assert Sale.query.count() == 2
+    assert SaleItem.query.count() == 2
+    assert _stock(store_id, variant_id) == 7
+
+def test_bulk_sales_endpoint(client, setup_data):
+    user = setup_data['user']
+    user.is_active = True
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+
+    payload = {'sales': [
+        {'idempotency_key': 'web-1', 'items': [{'variant_id': setup_data['variant'].id, 'quantity': 1}]}
+    ]}
+    res = client.post('/api/sales/bulk', json=payload)
+    assert res.status_code == 200
+    assert res.get_json()['counts'] == {'created': 1, 'duplicate': 0, 'error': 0}
+
+    res = client.post('/api/sales/bulk', json=payload)
+    assert res.get_json()['counts'] == {'created': 0, 'duplicate': 1, 'error': 0}
@@ -0,0 +1,47 @@
+from datetime import date
+from flowork.extensions import db
+from flowork.models import SalesDailyRollup, SalesDailyStoreRollup
+from flowork.services.sales_service import SalesService
+from flowork.services.sales_rollup import get_sales_summary, rebuild_sales_rollup
+
+def _rollup_snapshot():
+    lines = sorted(
+        (r.store_id, r.sale_date, r.variant_id, r.quantity, r.gross_amount, r.discount_amount, r.net_amount)
+        for r in SalesDailyRollup.query.all()
+    )
+    counts = sorted((r.store_id, r.sale_date, r.sale_count) for r in SalesDailyStoreRollup.query.all())
+    return lines, counts
+
+def test_rollup_follows_sales_and_refunds(app, setup_data):
+    store_id = setup_data['store'].id
+    user_id = setup_data['user'].id
+    variant_id = setup_data['variant'].id
+    day = date(2024, 5, 1)
+
+    first = SalesService.create_sale(store_id, user_id, '2024-05-01',
+                                     [{'variant_id': variant_id, 'quantity': 3, 'discount_amount': 1000}], '카드', False)
+    second = SalesService.create_sale(store_id, user_id, '2024-05-01',
+                                      [{'variant_id': variant_id, 'quantity': 1}], '카드', False)
+    SalesService.create_sales_bulk(store_id, user_id, [
+        {'idempotency_key': 'k1', 'sale_date': '2024-05-02', 'items': [{'variant_id': variant_id, 'quantity': 2}]}
+    ])
+
+    summary = get_sales_summary(day, day, [store_id])
+    assert summary == {'total_amount': 37000, 'total_discount': 3000, 'total_gross': 40000,
+                       'total_quantity': 4, 'total_count': 2}
+
+    # 부분 환불 1개 -> 수량/금액만 감소, 전체 환불 -> 건수까지 감소
+    SalesService.refund_sale_partial(first['sale_id'], store_id, user_id, [{'variant_id': variant_id, 'quantity': 1}])
+    SalesService.refund_sale_full(second['sale_id'], store_id, user_id)
+
+    summary = get_sales_summary(day, date(2024, 5, 2), [store_id])
+    assert summary == {'total_amount': 38000, 'total_discount': 2000, 'total_gross': 40000,
+                       'total_quantity': 4, 'total_count': 2}
+
+    # 재계산 결과는 증분 갱신과 같아야 함 (0 으로 남은 행 제외)
+    incremental = _rollup_snapshot()
+    rebuild_sales_rollup()
+    db.session.commit()
+    rebuilt = _rollup_snapshot()
+    assert rebuilt[1] == incremental[1]
+    assert rebuilt[0] == [row for row in incremental[0] if any(row[3:])]
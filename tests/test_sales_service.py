@@ -1,6 +1,8 @@
+from datetime import date
+from flowork.extensions import db
 from flowork.services.sales_service import SalesService
 from flowork.constants import SaleStatus, PaymentMethod
-from flowork.models import Sale, StoreStock, StockHistory
+from flowork.models import Sale, StoreStock, StockHistory, ReceiptCounter, Variant
 
 def test_create_sale(app, setup_data):
     store_id = setup_data['store'].id
@@ -55,4 +57,59 @@ def test_refund_sale_full(app, setup_data):
     
     # 상태 변경 확인
     sale = Sale.query.get(sale_id)
-    assert sale.status == SaleStatus.REFUNDED
\ No newline at end of file
+    assert sale.status == SaleStatus.REFUNDED
+
+def test_create_sale_unknown_variant_rolls_back(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+
+    items = [
+        {'variant_id': variant_id, 'quantity': 1},
+        {'variant_id': 999999, 'quantity': 1}
+    ]
+    result = SalesService.create_sale(store_id, setup_data['user'].id, '2023-01-01', items, PaymentMethod.CARD, False)
+
+    assert result['status'] == 'error'
+    assert Sale.query.count() == 0
+    assert StockHistory.query.count() == 0
+    stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).first()
+    assert stock.quantity == 10
+
+
+def test_receipt_numbers_are_sequential_per_store_and_date(app, setup_data):
+    store_id = setup_data['store'].id
+    user_id = setup_data['user'].id
+    items = [{'variant_id': setup_data['variant'].id, 'quantity': 1}]
+
+    # 카운터 도입 전 판매가 있으면 그 다음 번호부터 발급
+    db.session.add(Sale(store_id=store_id, sale_date=date(2023, 1, 1), daily_number=7,
+                        receipt_number=f'20230101-{store_id}-0007', total_amount=0))
+    db.session.commit()
+
+    first = SalesService.create_sale(store_id, user_id, '2023-01-01', items, PaymentMethod.CARD, False)
+    second = SalesService.create_sale(store_id, user_id, '2023-01-01', items, PaymentMethod.CARD, False)
+    other_day = SalesService.create_sale(store_id, user_id, '2023-01-02', items, PaymentMethod.CARD, False)
+
+    assert db.session.get(Sale, first['sale_id']).receipt_number == f'20230101-{store_id}-0008'
+    assert db.session.get(Sale, second['sale_id']).receipt_number == f'20230101-{store_id}-0009'
+    assert db.session.get(Sale, other_day['sale_id']).receipt_number == f'20230102-{store_id}-0001'
+    assert db.session.get(ReceiptCounter, (store_id, date(2023, 1, 1))).last_number == 9
+
+def test_search_products_list_sums_store_stock_per_color(client, setup_data):
+    user = setup_data['user']
+    user.is_active = True
+    product = setup_data['product']
+    product.product_number_cleaned = 'TEST001'
+    other = Variant(product_id=product.id, barcode='987654321', color='BLK', size='M', sale_price=10000)
+    white = Variant(product_id=product.id, barcode='555555555', color='WHT', size='L', sale_price=10000)
+    db.session.add_all([other, white])
+    db.session.flush()
+    db.session.add(StoreStock(store_id=setup_data['store'].id, variant_id=other.id, quantity=3))
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+
+    res = client.post('/api/sales/search_products', json={'query': 'TEST', 'mode': 'sales'})
+    body = res.get_json()
+    assert body['match_type'] == 'list'
+    assert {r['color']: r['stat_qty'] for r in body['results']} == {'BLK': 13, 'WHT': 0}
@@ -0,0 +1,109 @@
+from sqlalchemy import text, inspect
+from flowork.extensions import db
+from flowork.services.db import upgrade_schema
+from flowork.services.sales_service import SalesService
+from flowork.services.stock_totals import get_variant_totals, get_product_total
+from flowork.models import Sale, StockTransfer, TransferDocument, StoreStock, SalesDailyRollup, SalesDailyStoreRollup
+
+def _simulate_old_sales_schema():
+    # idempotency_key / receipt_counters 추가 이전에 만들어진 DB 를 흉내
+    db.session.execute(text('DROP INDEX uq_sales_idempotency_key'))
+    db.session.execute(text('ALTER TABLE sales DROP COLUMN idempotency_key'))
+    db.session.execute(text('DROP TABLE receipt_counters'))
+    db.session.commit()
+
+def test_upgrade_schema_adds_missing_tables_columns_and_indexes(app, setup_data):
+    _simulate_old_sales_schema()
+
+    tables, columns, indexes = upgrade_schema()
+    assert tables == ['receipt_counters']
+    assert columns == ['sales.idempotency_key']
+    assert indexes == ['uq_sales_idempotency_key']
+
+    unique = {ix['name']: ix['unique'] for ix in inspect(db.engine).get_indexes('sales')}
+    assert unique['uq_sales_idempotency_key']
+
+    # 다시 실행해도 변경 없음
+    assert upgrade_schema() == ([], [], [])
+
+def test_upgraded_schema_serves_sales(app, setup_data):
+    _simulate_old_sales_schema()
+    upgrade_schema()
+
+    store_id, user_id = setup_data['store'].id, setup_data['user'].id
+    result = SalesService.create_sale(store_id, user_id, '2024-05-01',
+                                      [{'variant_id': setup_data['variant'].id, 'quantity': 1}], '카드', False)
+    assert result['status'] == 'success'
+
+    bulk = SalesService.create_sales_bulk(store_id, user_id, [{
+        'idempotency_key': 'pos-1', 'sale_date': '2024-05-01',
+        'items': [{'variant_id': setup_data['variant'].id, 'quantity': 1}]
+    }])
+    assert bulk[0]['status'] == 'created'
+    assert Sale.query.count() == 2
+
+def test_upgrade_schema_adds_transfer_document_link(app, setup_data):
+    # 지시서(transfer_documents) 도입 이전의 stock_transfers (SQLite 는 외래키 컬럼 DROP 불가라 재생성)
+    db.session.execute(text('DROP TABLE stock_transfers'))
+    db.session.execute(text('DROP TABLE transfer_documents'))
+    db.session.execute(text(
+        'CREATE TABLE stock_transfers ('
+        ' id INTEGER PRIMARY KEY,'
+        ' source_store_id INTEGER NOT NULL REFERENCES stores (id),'
+        ' target_store_id INTEGER NOT NULL REFERENCES stores (id),'
+        ' variant_id INTEGER NOT NULL REFERENCES variants (id),'
+        ' quantity INTEGER NOT NULL, status VARCHAR(20), transfer_type VARCHAR(20),'
+        ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME)'
+    ))
+    db.session.commit()
+
+    tables, columns, indexes = upgrade_schema()
+    assert tables == ['transfer_documents']
+    assert columns == ['stock_transfers.document_id']
+    assert 'ix_stock_transfers_document_id' in indexes
+
+    fks = inspect(db.engine).get_foreign_keys('stock_transfers')
+    assert any(fk['constrained_columns'] == ['document_id'] and fk['referred_table'] == 'transfer_documents'
+               for fk in fks)
+
+    document = TransferDocument(brand_id=setup_data['brand'].id)
+    db.session.add(document)
+    db.session.flush()
+    store_id = setup_data['store'].id
+    db.session.add(StockTransfer(source_store_id=store_id, target_store_id=store_id,
+                                 variant_id=setup_data['variant'].id, quantity=1, document_id=document.id))
+    db.session.commit()
+    assert document.lines.count() == 1
+
+def test_upgrade_schema_backfills_new_sales_rollup(app, setup_data):
+    store_id, variant_id = setup_data['store'].id, setup_data['variant'].id
+    result = SalesService.create_sale(store_id, setup_data['user'].id, '2024-05-01',
+                                      [{'variant_id': variant_id, 'quantity': 3}], '카드', False)
+    assert result['status'] == 'success'
+
+    # 판매 집계 도입 이전 DB: 판매 내역은 있고 집계 테이블은 없음
+    db.session.execute(text('DROP TABLE sales_daily_rollup'))
+    db.session.execute(text('DROP TABLE sales_daily_store_rollup'))
+    db.session.commit()
+
+    tables, _, _ = upgrade_schema()
+    assert set(tables) == {'sales_daily_rollup', 'sales_daily_store_rollup'}
+
+    rollup = SalesDailyRollup.query.filter_by(store_id=store_id, variant_id=variant_id).one()
+    assert rollup.quantity == 3
+    assert SalesDailyStoreRollup.query.filter_by(store_id=store_id).count() == 1
+
+def test_upgrade_schema_backfills_new_stock_totals(app, setup_data):
+    variant = setup_data['variant']
+    expected = StoreStock.query.filter_by(variant_id=variant.id).with_entities(db.func.sum(StoreStock.quantity)).scalar()
+    assert expected
+
+    # 재고 합계 도입 이전 DB: 매장 재고만 있고 합계 테이블은 없음
+    db.session.execute(text('DROP TABLE variant_stock_totals'))
+    db.session.execute(text('DROP TABLE product_stock_totals'))
+    db.session.commit()
+
+    tables, _, _ = upgrade_schema()
+    assert set(tables) == {'variant_stock_totals', 'product_stock_totals'}
+    assert get_variant_totals([variant.id]) == {variant.id: expected}
+    assert get_product_total(variant.product_id) == expected
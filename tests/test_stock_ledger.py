@@ -0,0 +1,63 @@
+import pytest
+from flowork.extensions import db
+from flowork.models import Store, StoreStock, StockHistory
+from flowork.constants import StockChangeType
+from flowork.services.stock_ledger import apply_stock_changes, InsufficientStockError
+
+def test_apply_stock_changes_upserts_and_records_history(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+    store2 = Store(store_name="Store2", brand_id=setup_data['brand'].id)
+    db.session.add(store2)
+    db.session.commit()
+
+    quantities = apply_stock_changes(
+        [(store_id, variant_id, -2), (store_id, variant_id, -1), (store2.id, variant_id, 4)],
+        StockChangeType.SALE, setup_data['user'].id
+    )
+    db.session.commit()
+
+    assert quantities == {(store_id, variant_id): 7, (store2.id, variant_id): 4}
+    assert StoreStock.query.filter_by(store_id=store2.id, variant_id=variant_id).one().quantity == 4
+
+    history = StockHistory.query.filter_by(store_id=store_id).order_by(StockHistory.id).all()
+    # 같은 옵션 여러 건은 입력 순서대로 누적 수량 기록
+    assert [(h.quantity_change, h.current_quantity) for h in history] == [(-2, 8), (-1, 7)]
+
+def test_apply_stock_changes_non_negative_guard(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+
+    with pytest.raises(InsufficientStockError) as exc_info:
+        apply_stock_changes([(store_id, variant_id, -11)], StockChangeType.TRANSFER_OUT, non_negative=True)
+    db.session.rollback()
+    assert exc_info.value.shortages == [(store_id, variant_id, 11, 10)]
+    assert StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).one().quantity == 10
+    assert StockHistory.query.count() == 0
+
+def test_apply_stock_changes_non_negative_mixed_signs(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+    store2 = Store(store_name="Store2", brand_id=setup_data['brand'].id)
+    db.session.add(store2)
+    db.session.commit()
+
+    # 이동 출고(차감)와 입고(행 없음 -> 생성)를 한 번에
+    quantities = apply_stock_changes(
+        [(store_id, variant_id, -4), (store2.id, variant_id, 4)], StockChangeType.TRANSFER_OUT, non_negative=True
+    )
+    db.session.commit()
+    assert quantities == {(store_id, variant_id): 6, (store2.id, variant_id): 4}
+
+    # 없는 행 차감과 부족한 차감 모두 보고
+    store3 = Store(store_name="Store3", brand_id=setup_data['brand'].id)
+    db.session.add(store3)
+    db.session.commit()
+    with pytest.raises(InsufficientStockError) as exc_info:
+        apply_stock_changes(
+            [(store_id, variant_id, 1), (store2.id, variant_id, -5), (store3.id, variant_id, -1)],
+            StockChangeType.TRANSFER_OUT, non_negative=True
+        )
+    db.session.rollback()
+    assert exc_info.value.shortages == [(store2.id, variant_id, 5, 4), (store3.id, variant_id, 1, 0)]
+    assert StoreStock.query.filter_by(store_id=store3.id).count() == 0
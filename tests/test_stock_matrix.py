@@ -0,0 +1,35 @@
+from flowork.extensions import db
+from flowork.models import Store, Variant, StoreStock
+from flowork.services.stock_matrix import get_stock_matrix, invalidate_stock_matrix
+
+def test_stock_matrix_builds_dense_array(app, setup_data):
+    brand_id = setup_data['brand'].id
+    store = setup_data['store']
+    variant = setup_data['variant']
+
+    store2 = Store(store_name="AStore", brand_id=brand_id)
+    db.session.add(store2)
+    db.session.flush()
+    variant2 = Variant(product_id=setup_data['product'].id, barcode="987654321", color="BLK", size="M", sale_price=10000)
+    db.session.add(variant2)
+    db.session.flush()
+    db.session.add(StoreStock(store_id=store2.id, variant_id=variant.id, quantity=-2))
+    db.session.commit()
+    invalidate_stock_matrix(brand_id)
+
+    matrix = get_stock_matrix(brand_id)
+    assert matrix.shape == (2, 2)
+    # 매장은 매장명 순, 행은 품번/컬러/사이즈 순
+    assert [s['store_name'] for s in matrix.stores] == ['AStore', 'TestStore']
+    assert matrix.variant_ids.tolist() == [variant.id, variant2.id]
+    assert matrix.quantities.tolist() == [[-2, 10], [0, 0]]
+    assert matrix.row_totals.tolist() == [8, 0]
+    assert matrix.column_totals.tolist() == [-2, 10]
+
+    assert matrix.filter_rows(only_nonzero=True).tolist() == [0]
+    assert matrix.filter_rows(only_negative=True).tolist() == [0]
+    assert matrix.filter_rows(pn_prefix='test').tolist() == [0, 1]
+    assert matrix.slice(matrix.filter_rows(), matrix.store_column(store.id)).tolist() == [[10], [0]]
+
+    # 캐시된 객체 재사용
+    assert get_stock_matrix(brand_id) is matrix
@@ -0,0 +1,44 @@
+from flowork.extensions import db
+from flowork.models import Store, StoreStock, User
+from flowork.services.stock_matrix import invalidate_stock_matrix
+
+def _login_hq_admin(client, brand_id):
+    admin = User(username="hqadmin", password_hash="hash", role="admin", brand_id=brand_id, is_active=True)
+    db.session.add(admin)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin.id)
+        sess['_fresh'] = True
+
+def test_stock_overview_grid_window_and_filters(app, client, setup_data):
+    brand_id = setup_data['brand'].id
+    store2 = Store(store_name="AStore", brand_id=brand_id)
+    db.session.add(store2)
+    db.session.flush()
+    db.session.add(StoreStock(store_id=store2.id, variant_id=setup_data['variant'].id, quantity=-3))
+    db.session.commit()
+    invalidate_stock_matrix(brand_id)
+    _login_hq_admin(client, brand_id)
+
+    res = client.get('/api/stock_overview/grid?col_offset=1&col_limit=1')
+    data = res.get_json()
+    assert res.status_code == 200
+    assert data['total_rows'] == 1 and data['total_stores'] == 2
+    # 열 구간만 (매장명 순: AStore, TestStore)
+    assert data['stores']['name'] == ['TestStore']
+    assert data['rows']['product_number'] == ['TEST001']
+    assert data['rows']['total'] == [7]
+    assert data['quantities'] == [[10]]
+
+    data = client.get('/api/stock_overview/grid?pn=zzz').get_json()
+    assert data['total_rows'] == 0 and data['quantities'] == []
+
+    data = client.get('/api/stock_overview/grid?negative=1').get_json()
+    assert data['total_rows'] == 1
+
+def test_stock_overview_grid_requires_hq_admin(app, client, setup_data):
+    setup_data['user'].is_active = True
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(setup_data['user'].id)
+    assert client.get('/api/stock_overview/grid').status_code == 403
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from flowork.extensions import db
+from flowork.models import StockSnapshot, StockSnapshotItem, StockHistory, StoreStock
+from flowork.services.sales_service import SalesService
+from flowork.services.snapshot_service import StockSnapshotService
+from flowork.constants import PaymentMethod
+
+def test_stock_as_of_uses_snapshot_plus_history(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+
+    result = StockSnapshotService.take_snapshot()
+    assert result['status'] == 'success'
+    snapshot = db.session.get(StockSnapshot, result['snapshot_id'])
+    assert snapshot.row_count == 1
+    assert db.session.get(StockSnapshotItem, (snapshot.id, store_id, variant_id)).quantity == 10
+    # SQLite CURRENT_TIMESTAMP 는 초 단위이므로 이후 이력과 시각이 겹치지 않도록 조정
+    snapshot.taken_at -= timedelta(seconds=1)
+    db.session.commit()
+
+    SalesService.create_sale(
+        store_id=store_id,
+        user_id=setup_data['user'].id,
+        sale_date_str=None,
+        items=[{'variant_id': variant_id, 'quantity': 3, 'discount_amount': 0}],
+        payment_method=PaymentMethod.CARD,
+        is_online=False
+    )
+
+    # 스냅샷(10) + 이후 판매 이력(-3)
+    stock, base = StockSnapshotService.get_stock_as_of(store_id, datetime.utcnow() + timedelta(minutes=1))
+    assert base.id == snapshot.id
+    assert stock == {variant_id: 7}
+
+    # 스냅샷 이전 시점: 기준 스냅샷 없음, 이력만 합산 (초기 재고는 이력이 없으므로 비어 있음)
+    stock, base = StockSnapshotService.get_stock_as_of(store_id, snapshot.taken_at - timedelta(days=1))
+    assert base is None
+    assert stock == {}
+
+
+def test_stock_as_of_splits_history_by_id_watermark(app, setup_data):
+    store_id = setup_data['store'].id
+    variant_id = setup_data['variant'].id
+
+    # 스냅샷 이전에 커밋됐지만 created_at(트랜잭션 시작 시각)이 스냅샷보다 늦게 찍힌 이력
+    before = StockHistory(store_id=store_id, variant_id=variant_id, change_type='SALE',
+                          quantity_change=-2, current_quantity=8, created_at=datetime.utcnow() + timedelta(minutes=5))
+    db.session.add(before)
+    db.session.get(StoreStock, setup_data['stock'].id).quantity = 8
+    db.session.commit()
+
+    result = StockSnapshotService.take_snapshot()
+    snapshot = db.session.get(StockSnapshot, result['snapshot_id'])
+    assert snapshot.last_history_id == before.id
+
+    # 스냅샷 전에 시작했지만 스냅샷 후에 커밋된 변경 (created_at 이 taken_at 보다 이름)
+    after = StockHistory(store_id=store_id, variant_id=variant_id, change_type='SALE',
+                         quantity_change=-1, current_quantity=7, created_at=snapshot.taken_at - timedelta(minutes=1))
+    db.session.add(after)
+    db.session.get(StoreStock, setup_data['stock'].id).quantity = 7
+    db.session.commit()
+
+    # 스냅샷(8) + 기준 id 이후 이력(-1), 스냅샷에 반영된 -2 는 중복 합산하지 않음
+    stock, base = StockSnapshotService.get_stock_as_of(store_id, datetime.utcnow() + timedelta(minutes=10))
+    assert base.id == snapshot.id
+    assert stock == {variant_id: 7}
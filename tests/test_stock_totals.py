@@ -0,0 +1,37 @@
+from flowork.extensions import db
+from flowork.models import VariantStockTotal, ProductStockTotal
+from flowork.services.sales_service import SalesService
+from flowork.services.stock_totals import rebuild_stock_totals, get_variant_totals, get_product_total
+from flowork.constants import PaymentMethod
+
+def test_stock_totals_follow_sales_and_rebuild(app, setup_data):
+    variant_id = setup_data['variant'].id
+    product_id = setup_data['product'].id
+
+    # 초기 데이터는 합계 테이블 없이 들어갔으므로 재계산으로 채움
+    rebuild_stock_totals(setup_data['brand'].id)
+    db.session.commit()
+    assert get_variant_totals([variant_id]) == {variant_id: 10}
+    assert get_product_total(product_id) == 10
+
+    result = SalesService.create_sale(
+        store_id=setup_data['store'].id,
+        user_id=setup_data['user'].id,
+        sale_date_str='2023-01-01',
+        items=[{'variant_id': variant_id, 'quantity': 3, 'discount_amount': 0}],
+        payment_method=PaymentMethod.CARD,
+        is_online=False
+    )
+    assert result['status'] == 'success'
+    assert get_variant_totals([variant_id]) == {variant_id: 7}
+    assert get_product_total(product_id) == 7
+
+    # 어긋난 합계도 재계산으로 복구
+    db.session.get(VariantStockTotal, variant_id).quantity = 999
+    db.session.get(ProductStockTotal, product_id).quantity = 999
+    db.session.commit()
+    rebuild_stock_totals(setup_data['brand'].id)
+    db.session.commit()
+    db.session.expire_all()
+    assert get_variant_totals([variant_id]) == {variant_id: 7}
+    assert get_product_total(product_id) == 7
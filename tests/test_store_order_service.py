@@ -0,0 +1,133 @@
+import io
+from datetime import date
+from flowork.extensions import db
+from flowork.models import StoreOrder, StoreReturn, StoreStock, Variant, HqStockHistory
+from flowork.constants import TransferStatus, StockChangeType
+from flowork.services.store_order_service import StoreOrderService
+
+def _order(setup_data, quantity):
+    order = StoreOrder(
+        store_id=setup_data['store'].id, variant_id=setup_data['variant'].id,
+        order_date=date.today(), quantity=quantity, status=TransferStatus.REQUESTED
+    )
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+def _hq_quantity(variant_id):
+    return db.session.query(Variant.hq_quantity).filter_by(id=variant_id).scalar()
+
+def test_order_approval_decrements_hq_stock_with_history(app, setup_data):
+    variant_id = setup_data['variant'].id
+    setup_data['variant'].hq_quantity = 5
+    db.session.commit()
+    oid = _order(setup_data, 3)
+
+    result = StoreOrderService.update_order_status(oid, 'APPROVED', 3, setup_data['user'].id)
+
+    assert result['status'] == 'success'
+    assert _hq_quantity(variant_id) == 2
+    assert StoreStock.query.filter_by(store_id=setup_data['store'].id, variant_id=variant_id).one().quantity == 13
+    history = HqStockHistory.query.one()
+    assert (history.change_type, history.quantity_change, history.current_quantity, history.store_id) == \
+        (StockChangeType.HQ_ORDER_OUT, -3, 2, setup_data['store'].id)
+
+def test_order_approval_rejects_hq_shortage(app, setup_data):
+    variant_id = setup_data['variant'].id
+    setup_data['variant'].hq_quantity = 2
+    db.session.commit()
+    oid = _order(setup_data, 3)
+
+    result = StoreOrderService.update_order_status(oid, 'APPROVED', 3, setup_data['user'].id)
+
+    assert result['status'] == 'error'
+    assert '현재: 2' in result['message']
+    assert _hq_quantity(variant_id) == 2
+    assert db.session.get(StoreOrder, oid).status == TransferStatus.REQUESTED
+    assert StoreStock.query.filter_by(store_id=setup_data['store'].id, variant_id=variant_id).one().quantity == 10
+    assert HqStockHistory.query.count() == 0
+
+def test_return_approval_increments_hq_stock(app, setup_data):
+    variant_id = setup_data['variant'].id
+    ret = StoreReturn(
+        store_id=setup_data['store'].id, variant_id=variant_id,
+        return_date=date.today(), quantity=4, status=TransferStatus.REQUESTED
+    )
+    db.session.add(ret)
+    db.session.commit()
+
+    result = StoreOrderService.update_return_status(ret.id, 'APPROVED', 4, setup_data['user'].id)
+
+    assert result['status'] == 'success'
+    assert _hq_quantity(variant_id) == 4
+    assert StoreStock.query.filter_by(store_id=setup_data['store'].id, variant_id=variant_id).one().quantity == 6
+    assert HqStockHistory.query.one().change_type == StockChangeType.HQ_RETURN_IN
+
+def test_orders_bulk_allocates_hq_stock_in_request_order(app, setup_data):
+    variant_id = setup_data['variant'].id
+    setup_data['variant'].hq_quantity = 5
+    db.session.commit()
+    first, second, third, done = (_order(setup_data, q) for q in (3, 3, 2, 1))
+    db.session.get(StoreOrder, done).status = 'APPROVED'
+    db.session.commit()
+
+    result = StoreOrderService.update_orders_bulk([
+        {'id': first, 'status': 'APPROVED', 'confirmed_quantity': 3},
+        {'id': second, 'status': 'APPROVED', 'confirmed_quantity': 3},
+        {'id': third, 'status': 'REJECTED'},
+        {'id': done, 'status': 'APPROVED', 'confirmed_quantity': 1},
+        {'id': 9999, 'status': 'APPROVED', 'confirmed_quantity': 1},
+    ], setup_data['user'].id, brand_id=setup_data['brand'].id)
+
+    assert result['status'] == 'success'
+    assert (result['approved'], result['rejected'], result['failed']) == (1, 1, 3)
+    assert [r['status'] for r in result['results']] == ['APPROVED', 'error', 'REJECTED', 'error', 'error']
+    assert '현재: 2' in result['results'][1]['message']
+
+    assert _hq_quantity(variant_id) == 2
+    assert StoreStock.query.filter_by(store_id=setup_data['store'].id, variant_id=variant_id).one().quantity == 13
+    assert db.session.get(StoreOrder, second).status == TransferStatus.REQUESTED
+    assert HqStockHistory.query.count() == 1
+
+def test_returns_bulk_checks_store_stock(app, setup_data):
+    variant_id = setup_data['variant'].id
+    returns = [
+        StoreReturn(store_id=setup_data['store'].id, variant_id=variant_id,
+                    return_date=date.today(), quantity=q, status=TransferStatus.REQUESTED)
+        for q in (6, 6)
+    ]
+    db.session.add_all(returns)
+    db.session.commit()
+
+    result = StoreOrderService.update_returns_bulk([
+        {'id': r.id, 'status': 'APPROVED', 'confirmed_quantity': 6} for r in returns
+    ], setup_data['user'].id)
+
+    assert (result['approved'], result['failed']) == (1, 1)
+    assert '현재: 4' in result['results'][1]['message']
+    assert _hq_quantity(variant_id) == 6
+    assert StoreStock.query.filter_by(store_id=setup_data['store'].id, variant_id=variant_id).one().quantity == 4
+
+def test_upload_order_sheet_creates_orders_in_bulk(client, setup_data):
+    user = setup_data['user']
+    user.is_active = True
+    setup_data['variant'].barcode_cleaned = '123456789'
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+
+    csv = "바코드,수량\n123456789,2\nUNKNOWN1,1\n123456789,3\n123456789,0\n"
+    res = client.post('/api/store_orders/upload', data={
+        'excel_file': (io.BytesIO(csv.encode('utf-8')), 'order.csv'),
+        'date': '2024-03-02'
+    }, content_type='multipart/form-data')
+
+    body = res.get_json()
+    assert res.status_code == 200
+    assert body['created'] == 1
+    assert body['unknown_barcodes'] == ['UNKNOWN1']
+    assert [e['row_index'] for e in body['errors']] == [3, 5]
+
+    order = StoreOrder.query.one()
+    assert (order.variant_id, order.quantity, order.status) == (setup_data['variant'].id, 5, TransferStatus.REQUESTED)
+    assert order.order_date == date(2024, 3, 2)
@@ -0,0 +1,103 @@
+import io
+from flowork.extensions import db
+from flowork.models import Store, StoreStock, StockTransfer, StockHistory, TransferDocument
+from flowork.constants import TransferStatus
+from flowork.services.transfer_service import TransferService
+from flowork.services.excel import parse_transfer_allocation_excel
+
+def _qty(store_id, variant_id):
+    stock = StoreStock.query.filter_by(store_id=store_id, variant_id=variant_id).first()
+    return stock.quantity if stock else 0
+
+def test_transfer_document_ship_and_receive(app, setup_data):
+    brand_id = setup_data['brand'].id
+    source = setup_data['store']
+    variant_id = setup_data['variant'].id
+    targets = [Store(store_name=f'Target{i}', brand_id=brand_id) for i in range(3)]
+    db.session.add_all(targets)
+    db.session.commit()
+
+    lines = [(source.id, t.id, variant_id, 3) for t in targets] + [(source.id, targets[0].id, variant_id, 1)]
+    result = TransferService.create_document(brand_id, setup_data['user'].id, lines, '시즌 배분')
+    assert result['status'] == 'success'
+    doc_id = result['document_id']
+
+    document = db.session.get(TransferDocument, doc_id)
+    assert document.line_count == 3
+    assert document.total_quantity == 10
+
+    # 재고 10개에서 10개 출고 -> 모두 차감, 이력은 라인별로 한 번에
+    shipped = TransferService.ship_document(doc_id, brand_id, setup_data['user'].id, store_id=source.id)
+    assert shipped['status'] == 'success'
+    assert _qty(source.id, variant_id) == 0
+    assert StockTransfer.query.filter_by(document_id=doc_id, status=TransferStatus.SHIPPED).count() == 3
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.SHIPPED
+
+    # 한 매장만 먼저 입고
+    received = TransferService.receive_document(doc_id, brand_id, None, store_id=targets[0].id)
+    assert received['status'] == 'success'
+    assert _qty(targets[0].id, variant_id) == 4
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.SHIPPED
+
+    # 본사가 나머지 일괄 입고
+    received = TransferService.receive_document(doc_id, brand_id, None)
+    assert received['status'] == 'success'
+    assert [_qty(t.id, variant_id) for t in targets] == [4, 3, 3]
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.RECEIVED
+    assert StockHistory.query.count() == 6
+
+def test_transfer_document_ship_rolls_back_on_shortage(app, setup_data):
+    brand_id = setup_data['brand'].id
+    source = setup_data['store']
+    variant_id = setup_data['variant'].id
+    target = Store(store_name='Target', brand_id=brand_id)
+    db.session.add(target)
+    db.session.commit()
+
+    doc_id = TransferService.create_document(brand_id, None, [(source.id, target.id, variant_id, 11)])['document_id']
+    result = TransferService.ship_document(doc_id, brand_id, None)
+
+    assert result['status'] == 'error'
+    assert result['shortages'][0]['available'] == 10
+    assert _qty(source.id, variant_id) == 10
+    assert StockHistory.query.count() == 0
+
+def test_parse_transfer_allocation_sheet(app, setup_data):
+    brand_id = setup_data['brand'].id
+    setup_data['variant'].barcode_cleaned = '123456789'
+    target = Store(store_name='강남점', store_code='S002', brand_id=brand_id)
+    db.session.add(target)
+    db.session.commit()
+
+    csv = "출고매장,입고매장,바코드,수량\nTestStore,S002,123456789,2\nTestStore,없는매장,123456789,1\n"
+    lines, errors = parse_transfer_allocation_excel(io.BytesIO(csv.encode('utf-8')), {}, brand_id)
+
+    assert lines == [(setup_data['store'].id, target.id, setup_data['variant'].id, 2)]
+    assert errors == [{'row_index': 3, 'reason': '입고매장 없음'}]
+
+def test_per_line_processing_updates_document_status(app, setup_data):
+    brand_id = setup_data['brand'].id
+    source = setup_data['store']
+    variant_id = setup_data['variant'].id
+    targets = [Store(store_name=f'Target{i}', brand_id=brand_id) for i in range(2)]
+    db.session.add_all(targets)
+    db.session.commit()
+
+    doc_id = TransferService.create_document(
+        brand_id, None, [(source.id, t.id, variant_id, 2) for t in targets]
+    )['document_id']
+    first, second = StockTransfer.query.filter_by(document_id=doc_id).order_by(StockTransfer.id).all()
+
+    # 매장 이동 화면에서 라인별 처리
+    assert TransferService.reject_transfer(second.id, source.id)['status'] == 'success'
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.REQUESTED
+    assert TransferService.ship_transfer(first.id, source.id, None)['status'] == 'success'
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.SHIPPED
+    assert TransferService.receive_transfer(first.id, targets[0].id, None)['status'] == 'success'
+    assert db.session.get(TransferDocument, doc_id).status == TransferStatus.RECEIVED
+
+    # 모든 라인이 거부된 지시서
+    rejected_id = TransferService.create_document(brand_id, None, [(source.id, targets[1].id, variant_id, 1)])['document_id']
+    line = StockTransfer.query.filter_by(document_id=rejected_id).one()
+    assert TransferService.reject_transfer(line.id, source.id)['status'] == 'success'
+    assert db.session.get(TransferDocument, rejected_id).status == TransferStatus.REJECTED